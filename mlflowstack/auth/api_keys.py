@@ -0,0 +1,170 @@
+import hashlib
+import hmac
+import logging
+import re
+import secrets
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from sqlalchemy import Boolean, Column, Float, Integer, String, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from mlflowstack.auth.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Every API key starts with this prefix, telling it apart from a password
+API_KEY_PREFIX = "mlk_"
+
+# Exact shape of the keys create() hands out, passwords merely starting with the prefix do not match
+_API_KEY_FORMAT = re.compile(rf"{API_KEY_PREFIX}[0-9a-f]{{16}}_[A-Za-z0-9_-]{{43}}")
+
+
+def is_api_key(value: str) -> bool:
+    """Tell whether the value has the shape of an API key"""
+    return _API_KEY_FORMAT.fullmatch(value) is not None
+
+
+Base = declarative_base()
+
+
+class SqlApiKey(Base):
+    __tablename__ = "mlflowstack_api_keys"
+    id = Column(Integer(), primary_key=True)
+    # Public part of the key, looked up through its unique index
+    key_id = Column(String(32), nullable=False, unique=True)
+    # HMAC-SHA256 of the secret part, the key itself is never stored
+    digest = Column(String(64), nullable=False)
+    username = Column(String(255), nullable=False, index=True)
+    is_admin = Column(Boolean, nullable=False, default=False)
+    created_at = Column(Float, nullable=False)
+    expires_at = Column(Float, nullable=True)
+    revoked = Column(Boolean, nullable=False, default=False)
+
+
+@dataclass(frozen=True)
+class ApiKey:
+    key_id: str
+    username: str
+    is_admin: bool
+    created_at: float
+    expires_at: Optional[float] = None
+    revoked: bool = False
+
+    def valid(self, now: float) -> bool:
+        return not self.revoked and (self.expires_at is None or self.expires_at > now)
+
+
+class ApiKeyStore:
+    """API keys of machine identities in the auth database, verified by key id lookup and constant-time compare"""
+
+    def __init__(
+        self,
+        engine: Engine,
+        secret: bytes,
+        cache_ttl: float,
+        cache_size: int,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.engine = engine
+        self.cache_ttl = cache_ttl
+        self._secret = secret
+        self._clock = clock
+        self._cache = TTLCache(cache_size)
+        self._session = sessionmaker(bind=engine)
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def create(
+        self, username: str, is_admin: bool, lifetime: Optional[float] = None
+    ) -> str:
+        """Store a new key and return it, it cannot be recovered later"""
+        self._create_schema()
+        key_id = secrets.token_hex(8)
+        secret = secrets.token_urlsafe(32)
+        now = self._clock()
+        with self._session.begin() as session:
+            session.add(
+                SqlApiKey(
+                    key_id=key_id,
+                    digest=self._digest(secret),
+                    username=username,
+                    is_admin=is_admin,
+                    created_at=now,
+                    expires_at=now + lifetime if lifetime else None,
+                )
+            )
+        logger.info(f"Created API key {key_id} for {username}")
+        return f"{API_KEY_PREFIX}{key_id}_{secret}"
+
+    def verify(self, key: str) -> Optional[ApiKey]:
+        """Return the API key record of a valid key, None otherwise"""
+        if not is_api_key(key):
+            return None
+        key_id, _, secret = key[len(API_KEY_PREFIX) :].partition("_")
+        digest = self._digest(secret)
+
+        # Hot keys are served from memory, keyed by the digest so a wrong secret never hits
+        cached = self._cache.get((key_id, digest))
+        if cached is not None:
+            return cached if cached.valid(self._clock()) else None
+
+        self._create_schema()
+        with self._session() as session:
+            row = session.execute(
+                select(SqlApiKey).where(SqlApiKey.key_id == key_id)
+            ).scalar_one_or_none()
+            if row is None or not hmac.compare_digest(row.digest, digest):
+                return None
+            api_key = _to_api_key(row)
+
+        if not api_key.valid(self._clock()):
+            return None
+        self._cache.set((key_id, digest), api_key, self.cache_ttl)
+        return api_key
+
+    def revoke(self, key_id: str) -> bool:
+        self._create_schema()
+        with self._session.begin() as session:
+            revoked = session.execute(
+                update(SqlApiKey).where(SqlApiKey.key_id == key_id).values(revoked=True)
+            ).rowcount
+        self._cache.invalidate(key_id)
+        if revoked:
+            logger.info(f"Revoked API key {key_id}")
+        return bool(revoked)
+
+    def list(self, username: Optional[str] = None) -> list[ApiKey]:
+        self._create_schema()
+        query = select(SqlApiKey).order_by(SqlApiKey.created_at)
+        if username is not None:
+            query = query.where(SqlApiKey.username == username)
+        with self._session() as session:
+            return [_to_api_key(row) for row in session.execute(query).scalars()]
+
+    def _digest(self, secret: str) -> str:
+        return hmac.new(
+            self._secret, secret.encode("utf-8"), hashlib.sha256
+        ).hexdigest()
+
+    def _create_schema(self) -> None:
+        if self._schema_ready:
+            return
+        with self._schema_lock:
+            if not self._schema_ready:
+                Base.metadata.create_all(self.engine, checkfirst=True)
+                self._schema_ready = True
+
+
+def _to_api_key(row: SqlApiKey) -> ApiKey:
+    return ApiKey(
+        key_id=row.key_id,
+        username=row.username,
+        is_admin=row.is_admin,
+        created_at=row.created_at,
+        expires_at=row.expires_at,
+        revoked=row.revoked,
+    )
@@ -0,0 +1,49 @@
+"""
+The ldap-auth app: MLflow's basic-auth app, warming every worker up in the
+background and, when served by uvicorn, verifying LDAP logins without
+blocking the event loop:
+
+    mlflow server --app-name ldap-auth ...
+
+The oidc-auth-cached app: mlflow-oidc-auth's app, answering bearer tokens it
+already verified from memory (see mlflowstack.auth.oidc):
+
+    mlflow server --app-name oidc-auth-cached ...
+"""
+
+import threading
+
+from mlflowstack.auth.asgi import LDAPLoginMiddleware
+from mlflowstack.auth.warmup import install, warm_up
+
+# Auth function whose logins LDAPLoginMiddleware verifies ahead of MLflow
+_LDAP_AUTH_FUNCTION = "mlflowstack.auth.ldap:authenticate_request_basic_auth"
+
+
+def create_app():
+    from mlflow.server import app
+    from mlflow.server.auth import auth_config
+    from mlflow.server.auth import create_app as create_auth_app
+    from starlette.applications import Starlette
+
+    install(app)
+    auth_app = create_auth_app(app)
+    if (
+        isinstance(auth_app, Starlette)
+        and auth_config.authorization_function == _LDAP_AUTH_FUNCTION
+    ):
+        # Added last, so it runs before MLflow's permission middleware and the Flask app
+        auth_app.add_middleware(LDAPLoginMiddleware)
+    threading.Thread(target=warm_up, name="auth-warm-up", daemon=True).start()
+    return auth_app
+
+
+def create_oidc_app():
+    from mlflowstack.auth import oidc
+
+    # Before the app is built, so its middleware is created with the cached validation
+    oidc.install()
+    from mlflow_oidc_auth.app import app
+
+    threading.Thread(target=oidc.warm_up, name="oidc-warm-up", daemon=True).start()
+    return app
@@ -0,0 +1,57 @@
+import logging
+
+from werkzeug.datastructures import Authorization
+
+logger = logging.getLogger(__name__)
+
+
+class LDAPLoginMiddleware:
+    """ASGI middleware verifying basic auth logins with the asyncio LDAP authenticator, before MLflow's synchronous authentication finds them cached"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            await self._verify(scope)
+        await self.app(scope, receive, send)
+
+    async def _verify(self, scope) -> None:
+        from mlflow.server.auth import is_unprotected_route
+
+        from mlflowstack.auth import ldap
+
+        if ldap._credential_cache is None or is_unprotected_route(scope["path"]):
+            return
+        authorization = _authorization(scope)
+        if authorization is None or authorization.type != "basic":
+            return
+        username, password = authorization.username, authorization.password
+        # Empty credentials and API keys never reach LDAP
+        if not username or not password or ldap.is_api_key(password):
+            return
+
+        client = scope.get("client")
+        try:
+            await ldap.authenticate_user_async(
+                username,
+                password,
+                ldap.client_address(
+                    client[0] if client else None, _header(scope, b"x-forwarded-for")
+                ),
+            )
+        except Exception as e:
+            # The request goes on, MLflow's authentication of it reports the failure
+            logger.debug(f"Asynchronous login of user {username} failed: {str(e)}")
+
+
+def _authorization(scope) -> Authorization:
+    value = _header(scope, b"authorization")
+    return Authorization.from_header(value) if value is not None else None
+
+
+def _header(scope, name: bytes) -> str:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
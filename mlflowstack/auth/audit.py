@@ -0,0 +1,103 @@
+import atexit
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Events go to this logger when no audit file is configured
+audit_logger = logging.getLogger("mlflowstack.audit")
+
+
+class AuditLog:
+    """structured auth events handed to a background thread through a bounded queue, dropped when it is full"""
+
+    def __init__(
+        self,
+        write: Callable[[list], None],
+        queue_size: int,
+        batch_size: int,
+        flush_interval: float,
+        on_drop: Optional[Callable[[], None]] = None,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._write = write
+        self._on_drop = on_drop
+        self._queue: "queue.Queue[dict]" = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, **event) -> None:
+        """Queue an event without ever blocking the caller"""
+        event.setdefault("ts", time.time())
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+            if self._on_drop is not None:
+                self._on_drop()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="auth-audit-writer", daemon=True
+        )
+        self._thread.start()
+        # Events still queued at shutdown are written before the worker exits
+        atexit.register(self.close)
+
+    def close(self, timeout: float = 5) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+
+    def flush(self) -> None:
+        """Write everything queued so far from the calling thread"""
+        while self._drain_batch(block=False):
+            pass
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._drain_batch(block=True)
+
+    def _drain_batch(self, block: bool) -> int:
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if block and timeout > 0:
+                    batch.append(self._queue.get(timeout=timeout))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            try:
+                self._write(batch)
+            except Exception as e:
+                logger.warning(f"Writing {len(batch)} audit events failed: {str(e)}")
+        return len(batch)
+
+
+def log_writer(batch: list) -> None:
+    """Write each event as a JSON line to the mlflowstack.audit logger"""
+    for event in batch:
+        audit_logger.info(json.dumps(event, default=str))
+
+
+class FileWriter:
+    """append events as JSON lines to a file, one write per batch"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __call__(self, batch: list) -> None:
+        lines = "".join(json.dumps(event, default=str) + "\n" for event in batch)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
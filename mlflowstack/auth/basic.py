@@ -0,0 +1,236 @@
+import json
+import logging
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+from typing import Union
+
+from flask import Response, after_this_request, g, request
+from werkzeug.datastructures import Authorization
+
+from mlflow.exceptions import MlflowException
+from mlflow.server.auth import auth_config
+from mlflow.server.auth import store as auth_store
+from mlflow.server.auth.routes import (
+    AJAX_DELETE_USER,
+    AJAX_UPDATE_USER_ADMIN,
+    AJAX_UPDATE_USER_PASSWORD,
+    DELETE_USER,
+    UPDATE_USER_ADMIN,
+    UPDATE_USER_PASSWORD,
+)
+from mlflowstack.auth import permissions
+from mlflowstack.auth.cache import credential_digest
+from mlflowstack.auth.metrics import AUTH_CACHE_LOOKUPS, AUTH_OUTCOMES
+from mlflowstack.auth.shared_cache import RedisCache, SQLiteCache
+from mlflowstack.auth.singleflight import SingleFlight
+
+
+_auth_store = auth_store
+logger = logging.getLogger(__name__)
+
+
+# Seconds a verified password is served from the cache (0 disables the cache)
+BASIC_AUTH_CACHE_TTL = int(os.getenv("BASIC_AUTH_CACHE_TTL", "60"))
+
+# Seconds a rejected password is remembered, so retries skip the password hash check
+BASIC_AUTH_CACHE_NEGATIVE_TTL = int(os.getenv("BASIC_AUTH_CACHE_NEGATIVE_TTL", "10"))
+
+# Where cached logins are shared (values: file | redis), file by the workers of one host, redis by all replicas
+BASIC_AUTH_CACHE_BACKEND = os.getenv("BASIC_AUTH_CACHE_BACKEND", "file")
+
+# SQLite file of the file cache backend
+BASIC_AUTH_CACHE_PATH = os.getenv(
+    "BASIC_AUTH_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), "mlflowstack-basic-auth-cache.db"),
+)
+
+# Redis URL of the redis cache backend, defaults to the one of the OIDC cache
+BASIC_AUTH_CACHE_REDIS_URL = os.getenv(
+    "BASIC_AUTH_CACHE_REDIS_URL",
+    os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0"),
+)
+
+# Prefix of the redis cache backend keys
+BASIC_AUTH_CACHE_REDIS_PREFIX = os.getenv(
+    "BASIC_AUTH_CACHE_REDIS_PREFIX", "mlflowstack:basic"
+)
+
+# Secret salting the cache keys, required while the cache is on
+BASIC_AUTH_CACHE_SECRET = os.getenv("BASIC_AUTH_CACHE_SECRET", "")
+
+# PBKDF2 iterations used to derive the cache key from the password
+BASIC_AUTH_CACHE_HASH_ITERATIONS = int(
+    os.getenv("BASIC_AUTH_CACHE_HASH_ITERATIONS", "1000")
+)
+
+# Seconds a login waits for an identical login already in flight to finish
+BASIC_AUTH_COALESCE_TIMEOUT = float(os.getenv("BASIC_AUTH_COALESCE_TIMEOUT", "10"))
+
+
+# Auth API routes changing a user, whose cached logins are dropped once they succeed
+_USER_MUTATIONS = {
+    (UPDATE_USER_PASSWORD, "PATCH"),
+    (AJAX_UPDATE_USER_PASSWORD, "PATCH"),
+    (UPDATE_USER_ADMIN, "PATCH"),
+    (AJAX_UPDATE_USER_ADMIN, "PATCH"),
+    (DELETE_USER, "DELETE"),
+    (AJAX_DELETE_USER, "DELETE"),
+}
+
+# Concurrent logins with the same credentials share one password hash check
+_inflight = SingleFlight()
+
+
+@dataclass(frozen=True)
+class StoreUser:
+    """outcome of a password check against the auth store, cached per credential digest"""
+
+    name: str
+    is_admin: bool = False
+    authenticated: bool = False
+
+
+def _build_credential_cache():
+    if BASIC_AUTH_CACHE_TTL <= 0:
+        return None
+    if not BASIC_AUTH_CACHE_SECRET:
+        # A salt kept in the backend would hand it out together with the digests
+        raise MlflowException(
+            f"BASIC_AUTH_CACHE_BACKEND={BASIC_AUTH_CACHE_BACKEND} persists login digests "
+            "outside the worker, set BASIC_AUTH_CACHE_SECRET"
+        )
+    if auth_config.auth_cache_ttl_seconds > 0:
+        logger.warning(
+            "MLflow's per-worker credential cache (auth_cache_ttl_seconds) is on as well, "
+            "set it to 0 and keep the shared cache only"
+        )
+    if BASIC_AUTH_CACHE_BACKEND == "file":
+        return SQLiteCache(
+            BASIC_AUTH_CACHE_PATH, serialize=_dump_user, deserialize=_load_user
+        )
+    if BASIC_AUTH_CACHE_BACKEND == "redis":
+        return RedisCache(
+            BASIC_AUTH_CACHE_REDIS_URL,
+            serialize=_dump_user,
+            deserialize=_load_user,
+            prefix=BASIC_AUTH_CACHE_REDIS_PREFIX,
+        )
+    # MLflow's own auth_cache_ttl_seconds already caches logins per worker
+    raise MlflowException(
+        f"Unknown BASIC_AUTH_CACHE_BACKEND {BASIC_AUTH_CACHE_BACKEND}, use file or redis"
+    )
+
+
+def _dump_user(user: StoreUser) -> str:
+    return json.dumps(asdict(user))
+
+
+def _load_user(value: str) -> StoreUser:
+    return StoreUser(**json.loads(value))
+
+
+# Credential cache in front of the auth store, keyed by username and salted password digest
+_credential_cache = _build_credential_cache()
+
+
+def get_cache_salt() -> bytes:
+    """Salt of the cache keys, the secret shared by every worker."""
+    return BASIC_AUTH_CACHE_SECRET.encode("utf-8")
+
+
+def invalidate_credentials(username: str = None) -> int:
+    """Forget the cached logins of one user, or of everyone, on all workers sharing the cache."""
+    if _credential_cache is None:
+        return 0
+    dropped = _credential_cache.invalidate(username)
+    logger.info(f"Invalidated {dropped} cached login(s) of {username or 'all users'}")
+    return dropped
+
+
+def authenticate_user(username: str, password: str) -> StoreUser:
+    """Check the password against the auth store, serving repeated credentials from the cache."""
+    if _credential_cache is None:
+        return _check_password(username, password)
+
+    key = (
+        username,
+        credential_digest(
+            username, password, get_cache_salt(), BASIC_AUTH_CACHE_HASH_ITERATIONS
+        ),
+    )
+    user = _credential_cache.get(key)
+    AUTH_CACHE_LOOKUPS.labels("miss" if user is None else "hit").inc()
+    if user is not None:
+        return user
+
+    # Identical logins arriving together wait for the first hash check instead of each running one
+    user = _inflight.do(
+        key, lambda: _check_password(username, password), BASIC_AUTH_COALESCE_TIMEOUT
+    )
+    _credential_cache.set(
+        key,
+        user,
+        BASIC_AUTH_CACHE_TTL if user.authenticated else BASIC_AUTH_CACHE_NEGATIVE_TTL,
+    )
+    return user
+
+
+def _check_password(username: str, password: str) -> StoreUser:
+    if not _auth_store.authenticate_user(username, password):
+        return StoreUser(name=username)
+    try:
+        row = _auth_store.get_user(username)
+    except MlflowException:
+        # Deleted between the password check and the lookup
+        return StoreUser(name=username)
+    return StoreUser(name=row.username, is_admin=row.is_admin, authenticated=True)
+
+
+def authenticate_request_basic_auth() -> Union[Authorization, Response]:
+    """Using for the basic_auth.ini as auth function, authenticate the request against the auth store like MLflow's basic auth, with verified credentials cached for all workers"""
+    # MLflow calls the auth function several times per request, the first answer holds for all
+    if "mlflowstack_basic_auth" in g:
+        return g.mlflowstack_basic_auth
+    g.mlflowstack_basic_auth = result = _authenticate_request()
+    return result
+
+
+def _authenticate_request() -> Union[Authorization, Response]:
+    from mlflow.server.auth import make_basic_auth_response
+
+    authorization = request.authorization
+    if authorization is None or not authorization.username:
+        AUTH_OUTCOMES.labels("unauthorized").inc()
+        return make_basic_auth_response()
+
+    user = authenticate_user(authorization.username, authorization.password or "")
+    if not user.authenticated:
+        AUTH_OUTCOMES.labels("unauthorized").inc()
+        return make_basic_auth_response()
+
+    if (request.path, request.method) in _USER_MUTATIONS:
+        _invalidate_after_user_change()
+    AUTH_OUTCOMES.labels("admin" if user.is_admin else "user").inc()
+    return authorization
+
+
+def _invalidate_after_user_change() -> None:
+    """Drop the cached logins of the user changed by this request, once the change succeeded."""
+    from mlflow.server.auth import _get_request_param
+
+    try:
+        username = _get_request_param("username")
+    except MlflowException:
+        # The request is rejected by MLflow without changing anything
+        return
+
+    @after_this_request
+    def invalidate(response: Response) -> Response:
+        if response.status_code < 400:
+            invalidate_credentials(username)
+        return response
+
+
+# Hot user and permission lookups of MLflow's authorization are answered from memory when enabled
+permissions.install()
@@ -0,0 +1,68 @@
+import logging
+import threading
+import time
+from typing import Callable
+
+from ldap3.core.exceptions import LDAPExceptionError
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(LDAPExceptionError):
+    """raised instead of calling LDAP while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """fails fast after consecutive failures, letting a single trial call through once the reset timeout passed"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless the call may go through"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            now = self._clock()
+            if now - self._opened_at >= self.reset_timeout:
+                # Let this call probe the directory, everyone else keeps failing fast.
+                # A probe that never reports back is replaced after another reset timeout.
+                self.state = self.HALF_OPEN
+                self._opened_at = now
+                return
+        raise CircuitOpenError(
+            f"LDAP circuit breaker is {self.state} after {self.failures} failures"
+        )
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("LDAP circuit breaker closed")
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(
+                        f"LDAP circuit breaker opened after {self.failures} failures"
+                    )
+                self.state = self.OPEN
+                self._opened_at = self._clock()
@@ -0,0 +1,89 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+
+def credential_digest(
+    username: str, password: str, salt: bytes, iterations: int
+) -> bytes:
+    """Derive a salted PBKDF2 digest of the password, so plaintext credentials never sit in the cache"""
+    return hashlib.pbkdf2_hmac(
+        "sha256", password.encode("utf-8"), salt + username.encode("utf-8"), iterations
+    )
+
+
+class TTLCache:
+    """thread-safe LRU cache with a per-entry time to live, expired entries stay readable as stale for grace seconds"""
+
+    def __init__(
+        self,
+        max_size: int,
+        grace: float = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.grace = grace
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple[object, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[object]:
+        return self._get(key, 0)
+
+    def get_stale(self, key: Hashable) -> Optional[object]:
+        """Return the entry even if it expired less than grace seconds ago"""
+        return self._get(key, self.grace)
+
+    def _get(self, key: Hashable, grace: float) -> Optional[object]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            now = self._clock()
+            if expires_at + self.grace <= now:
+                del self._entries[key]
+                return None
+            if expires_at + grace <= now:
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: object, ttl: float) -> None:
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, self._clock() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Optional[object]:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return entry[0] if entry else None
+
+    def invalidate(self, username: Optional[str] = None) -> int:
+        """Drop the entries keyed by, or by a tuple starting with, the username (all when None)"""
+        with self._lock:
+            if username is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+                return dropped
+            keys = [
+                key
+                for key in self._entries
+                if key == username or (isinstance(key, tuple) and key[0] == username)
+            ]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
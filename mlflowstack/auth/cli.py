@@ -0,0 +1,113 @@
+"""
+Administration commands for the mlflowstack authentication, run with the
+same environment as the MLflow server:
+
+    python -m mlflowstack.auth.cli invalidate-cache [--user USERNAME]
+    python -m mlflowstack.auth.cli api-keys create --user USERNAME [--admin] [--days DAYS]
+    python -m mlflowstack.auth.cli api-keys list [--user USERNAME]
+    python -m mlflowstack.auth.cli api-keys revoke KEY_ID
+"""
+
+import argparse
+import sys
+from datetime import datetime, timezone
+
+
+def invalidate_cache(args) -> int:
+    from mlflowstack.auth import ldap
+
+    if ldap.LDAP_CACHE_BACKEND not in ("file", "redis"):
+        print(
+            "The memory cache backend is private to each worker, "
+            "cached logins expire after LDAP_CACHE_TTL seconds",
+            file=sys.stderr,
+        )
+        return 1
+    dropped = ldap.invalidate_credentials(args.user)
+    print(f"Invalidated {dropped} cached login(s)")
+    return 0
+
+
+def _api_keys():
+    from mlflow.server.auth import auth_config
+
+    from mlflowstack.auth import ldap
+
+    if not ldap.LDAP_API_KEY_SECRET:
+        print("API keys are off, set LDAP_API_KEY_SECRET", file=sys.stderr)
+        return None
+    ldap._auth_store.init_db(auth_config.database_uri)
+    return ldap.get_api_keys()
+
+
+def create_api_key(args) -> int:
+    api_keys = _api_keys()
+    if api_keys is None:
+        return 1
+    key = api_keys.create(
+        args.user, args.admin, lifetime=args.days * 86400 if args.days else None
+    )
+    print(key)
+    return 0
+
+
+def list_api_keys(args) -> int:
+    api_keys = _api_keys()
+    if api_keys is None:
+        return 1
+    for api_key in api_keys.list(args.user):
+        expires = (
+            datetime.fromtimestamp(api_key.expires_at, timezone.utc).isoformat()
+            if api_key.expires_at
+            else "never"
+        )
+        print(
+            f"{api_key.key_id}  {api_key.username}  "
+            f"{'admin' if api_key.is_admin else 'user'}  expires {expires}"
+            f"{'  revoked' if api_key.revoked else ''}"
+        )
+    return 0
+
+
+def revoke_api_key(args) -> int:
+    api_keys = _api_keys()
+    if api_keys is None:
+        return 1
+    if not api_keys.revoke(args.key_id):
+        print(f"No API key {args.key_id}", file=sys.stderr)
+        return 1
+    print(f"Revoked API key {args.key_id}")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m mlflowstack.auth.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    invalidate = commands.add_parser(
+        "invalidate-cache", help="forget cached LDAP logins on every worker"
+    )
+    invalidate.add_argument("--user", help="only forget the logins of this user")
+    invalidate.set_defaults(func=invalidate_cache)
+
+    api_keys = commands.add_parser(
+        "api-keys", help="manage API keys of service accounts"
+    ).add_subparsers(dest="api_keys_command", required=True)
+    create = api_keys.add_parser("create", help="create a key, printed only once")
+    create.add_argument("--user", required=True)
+    create.add_argument("--admin", action="store_true", help="grant the admin role")
+    create.add_argument("--days", type=int, help="days until the key expires")
+    create.set_defaults(func=create_api_key)
+    listing = api_keys.add_parser("list", help="list keys without their secrets")
+    listing.add_argument("--user")
+    listing.set_defaults(func=list_api_keys)
+    revoke = api_keys.add_parser("revoke", help="revoke a key by its id")
+    revoke.add_argument("key_id")
+    revoke.set_defaults(func=revoke_api_key)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
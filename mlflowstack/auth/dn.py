@@ -0,0 +1,46 @@
+import re
+from typing import Iterable, Union
+
+# RDN separators are commas that are not escaped with a backslash
+_RDN_SEPARATOR = re.compile(r"(?<!\\),")
+
+
+def normalize_dn(dn: str) -> str:
+    """Case-fold a DN and drop insignificant whitespace, so equivalent DNs compare equal"""
+    # Without whitespace there is nothing to strip, which is the case for most DNs
+    if " " not in dn and "\t" not in dn:
+        return dn.casefold()
+    rdns = []
+    for rdn in _RDN_SEPARATOR.split(dn):
+        attribute, separator, value = rdn.partition("=")
+        rdns.append(
+            f"{attribute.strip()}={value.strip()}".casefold()
+            if separator
+            else rdn.strip().casefold()
+        )
+    return ",".join(rdns)
+
+
+def normalize_dns(dns: Union[str, Iterable[str], None]) -> frozenset:
+    """Parse a single or multi-valued DN attribute into a set of normalized DNs"""
+    if dns is None:
+        return frozenset()
+    if isinstance(dns, str):
+        return frozenset((normalize_dn(dns),))
+    return frozenset(map(normalize_dn, dns))
+
+
+def matching_dns(dns: Union[str, Iterable[str], None], wanted: frozenset) -> frozenset:
+    """Those of the normalized wanted DNs a single or multi-valued DN attribute holds, read no further than the last of them"""
+    if dns is None:
+        return frozenset()
+    if isinstance(dns, str):
+        dns = (dns,)
+    found = set()
+    for dn in dns:
+        normalized = normalize_dn(dn)
+        if normalized in wanted:
+            found.add(normalized)
+            if len(found) == len(wanted):
+                break
+    return frozenset(found)
@@ -0,0 +1,116 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import ldap3
+
+from mlflowstack.auth.pool import LDAPConnectionPool
+from mlflowstack.auth.server_info import ServerInfoLoader
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ServerState:
+    server: ldap3.Server
+    pool: Optional[LDAPConnectionPool] = None
+    info: Optional[ServerInfoLoader] = None
+    latency: Optional[float] = None
+    failures: int = 0
+    ejected_until: float = 0.0
+
+    @property
+    def name(self) -> str:
+        return f"{self.server.host}:{self.server.port}"
+
+
+class ServerPool:
+    """orders LDAP servers by rolling bind latency and ejects failing ones with exponential backoff"""
+
+    def __init__(
+        self,
+        states: list[ServerState],
+        backoff: float,
+        max_backoff: float,
+        smoothing: float = 0.3,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.states = states
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.smoothing = smoothing
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def candidates(self) -> list[ServerState]:
+        """Healthy servers fastest first, followed by ejected ones as a last resort"""
+        now = self._clock()
+        with self._lock:
+            healthy = [s for s in self.states if s.ejected_until <= now]
+            ejected = [s for s in self.states if s.ejected_until > now]
+        healthy.sort(key=lambda s: s.latency or 0.0)
+        ejected.sort(key=lambda s: s.ejected_until)
+        return healthy + ejected
+
+    def is_ejected(self, state: ServerState) -> bool:
+        return state.ejected_until > self._clock()
+
+    def record_success(self, state: ServerState, elapsed: float) -> None:
+        with self._lock:
+            if state.failures:
+                logger.info(f"LDAP server {state.name} is healthy again")
+            state.failures = 0
+            state.ejected_until = 0.0
+            state.latency = (
+                elapsed
+                if state.latency is None
+                else self.smoothing * elapsed + (1 - self.smoothing) * state.latency
+            )
+
+    def record_failure(self, state: ServerState) -> None:
+        with self._lock:
+            state.failures += 1
+            delay = min(self.backoff * 2 ** (state.failures - 1), self.max_backoff)
+            state.ejected_until = self._clock() + delay
+        logger.warning(
+            f"LDAP server {state.name} failed {state.failures} time(s), ejected for {delay} seconds"
+        )
+
+    def check(self) -> None:
+        """Open and close a connection to every server to refresh its health, latency and server info"""
+        for state in self.states:
+            started = time.perf_counter()
+            try:
+                connection = ldap3.Connection(
+                    server=state.server, client_strategy=ldap3.SAFE_SYNC
+                )
+                connection.open(read_server_info=False)
+                connection.unbind()
+            except Exception as e:
+                logger.debug(
+                    f"Health check of LDAP server {state.name} failed: {str(e)}"
+                )
+                self.record_failure(state)
+            else:
+                self.record_success(state, time.perf_counter() - started)
+                if state.info is not None:
+                    state.info.ensure()
+
+    def start_health_checks(self, interval: float) -> None:
+        thread = threading.Thread(
+            target=self._run_health_checks,
+            args=(interval,),
+            name="ldap-server-health",
+            daemon=True,
+        )
+        thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run_health_checks(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self.check()
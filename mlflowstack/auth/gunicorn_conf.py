@@ -0,0 +1,11 @@
+"""
+Gunicorn configuration warming every worker up before it accepts requests:
+
+    mlflow server --app-name ldap-auth --gunicorn-opts "-c python:mlflowstack.auth.gunicorn_conf"
+"""
+
+from mlflowstack.auth.warmup import warm_up
+
+
+def post_worker_init(worker):
+    warm_up()
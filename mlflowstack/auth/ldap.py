@@ -1,21 +1,63 @@
+import asyncio
+import json
 import logging
 import os
+import re
 import ssl
-from dataclasses import dataclass
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
 from typing import Union
 
 import ldap3
-from flask import Response, make_response, request
+from flask import Response, after_this_request, g, make_response, request
+from ldap3.core.exceptions import LDAPCommunicationError
 from werkzeug.datastructures import Authorization
 
+from mlflow.exceptions import MlflowException
+from mlflow.protos.databricks_pb2 import (
+    RESOURCE_ALREADY_EXISTS,
+    RESOURCE_DOES_NOT_EXIST,
+    ErrorCode,
+)
 from mlflow.server.auth import store as auth_store
+from mlflow.server.auth.db.models import SqlUser
+from mlflowstack.auth.api_keys import ApiKeyStore, is_api_key
+from mlflowstack.auth.audit import AuditLog, FileWriter, log_writer
+from mlflowstack.auth.breaker import CircuitBreaker, CircuitOpenError
+from mlflowstack.auth.cache import TTLCache, credential_digest
+from mlflowstack.auth.dn import matching_dns, normalize_dn
+from mlflowstack.auth.failover import ServerPool, ServerState
+from mlflowstack.auth import permissions
+from mlflowstack.auth.metrics import (
+    AUTH_CACHE_LOOKUPS,
+    AUDIT_EVENTS_DROPPED,
+    AUTH_OUTCOMES,
+    AUTH_REQUEST_SECONDS,
+    AUTH_STORE_WRITES,
+    LOGIN_THROTTLED,
+    LDAP_BIND_SECONDS,
+    LDAP_SEARCH_SECONDS,
+)
+from mlflowstack.auth.pool import LDAPConnectionPool, LDAPPoolTimeoutError
+from mlflowstack.auth.server_info import ServerInfoLoader
+from mlflowstack.auth.session import Session, SessionTokens
+from mlflowstack.auth.shared_cache import RedisCache, SQLiteCache
+from mlflowstack.auth.singleflight import SingleFlight
+from mlflowstack.auth.snapshot import GroupSnapshot
+from mlflowstack.auth.throttle import LoginThrottle, LoginThrottledError
+from mlflowstack.auth.user_sync import UserSync
 
 
 _auth_store = auth_store
 logger = logging.getLogger(__name__)
 
 
-# LDAP server URI (e.g., ldaps://ldap.example.com)
+# LDAP server URI (e.g., ldaps://ldap.example.com), comma-separated for several servers
 LDAP_URI = os.getenv("LDAP_URI", "")
 
 # Path to CA certificate file for LDAP TLS
@@ -28,6 +70,10 @@
 # Template for user bind DN
 LDAP_LOOKUP_BIND = os.getenv("LDAP_LOOKUP_BIND", "")
 
+# Service account DN and password for background reads (anonymous when empty)
+LDAP_BIND_DN = os.getenv("LDAP_BIND_DN", "")
+LDAP_BIND_PASSWORD = os.getenv("LDAP_BIND_PASSWORD", "")
+
 
 # Attribute containing group DN
 LDAP_GROUP_ATTRIBUTE = os.getenv("LDAP_GROUP_ATTRIBUTE", "")
@@ -49,6 +95,181 @@
 LDAP_GROUP_ADMIN_DN = os.getenv("LDAP_GROUP_ADMIN_DN", "")
 
 
+# How group membership is resolved (values: search | memberof | snapshot | inchain)
+LDAP_GROUP_RESOLUTION = os.getenv("LDAP_GROUP_RESOLUTION", "search")
+
+# Whether members of groups nested in the admin and user groups count, read by the snapshot resolution
+LDAP_GROUP_NESTED = os.getenv("LDAP_GROUP_NESTED", "false").lower() == "true"
+
+# User attribute listing the groups of the user, read by the memberof resolution
+LDAP_USER_MEMBEROF_ATTRIBUTE = os.getenv("LDAP_USER_MEMBEROF_ATTRIBUTE", "memberOf")
+
+# Maximum entries the server returns for a group search (0 means no limit)
+LDAP_SEARCH_SIZE_LIMIT = int(os.getenv("LDAP_SEARCH_SIZE_LIMIT", "0"))
+
+# Seconds the server may spend on a group search (0 means no limit)
+LDAP_SEARCH_TIME_LIMIT = int(os.getenv("LDAP_SEARCH_TIME_LIMIT", "10"))
+
+# Attribute listing the members of a group, read by the snapshot resolution
+LDAP_GROUP_MEMBER_ATTRIBUTE = os.getenv("LDAP_GROUP_MEMBER_ATTRIBUTE", "member")
+
+# Seconds between two reloads of the group snapshot
+LDAP_GROUP_SNAPSHOT_INTERVAL = int(os.getenv("LDAP_GROUP_SNAPSHOT_INTERVAL", "300"))
+
+# Page size of the searches reading the group snapshot
+LDAP_GROUP_SNAPSHOT_PAGE_SIZE = int(os.getenv("LDAP_GROUP_SNAPSHOT_PAGE_SIZE", "1000"))
+
+
+# LDAP logins per second allowed for a username and client address (0 disables throttling)
+LDAP_THROTTLE_RATE = float(os.getenv("LDAP_THROTTLE_RATE", "0"))
+
+# LDAP logins a username and client address may make at once before the rate applies
+LDAP_THROTTLE_BURST = int(os.getenv("LDAP_THROTTLE_BURST", "10"))
+
+# Seconds LDAP logins are refused after a rejected password, doubled on every consecutive rejection
+LDAP_THROTTLE_BACKOFF = float(os.getenv("LDAP_THROTTLE_BACKOFF", "1"))
+
+# Upper bound of the rejected password backoff
+LDAP_THROTTLE_MAX_BACKOFF = float(os.getenv("LDAP_THROTTLE_MAX_BACKOFF", "300"))
+
+# Reverse proxies in front of MLflow whose X-Forwarded-For names the client address (0 uses the peer address)
+LDAP_TRUSTED_PROXIES = int(os.getenv("LDAP_TRUSTED_PROXIES", "0"))
+
+
+# Seconds a successful login is served from the credential cache (0 disables the cache)
+LDAP_CACHE_TTL = int(os.getenv("LDAP_CACHE_TTL", "60"))
+
+# Seconds a rejected login is remembered, so retries with a bad password skip LDAP
+LDAP_CACHE_NEGATIVE_TTL = int(os.getenv("LDAP_CACHE_NEGATIVE_TTL", "10"))
+
+# Maximum number of cached credentials, least recently used entries are evicted first
+LDAP_CACHE_MAX_SIZE = int(os.getenv("LDAP_CACHE_MAX_SIZE", "1024"))
+
+# Seconds an expired successful login is still accepted while LDAP is unreachable (0 disables)
+LDAP_CACHE_STALE_GRACE = int(os.getenv("LDAP_CACHE_STALE_GRACE", "0"))
+
+# Where cached logins live (values: memory | file | redis), file and redis are shared by all workers
+LDAP_CACHE_BACKEND = os.getenv("LDAP_CACHE_BACKEND", "memory")
+
+# SQLite file of the file cache backend
+LDAP_CACHE_PATH = os.getenv(
+    "LDAP_CACHE_PATH", os.path.join(tempfile.gettempdir(), "mlflowstack-ldap-cache.db")
+)
+
+# Redis URL of the redis cache backend, defaults to the one of the OIDC cache
+LDAP_CACHE_REDIS_URL = os.getenv(
+    "LDAP_CACHE_REDIS_URL", os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+)
+
+# Prefix of the redis cache backend keys
+LDAP_CACHE_REDIS_PREFIX = os.getenv("LDAP_CACHE_REDIS_PREFIX", "mlflowstack:ldap")
+
+# SQLite file keeping recently verified logins of the memory backend across restarts (off when empty)
+LDAP_CACHE_WARM_PATH = os.getenv("LDAP_CACHE_WARM_PATH", "")
+
+# Threads re-verifying logins loaded from the warm cache file against LDAP in the background
+LDAP_CACHE_WARM_REFRESH_WORKERS = int(os.getenv("LDAP_CACHE_WARM_REFRESH_WORKERS", "2"))
+
+# Secret salting the cache keys, required by the file and redis backends and the warm cache file (a random salt per worker otherwise)
+LDAP_CACHE_SECRET = os.getenv("LDAP_CACHE_SECRET", "")
+
+# PBKDF2 iterations used to derive the cache key from the password
+LDAP_CACHE_HASH_ITERATIONS = int(os.getenv("LDAP_CACHE_HASH_ITERATIONS", "1000"))
+
+
+# Number of pooled LDAP connections per worker (0 opens a new connection for every login)
+LDAP_POOL_SIZE = int(os.getenv("LDAP_POOL_SIZE", "0"))
+
+# Seconds a pooled connection is reused before it is closed and reopened
+LDAP_POOL_MAX_LIFETIME = int(os.getenv("LDAP_POOL_MAX_LIFETIME", "600"))
+
+# Seconds an unused pooled connection is kept open
+LDAP_POOL_IDLE_TIMEOUT = int(os.getenv("LDAP_POOL_IDLE_TIMEOUT", "60"))
+
+# Seconds a login waits for a free pooled connection
+LDAP_POOL_CHECKOUT_TIMEOUT = float(os.getenv("LDAP_POOL_CHECKOUT_TIMEOUT", "5"))
+
+# Pooled connections opened per server by the worker warm-up, at most LDAP_POOL_SIZE
+LDAP_POOL_PREFILL = int(os.getenv("LDAP_POOL_PREFILL", "1"))
+
+
+# Seconds to wait for the TCP (and TLS) connection to an LDAP server
+LDAP_CONNECT_TIMEOUT = float(os.getenv("LDAP_CONNECT_TIMEOUT", "5"))
+
+# Seconds to wait for an LDAP response
+LDAP_RECEIVE_TIMEOUT = float(os.getenv("LDAP_RECEIVE_TIMEOUT", "10"))
+
+# Threads running the LDAP round trips of asyncio logins, bounding how many are in flight
+LDAP_ASYNC_WORKERS = int(os.getenv("LDAP_ASYNC_WORKERS", "32"))
+
+# Consecutive LDAP outages after which logins fail fast (0 disables the circuit breaker)
+LDAP_BREAKER_FAILURES = int(os.getenv("LDAP_BREAKER_FAILURES", "5"))
+
+# Seconds the circuit breaker stays open before a trial login is let through
+LDAP_BREAKER_RESET_TIMEOUT = float(os.getenv("LDAP_BREAKER_RESET_TIMEOUT", "30"))
+
+# Seconds a failing LDAP server is ejected, doubled on every consecutive failure
+LDAP_SERVER_BACKOFF = float(os.getenv("LDAP_SERVER_BACKOFF", "5"))
+
+# Upper bound of the ejection backoff
+LDAP_SERVER_MAX_BACKOFF = float(os.getenv("LDAP_SERVER_MAX_BACKOFF", "300"))
+
+# Seconds between two health checks of the LDAP servers (only with several servers)
+LDAP_SERVER_HEALTH_INTERVAL = float(os.getenv("LDAP_SERVER_HEALTH_INTERVAL", "30"))
+
+# Seconds the root DSE and schema of a TLS server are reused before they are read again
+LDAP_SERVER_INFO_REFRESH = float(os.getenv("LDAP_SERVER_INFO_REFRESH", "3600"))
+
+# Directory caching the root DSE and schema for all workers (kept in memory only when empty)
+LDAP_SERVER_INFO_DIR = os.getenv("LDAP_SERVER_INFO_DIR", "")
+
+# Seconds a login waits for an identical login already in flight to finish
+LDAP_COALESCE_TIMEOUT = float(os.getenv("LDAP_COALESCE_TIMEOUT", "10"))
+
+# Secrets signing session tokens, comma-separated with the signing one first (sessions are off when empty)
+LDAP_SESSION_KEYS = os.getenv("LDAP_SESSION_KEYS", "")
+
+# Seconds a session token issued after a successful login is valid
+LDAP_SESSION_LIFETIME = int(os.getenv("LDAP_SESSION_LIFETIME", "900"))
+
+# Name of the cookie carrying the session token
+LDAP_SESSION_COOKIE = os.getenv("LDAP_SESSION_COOKIE", "mlflowstack_session")
+
+# Secret keying the HMAC digests of API keys stored in the auth database (API keys are off when empty)
+LDAP_API_KEY_SECRET = os.getenv("LDAP_API_KEY_SECRET", "")
+
+# Seconds a verified API key is served from the per-process cache
+LDAP_API_KEY_CACHE_TTL = int(os.getenv("LDAP_API_KEY_CACHE_TTL", "60"))
+
+# Seconds the last role synced to the auth store is remembered per user
+LDAP_USER_SYNC_TTL = int(os.getenv("LDAP_USER_SYNC_TTL", "3600"))
+
+# Seconds admin flag changes of known users are collected before a background thread writes them in one transaction (0 writes them on the request thread)
+LDAP_USER_SYNC_INTERVAL = float(os.getenv("LDAP_USER_SYNC_INTERVAL", "0"))
+
+# Number of collected users that triggers a write before the interval ends
+LDAP_USER_SYNC_BATCH_SIZE = int(os.getenv("LDAP_USER_SYNC_BATCH_SIZE", "500"))
+
+
+# Where structured auth events are written by a background thread (values: off | log | file)
+LDAP_AUDIT = os.getenv("LDAP_AUDIT", "off")
+
+# JSON lines file of the file audit sink
+LDAP_AUDIT_FILE = os.getenv(
+    "LDAP_AUDIT_FILE",
+    os.path.join(tempfile.gettempdir(), "mlflowstack-auth-audit.jsonl"),
+)
+
+# Auth events waiting to be written, further events are dropped and counted
+LDAP_AUDIT_QUEUE_SIZE = int(os.getenv("LDAP_AUDIT_QUEUE_SIZE", "10000"))
+
+# Maximum auth events written at once
+LDAP_AUDIT_BATCH_SIZE = int(os.getenv("LDAP_AUDIT_BATCH_SIZE", "100"))
+
+# Seconds the audit writer waits to fill a batch
+LDAP_AUDIT_FLUSH_INTERVAL = float(os.getenv("LDAP_AUDIT_FLUSH_INTERVAL", "1"))
+
+
 # TLS verification mapping for different security levels
 TLS_VERIFY_MAP = {
     "none": ssl.CERT_NONE,
@@ -56,9 +277,203 @@
     "required": ssl.CERT_REQUIRED,
 }
 
+# Admin and user group DNs normalized once, compared against normalized search results
+_GROUP_ADMIN_DN = normalize_dn(LDAP_GROUP_ADMIN_DN)
+_GROUP_USER_DN = normalize_dn(LDAP_GROUP_USER_DN)
+_GROUP_DNS = frozenset((_GROUP_ADMIN_DN, _GROUP_USER_DN))
+
+# Active Directory LDAP_MATCHING_RULE_IN_CHAIN, matches members of nested groups at any depth
+_MATCHING_RULE_IN_CHAIN = "1.2.840.113556.1.4.1941"
+
 # Default ports mapping for SSL and non-SSL connections
 _DEFAULT_PORTS = {True: 636, False: 389}  # ssl: port mapping
 
+# Servers in LDAP_URI are split on commas starting a new URI, base DNs contain commas too
+_URI_SEPARATOR = re.compile(r",\s*(?=ldaps?://)", re.IGNORECASE)
+
+# Guards lazy construction of the server pool and group snapshot, never held while talking to LDAP
+_server_lock = threading.Lock()
+
+# Fails logins fast while the directory is unreachable
+_breaker = (
+    CircuitBreaker(LDAP_BREAKER_FAILURES, LDAP_BREAKER_RESET_TIMEOUT)
+    if LDAP_BREAKER_FAILURES > 0
+    else None
+)
+
+# Errors meaning LDAP could not answer, as opposed to rejecting the credentials
+_LDAP_UNAVAILABLE = (LDAPCommunicationError, LDAPPoolTimeoutError, CircuitOpenError)
+
+# Bounds the LDAP logins of every username and client address, whatever clients retry
+_throttle = (
+    LoginThrottle(
+        LDAP_THROTTLE_RATE,
+        LDAP_THROTTLE_BURST,
+        LDAP_THROTTLE_BACKOFF,
+        LDAP_THROTTLE_MAX_BACKOFF,
+        LDAP_CACHE_MAX_SIZE,
+    )
+    if LDAP_THROTTLE_RATE > 0
+    else None
+)
+
+# Concurrent logins with the same credentials share one LDAP round trip
+_inflight = SingleFlight()
+
+# Signs the session tokens letting clients skip LDAP until they expire
+_sessions = (
+    SessionTokens(
+        [
+            key.strip().encode("utf-8")
+            for key in LDAP_SESSION_KEYS.split(",")
+            if key.strip()
+        ],
+        LDAP_SESSION_LIFETIME,
+    )
+    if LDAP_SESSION_KEYS.strip()
+    else None
+)
+
+# LDAP server that answered the current login, reported in its audit event
+_ldap_server: ContextVar[Union[str, None]] = ContextVar("ldap_server", default=None)
+
+# Last is_admin flag written to the auth store per user, so unchanged roles are not rewritten
+_synced_roles = TTLCache(LDAP_CACHE_MAX_SIZE)
+
+
+def _build_credential_cache():
+    if LDAP_CACHE_TTL <= 0:
+        return None
+    if LDAP_CACHE_BACKEND in ("file", "redis"):
+        _require_cache_secret(f"LDAP_CACHE_BACKEND={LDAP_CACHE_BACKEND}")
+    if LDAP_CACHE_BACKEND == "file":
+        return SQLiteCache(
+            LDAP_CACHE_PATH,
+            serialize=_dump_user,
+            deserialize=_load_user,
+            grace=LDAP_CACHE_STALE_GRACE,
+        )
+    if LDAP_CACHE_BACKEND == "redis":
+        return RedisCache(
+            LDAP_CACHE_REDIS_URL,
+            serialize=_dump_user,
+            deserialize=_load_user,
+            grace=LDAP_CACHE_STALE_GRACE,
+            prefix=LDAP_CACHE_REDIS_PREFIX,
+        )
+    return TTLCache(LDAP_CACHE_MAX_SIZE, grace=LDAP_CACHE_STALE_GRACE)
+
+
+def _build_warm_store():
+    if not LDAP_CACHE_WARM_PATH or not isinstance(_credential_cache, TTLCache):
+        return None
+    _require_cache_secret("LDAP_CACHE_WARM_PATH")
+    return SQLiteCache(
+        LDAP_CACHE_WARM_PATH, serialize=_dump_user, deserialize=_load_user
+    )
+
+
+def _require_cache_secret(setting: str) -> None:
+    # Digests stored next to their salt would only cost an offline guess the PBKDF2 iterations
+    if not LDAP_CACHE_SECRET:
+        raise MlflowException(
+            f"{setting} persists login digests outside the worker, set LDAP_CACHE_SECRET"
+        )
+
+
+def _dump_user(user: "UserInfo") -> str:
+    return json.dumps(asdict(user))
+
+
+def _load_user(value: str) -> "UserInfo":
+    return UserInfo(**json.loads(value))
+
+
+# Credential cache in front of resolve_user, keyed by username and salted password digest
+_credential_cache = _build_credential_cache()
+
+# Verified logins persisted on disk, loaded into the memory cache of every new worker
+_warm_store = _build_warm_store()
+
+# Keys loaded from the warm store that this worker has not verified against LDAP yet
+_warm_keys = set()
+_warm_lock = threading.Lock()
+
+# Re-verifies warm logins on their first use, off the request thread
+_warm_refresher = (
+    ThreadPoolExecutor(
+        max_workers=LDAP_CACHE_WARM_REFRESH_WORKERS,
+        thread_name_prefix="auth-warm-refresh",
+    )
+    if _warm_store is not None
+    else None
+)
+
+
+def get_cache_salt() -> bytes:
+    """Salt of the cache keys, the secret shared by every worker or a random one private to this worker."""
+    if not hasattr(get_cache_salt, "_cache"):
+        if LDAP_CACHE_SECRET:
+            get_cache_salt._cache = LDAP_CACHE_SECRET.encode("utf-8")
+        else:
+            get_cache_salt._cache = os.urandom(16)
+    return get_cache_salt._cache
+
+
+def load_warm_cache() -> int:
+    """Fill the memory cache with the unexpired logins of the warm store, returning how many were loaded."""
+    if _warm_store is None:
+        return 0
+    now = time.time()
+    entries = _warm_store.entries(LDAP_CACHE_MAX_SIZE)
+    # Latest expiring first, so the freshest entries are the last ones an LRU would evict
+    for key, user, expires_at in reversed(entries):
+        _credential_cache.set(key, user, expires_at - now)
+    with _warm_lock:
+        _warm_keys.update(key for key, _, _ in entries)
+    if entries:
+        logger.info(
+            f"Loaded {len(entries)} warm cached login(s) from {LDAP_CACHE_WARM_PATH}"
+        )
+    return len(entries)
+
+
+def _refresh_warm_login(key: tuple, username: str, password: str) -> None:
+    """Verify a login served from the warm store against LDAP once, without delaying the request."""
+    with _warm_lock:
+        if key not in _warm_keys:
+            return
+        _warm_keys.discard(key)
+    _warm_refresher.submit(_reverify_warm_login, key, username, password)
+
+
+def _reverify_warm_login(key: tuple, username: str, password: str) -> None:
+    try:
+        _inflight.do(
+            key,
+            lambda: _resolve_and_cache(key, username, password),
+            LDAP_COALESCE_TIMEOUT,
+        )
+    except ldap3.core.exceptions.LDAPBindError:
+        # The password changed since the login was persisted, the rejection is now cached
+        logger.info(f"Warm cached login of user {username} is no longer valid")
+        _warm_store.invalidate(username)
+    except Exception as e:
+        logger.warning(
+            f"Re-verifying the warm cached login of user {username} failed: {str(e)}"
+        )
+
+
+def invalidate_credentials(username: str = None) -> int:
+    """Forget the cached logins of one user, or of everyone, on all workers sharing the cache."""
+    if _credential_cache is None:
+        return 0
+    dropped = _credential_cache.invalidate(username)
+    if _warm_store is not None:
+        _warm_store.invalidate(username)
+    logger.info(f"Invalidated {dropped} cached login(s) of {username or 'all users'}")
+    return dropped
+
 
 @dataclass(frozen=True)
 class UserInfo:
@@ -76,163 +491,854 @@ def update(self) -> None:
         if not self.authenticated:
             return
 
-        # Combine create/update into single operation
-        (
-            _auth_store.update_user(self.name, str(abs(hash(self.name))), self.is_admin)
-            if _auth_store.has_user(self.name)
-            else _auth_store.create_user(
-                self.name, str(abs(hash(self.name))), self.is_admin
+        # Only write when the user is new or the admin flag changed since the last sync
+        synced = _synced_roles.get(self.name)
+        if synced == self.is_admin:
+            return
+
+        sync = get_user_sync()
+        if sync is None:
+            _upsert_user(self.name, self.is_admin)
+        else:
+            stored = synced if synced is not None else _stored_role(self.name)
+            if stored is None:
+                # MLflow reads the user right after authentication, so a missing user
+                # is created before the request goes on
+                _upsert_user(self.name, self.is_admin)
+            elif stored != self.is_admin:
+                sync.submit(self.name, self.is_admin)
+        _synced_roles.set(self.name, self.is_admin, LDAP_USER_SYNC_TTL)
+
+
+def _watch_user_deletion(store) -> None:
+    """Forget the synced role of users deleted from the auth store, so their next login creates them again."""
+    delete_user, get_user = store.delete_user, store.get_user
+
+    def deleting(username: str, *args, **kwargs):
+        try:
+            return delete_user(username, *args, **kwargs)
+        finally:
+            _synced_roles.pop(username)
+
+    def getting(username: str, *args, **kwargs):
+        try:
+            return get_user(username, *args, **kwargs)
+        except MlflowException as e:
+            # Deleted through another worker, which is the only one that saw the deletion
+            if e.error_code == ErrorCode.Name(RESOURCE_DOES_NOT_EXIST):
+                _synced_roles.pop(username)
+            raise
+
+    store.delete_user = deleting
+    store.get_user = getting
+
+
+def _stored_role(name: str) -> Union[bool, None]:
+    """Admin flag of the user in the auth store, None when the user does not exist."""
+    with _auth_store.ManagedSessionMaker() as session:
+        return session.query(SqlUser.is_admin).filter(SqlUser.username == name).scalar()
+
+
+def _upsert_user(name: str, is_admin: bool) -> None:
+    """Write the admin flag with a single UPDATE and only create (and hash a password for) missing users."""
+    for _ in range(2):
+        with _auth_store.ManagedSessionMaker(read_only=False) as session:
+            updated = (
+                session.query(SqlUser)
+                .filter(SqlUser.username == name)
+                .update({SqlUser.is_admin: is_admin}, synchronize_session=False)
             )
-        )
+        if updated:
+            AUTH_STORE_WRITES.labels("update").inc()
+            # The UPDATE bypasses the store methods the permission cache watches
+            permissions.invalidate()
+            return
+        try:
+            _auth_store.create_user(name, str(abs(hash(name))), is_admin)
+            AUTH_STORE_WRITES.labels("create").inc()
+            return
+        except MlflowException as e:
+            # Another worker created the user in the meantime, update it instead
+            if e.error_code != ErrorCode.Name(RESOURCE_ALREADY_EXISTS):
+                raise
+
+
+def _write_users(users: dict) -> None:
+    """Write the admin flags of a batch of known users in one transaction."""
+    changed = {
+        is_admin: [name for name, flag in users.items() if flag == is_admin]
+        for is_admin in (False, True)
+    }
+    try:
+        with _auth_store.ManagedSessionMaker(read_only=False) as session:
+            updated = sum(
+                session.query(SqlUser)
+                .filter(SqlUser.username.in_(names))
+                .update({SqlUser.is_admin: is_admin}, synchronize_session=False)
+                for is_admin, names in changed.items()
+                if names
+            )
+    except Exception:
+        for name in users:
+            # Written again on its next login
+            _synced_roles.pop(name)
+        raise
+
+    AUTH_STORE_WRITES.labels("update").inc(updated)
+    if updated:
+        # The UPDATE bypasses the store methods the permission cache watches
+        permissions.invalidate()
+
+
+def get_parsed_ldap_uris(force_refresh=False) -> list:
+    """Parse the comma-separated LDAP_URI into one entry per server."""
+    if not hasattr(get_parsed_ldap_uris, "_cache") or force_refresh:
+        get_parsed_ldap_uris._cache = [
+            ldap3.utils.uri.parse_uri(uri.strip())
+            for uri in _URI_SEPARATOR.split(os.getenv("LDAP_URI", ""))
+            if uri.strip()
+        ]
+    return get_parsed_ldap_uris._cache
 
 
 def get_parsed_ldap_uri(force_refresh=False):
-    if not hasattr(get_parsed_ldap_uri, "_cache") or force_refresh:
-        get_parsed_ldap_uri._cache = ldap3.utils.uri.parse_uri(
-            os.getenv("LDAP_URI", "")
+    uris = get_parsed_ldap_uris(force_refresh)
+    return uris[0] if uris else None
+
+
+def _build_server(uri: dict) -> ldap3.Server:
+    # Get port from URI or use default based on SSL status
+    port = uri["port"] or _DEFAULT_PORTS[uri["ssl"]]
+
+    # Configure TLS if SSL is enabled or CA certificate is provided
+    tls = None
+    if uri["ssl"] or LDAP_CA:
+        tls = ldap3.Tls(
+            validate=TLS_VERIFY_MAP.get(LDAP_TLS_VERIFY, ssl.CERT_REQUIRED),
+            ca_certs_file=LDAP_CA if LDAP_CA else None,
         )
-    return get_parsed_ldap_uri._cache
 
+    return ldap3.Server(
+        host=uri["host"],
+        port=port,
+        use_ssl=uri["ssl"],
+        tls=tls,
+        # Connections never read the server info themselves, see _fetch_server_info
+        get_info=ldap3.NONE,
+        connect_timeout=LDAP_CONNECT_TIMEOUT,
+    )
+
+
+def _fetch_server_info(server: ldap3.Server):
+    """Read the root DSE and schema of the server once, through a probe Server asking for them."""
+    probe = ldap3.Server(
+        host=server.host,
+        port=server.port,
+        use_ssl=server.ssl,
+        tls=server.tls,
+        get_info=ldap3.ALL,
+        connect_timeout=LDAP_CONNECT_TIMEOUT,
+    )
+    with ldap3.Connection(
+        server=probe,
+        user=LDAP_BIND_DN or None,
+        password=LDAP_BIND_PASSWORD or None,
+        client_strategy=ldap3.SAFE_SYNC,
+        auto_bind=True,
+        read_only=True,
+        receive_timeout=LDAP_RECEIVE_TIMEOUT,
+    ):
+        return probe.info, probe.schema
 
-def resolve_user(username: str, password: str) -> UserInfo:
-    """Authenticate user against LDAP and resolve group membership."""
-    try:
-        uri = get_parsed_ldap_uri()
-        # Get port from URI or use default based on SSL status
-        port = uri["port"] or _DEFAULT_PORTS[uri["ssl"]]
-
-        # Configure TLS if SSL is enabled or CA certificate is provided
-        tls = None
-        if uri["ssl"] or LDAP_CA:
-            tls = ldap3.Tls(
-                validate=TLS_VERIFY_MAP.get(LDAP_TLS_VERIFY, ssl.CERT_REQUIRED),
-                ca_certs_file=LDAP_CA if LDAP_CA else None,
-            )
 
-        # Initialize LDAP server connection
-        server = ldap3.Server(
-            host=uri["host"],
-            port=port,
-            use_ssl=uri["ssl"],
-            tls=tls,
-            get_info=ldap3.ALL if tls else ldap3.NONE,
+def get_api_keys() -> Union[ApiKeyStore, None]:
+    """Return the API key store on the auth database, or None when API keys are off."""
+    if not LDAP_API_KEY_SECRET:
+        return None
+    if not hasattr(get_api_keys, "_cache"):
+        with _server_lock:
+            if not hasattr(get_api_keys, "_cache"):
+                get_api_keys._cache = ApiKeyStore(
+                    _auth_store.engine,
+                    LDAP_API_KEY_SECRET.encode("utf-8"),
+                    cache_ttl=LDAP_API_KEY_CACHE_TTL,
+                    cache_size=LDAP_CACHE_MAX_SIZE,
+                )
+    return get_api_keys._cache
+
+
+def get_audit_log() -> Union[AuditLog, None]:
+    """Return the worker's audit log, its writer thread started on first use, or None when auditing is off."""
+    if LDAP_AUDIT not in ("log", "file"):
+        return None
+    if not hasattr(get_audit_log, "_cache"):
+        with _server_lock:
+            if not hasattr(get_audit_log, "_cache"):
+                audit = AuditLog(
+                    write=(
+                        FileWriter(LDAP_AUDIT_FILE)
+                        if LDAP_AUDIT == "file"
+                        else log_writer
+                    ),
+                    queue_size=LDAP_AUDIT_QUEUE_SIZE,
+                    batch_size=LDAP_AUDIT_BATCH_SIZE,
+                    flush_interval=LDAP_AUDIT_FLUSH_INTERVAL,
+                    on_drop=AUDIT_EVENTS_DROPPED.inc,
+                )
+                audit.start()
+                get_audit_log._cache = audit
+    return get_audit_log._cache
+
+
+def get_user_sync() -> Union[UserSync, None]:
+    """Return the worker's background writer of users to the auth store, or None when users are written on the request thread."""
+    if LDAP_USER_SYNC_INTERVAL <= 0:
+        return None
+    if not hasattr(get_user_sync, "_cache"):
+        with _server_lock:
+            if not hasattr(get_user_sync, "_cache"):
+                sync = UserSync(
+                    write=_write_users,
+                    batch_size=LDAP_USER_SYNC_BATCH_SIZE,
+                    flush_interval=LDAP_USER_SYNC_INTERVAL,
+                )
+                sync.start()
+                get_user_sync._cache = sync
+    return get_user_sync._cache
+
+
+def get_login_executor() -> ThreadPoolExecutor:
+    """Return the worker's bounded thread pool running the LDAP round trips of asyncio logins."""
+    if not hasattr(get_login_executor, "_cache"):
+        with _server_lock:
+            if not hasattr(get_login_executor, "_cache"):
+                get_login_executor._cache = ThreadPoolExecutor(
+                    max_workers=LDAP_ASYNC_WORKERS, thread_name_prefix="ldap-login"
+                )
+    return get_login_executor._cache
+
+
+def get_ldap_servers(force_refresh=False) -> list:
+    """Build the LDAP Servers (and their Tls settings) once and share them between all connections."""
+    if not hasattr(get_ldap_servers, "_cache") or force_refresh:
+        get_ldap_servers._cache = [
+            _build_server(uri) for uri in get_parsed_ldap_uris(force_refresh)
+        ]
+    return get_ldap_servers._cache
+
+
+def get_ldap_server(force_refresh=False) -> ldap3.Server:
+    return get_ldap_servers(force_refresh)[0]
+
+
+def get_server_pool() -> ServerPool:
+    """Return the worker's server pool, with a connection pool per server when pooling is enabled."""
+    if not hasattr(get_server_pool, "_cache"):
+        with _server_lock:
+            if not hasattr(get_server_pool, "_cache"):
+                servers = ServerPool(
+                    [
+                        ServerState(
+                            server=server,
+                            pool=(
+                                LDAPConnectionPool(
+                                    server=server,
+                                    size=LDAP_POOL_SIZE,
+                                    max_lifetime=LDAP_POOL_MAX_LIFETIME,
+                                    idle_timeout=LDAP_POOL_IDLE_TIMEOUT,
+                                    checkout_timeout=LDAP_POOL_CHECKOUT_TIMEOUT,
+                                    receive_timeout=LDAP_RECEIVE_TIMEOUT,
+                                )
+                                if LDAP_POOL_SIZE > 0
+                                else None
+                            ),
+                            # Only TLS servers expose their info and schema, as before
+                            info=(
+                                ServerInfoLoader(
+                                    server=server,
+                                    fetch=lambda server=server: _fetch_server_info(
+                                        server
+                                    ),
+                                    max_age=LDAP_SERVER_INFO_REFRESH,
+                                    directory=LDAP_SERVER_INFO_DIR,
+                                )
+                                if uri["ssl"] or LDAP_CA
+                                else None
+                            ),
+                        )
+                        for uri, server in zip(
+                            get_parsed_ldap_uris(), get_ldap_servers()
+                        )
+                    ],
+                    backoff=LDAP_SERVER_BACKOFF,
+                    max_backoff=LDAP_SERVER_MAX_BACKOFF,
+                )
+                # A single server has nothing to fail over to
+                if len(servers.states) > 1 and LDAP_SERVER_HEALTH_INTERVAL > 0:
+                    servers.start_health_checks(LDAP_SERVER_HEALTH_INTERVAL)
+                get_server_pool._cache = servers
+    return get_server_pool._cache
+
+
+@contextmanager
+def _failover(connect):
+    """Yield a connection from the fastest healthy server, moving on to the next one on network errors."""
+    servers = get_server_pool()
+    error = None
+    for state in servers.candidates():
+        # Stale info is read again in the background, never while a user waits on the login
+        if state.info is not None and not servers.is_ejected(state):
+            state.info.refresh()
+        stack = ExitStack()
+        started = time.perf_counter()
+        try:
+            c = stack.enter_context(connect(state))
+        except LDAPCommunicationError as e:
+            servers.record_failure(state)
+            error = e
+            continue
+        elapsed = time.perf_counter() - started
+        servers.record_success(state, elapsed)
+        LDAP_BIND_SECONDS.labels(state.name).observe(elapsed)
+        _ldap_server.set(state.name)
+
+        with stack:
+            try:
+                yield c
+            except LDAPCommunicationError:
+                servers.record_failure(state)
+                raise
+        return
+    raise error or LDAPCommunicationError("No LDAP server configured")
+
+
+def service_connection():
+    """Open a connection bound as the service account, used for background directory reads."""
+    return _failover(
+        lambda state: ldap3.Connection(
+            server=state.server,
+            user=LDAP_BIND_DN or None,
+            password=LDAP_BIND_PASSWORD or None,
+            client_strategy=ldap3.SAFE_SYNC,
+            auto_bind=True,
+            read_only=True,
+            receive_timeout=LDAP_RECEIVE_TIMEOUT,
         )
+    )
 
-        # Escape special characters in username
-        escaped_username = ldap3.utils.dn.escape_rdn(username)
-        # Format bind user string with escaped username
-        bind_user = LDAP_LOOKUP_BIND % escaped_username
 
-        with ldap3.Connection(
-            server=server,
+def warm_up() -> None:
+    """Build the servers, open pooled connections and run one lightweight search, so the first login finds everything ready."""
+    get_cache_salt()
+    get_api_keys()
+    get_audit_log()
+    servers = get_server_pool()
+    for state in servers.states:
+        if state.info is not None:
+            state.info.ensure()
+        if state.pool is not None:
+            try:
+                state.pool.prefill(LDAP_POOL_PREFILL)
+            except LDAPCommunicationError as e:
+                logger.warning(
+                    f"Opening pooled connections to {state.name} failed: {str(e)}"
+                )
+
+    # Binds the service account and reads one entry, completing the TLS handshake of the fastest server
+    with service_connection() as c:
+        c.search(
+            search_base=LDAP_GROUP_SEARCH_BASE_DN,
+            search_filter="(objectClass=*)",
+            search_scope=ldap3.BASE,
+            attributes=ldap3.NO_ATTRIBUTES,
+            size_limit=1,
+            time_limit=LDAP_SEARCH_TIME_LIMIT,
+        )
+    get_group_snapshot()
+
+
+def get_group_snapshot():
+    """Return the worker's group snapshot, started on first use, or None for other resolutions."""
+    if LDAP_GROUP_RESOLUTION != "snapshot":
+        return None
+    if not hasattr(get_group_snapshot, "_cache"):
+        snapshot = None
+        with _server_lock:
+            if not hasattr(get_group_snapshot, "_cache"):
+                snapshot = GroupSnapshot(
+                    connect=service_connection,
+                    group_dns=[LDAP_GROUP_ADMIN_DN, LDAP_GROUP_USER_DN],
+                    member_attribute=LDAP_GROUP_MEMBER_ATTRIBUTE,
+                    interval=LDAP_GROUP_SNAPSHOT_INTERVAL,
+                    page_size=LDAP_GROUP_SNAPSHOT_PAGE_SIZE,
+                    nested_base=(
+                        LDAP_GROUP_SEARCH_BASE_DN if LDAP_GROUP_NESTED else ""
+                    ),
+                )
+                get_group_snapshot._cache = snapshot
+        # Started outside the lock, its loads open connections through get_server_pool
+        if snapshot is not None:
+            snapshot.start()
+    return get_group_snapshot._cache
+
+
+def ldap_connection(bind_user: str, password: str):
+    """Yield a connection bound as the user, borrowed from the pool when pooling is enabled."""
+
+    def connect(state: ServerState):
+        if state.pool is not None:
+            return state.pool.connection(bind_user, password)
+        return ldap3.Connection(
+            server=state.server,
             user=bind_user,
             password=password,
             client_strategy=ldap3.SAFE_SYNC,
             auto_bind=True,
             read_only=True,
-        ) as c:
+            receive_timeout=LDAP_RECEIVE_TIMEOUT,
+        )
+
+    return _failover(connect)
+
+
+def resolve_user(username: str, password: str) -> UserInfo:
+    """Authenticate user against LDAP and resolve group membership."""
+    try:
+        # Escape special characters in username
+        escaped_username = ldap3.utils.dn.escape_rdn(username)
+        # Format bind user string with escaped username
+        bind_user = LDAP_LOOKUP_BIND % escaped_username
+        snapshot = get_group_snapshot()
+
+        with ldap_connection(bind_user, password) as c:
+            if snapshot is not None and snapshot.ready:
+                # The bind verified the password, membership comes from memory
+                return _resolved_user(
+                    username,
+                    is_admin=snapshot.is_member(LDAP_GROUP_ADMIN_DN, bind_user),
+                    is_user=snapshot.is_member(LDAP_GROUP_USER_DN, bind_user),
+                )
+
+            if LDAP_GROUP_RESOLUTION == "memberof":
+                return _resolve_from_member_of(c, username, bind_user)
+
+            if LDAP_GROUP_RESOLUTION == "inchain":
+                return _resolve_in_chain(c, username, bind_user)
+
             # Search for user's group memberships
-            status, _, result, _ = c.search(
-                search_base=LDAP_GROUP_SEARCH_BASE_DN,
-                search_filter=LDAP_GROUP_SEARCH_FILTER % bind_user,
-                search_scope=ldap3.SUBTREE,
-                attributes=LDAP_GROUP_ATTRIBUTE,
-                get_operational_attributes=False,
-            )
+            with LDAP_SEARCH_SECONDS.time():
+                status, _, result, _ = c.search(
+                    search_base=LDAP_GROUP_SEARCH_BASE_DN,
+                    search_filter=LDAP_GROUP_SEARCH_FILTER % bind_user,
+                    search_scope=ldap3.SUBTREE,
+                    attributes=LDAP_GROUP_ATTRIBUTE,
+                    get_operational_attributes=False,
+                    size_limit=LDAP_SEARCH_SIZE_LIMIT,
+                    time_limit=LDAP_SEARCH_TIME_LIMIT,
+                )
 
             if not status:
                 logger.warning(f"Search failed for user {username}")
                 return UserInfo(name=username)
 
-            # Check for admin group membership
-            is_admin = any(
-                (
-                    check_group_dn(
-                        g,
-                        LDAP_GROUP_ADMIN_DN,
-                        LDAP_GROUP_ATTRIBUTE_KEY,
-                        LDAP_GROUP_ATTRIBUTE,
-                    )
-                    if LDAP_GROUP_ATTRIBUTE_KEY
-                    else (g.get(LDAP_GROUP_ATTRIBUTE, None) == LDAP_GROUP_ADMIN_DN)
-                )
-                for g in result
+            # Member values are normalized in one pass, stopping once both groups were seen
+            group_dns = frozenset().union(*(_group_dns(g) for g in result))
+            return _resolved_user(
+                username,
+                is_admin=_GROUP_ADMIN_DN in group_dns,
+                is_user=_GROUP_USER_DN in group_dns,
             )
-            if is_admin:
-                logger.info(f"User {username} authenticated as admin")
-                return UserInfo(name=username, is_admin=True)
-
-            # Check for regular user group membership
-            is_user = any(
-                (
-                    check_group_dn(
-                        g,
-                        LDAP_GROUP_USER_DN,
-                        LDAP_GROUP_ATTRIBUTE_KEY,
-                        LDAP_GROUP_ATTRIBUTE,
-                    )
-                    if LDAP_GROUP_ATTRIBUTE_KEY
-                    else g.get(LDAP_GROUP_ATTRIBUTE, None) == LDAP_GROUP_USER_DN
-                )
-                for g in result
-            )
-            if is_user:
-                logger.info(f"User {username} authenticated as regular user")
-            else:
-                logger.warning(f"User {username} not found in any authorized groups")
-            return UserInfo(name=username, is_user=is_user)
+    except ldap3.core.exceptions.LDAPBindError:
+        # Rejected credentials are an expected outcome, logged once by the caller
+        raise
     except Exception as e:
         logger.error(f"Error resolving user {username}: {str(e)}", exc_info=True)
         raise
 
 
+def _resolve_from_member_of(c, username: str, bind_user: str) -> UserInfo:
+    """Read the group DNs listed on the user entry itself with a single BASE search."""
+    with LDAP_SEARCH_SECONDS.time():
+        status, _, result, _ = c.search(
+            search_base=bind_user,
+            search_filter="(objectClass=*)",
+            search_scope=ldap3.BASE,
+            attributes=[LDAP_USER_MEMBEROF_ATTRIBUTE],
+            get_operational_attributes=False,
+            size_limit=1,
+            time_limit=LDAP_SEARCH_TIME_LIMIT,
+        )
+
+    if not status or not result:
+        logger.warning(f"Reading the groups of user {username} failed")
+        return UserInfo(name=username)
+
+    groups = result[0].get("attributes", {}).get(LDAP_USER_MEMBEROF_ATTRIBUTE, [])
+    if isinstance(groups, str):
+        groups = [groups]
+    group_dns = {normalize_dn(g) for g in groups}
+    return _resolved_user(
+        username,
+        is_admin=_GROUP_ADMIN_DN in group_dns,
+        is_user=_GROUP_USER_DN in group_dns,
+    )
+
+
+def _resolve_in_chain(c, username: str, bind_user: str) -> UserInfo:
+    """Ask Active Directory which of the admin and user groups contain the user, nested or not, in one search."""
+    escape = ldap3.utils.conv.escape_filter_chars
+    groups = "".join(
+        f"(distinguishedName={escape(dn)})"
+        for dn in (LDAP_GROUP_ADMIN_DN, LDAP_GROUP_USER_DN)
+        if dn
+    )
+    with LDAP_SEARCH_SECONDS.time():
+        status, _, result, _ = c.search(
+            search_base=LDAP_GROUP_SEARCH_BASE_DN,
+            search_filter=(
+                f"(&(|{groups})(member:{_MATCHING_RULE_IN_CHAIN}:={escape(bind_user)}))"
+            ),
+            search_scope=ldap3.SUBTREE,
+            attributes=ldap3.NO_ATTRIBUTES,
+            get_operational_attributes=False,
+            size_limit=2,
+            time_limit=LDAP_SEARCH_TIME_LIMIT,
+        )
+
+    if not status:
+        logger.warning(f"Search failed for user {username}")
+        return UserInfo(name=username)
+
+    group_dns = {
+        normalize_dn(g["dn"]) for g in result if g.get("type") == "searchResEntry"
+    }
+    return _resolved_user(
+        username,
+        is_admin=_GROUP_ADMIN_DN in group_dns,
+        is_user=_GROUP_USER_DN in group_dns,
+    )
+
+
+def _resolved_user(
+    username: str, is_admin: bool = False, is_user: bool = False
+) -> UserInfo:
+    """Log the membership decision and build the resulting UserInfo."""
+    if is_admin:
+        logger.info(f"User {username} authenticated as admin")
+        return UserInfo(name=username, is_admin=True)
+    if is_user:
+        logger.info(f"User {username} authenticated as regular user")
+    else:
+        logger.warning(f"User {username} not found in any authorized groups")
+    return UserInfo(name=username, is_user=is_user)
+
+
+def authenticate_user(username: str, password: str, client: str = None) -> UserInfo:
+    """Resolve the user through the credential cache, only falling back to LDAP on a miss within the client's login budget."""
+    key = _credential_key(username, password)
+    if _credential_cache is not None:
+        user = _credential_cache.get(key)
+        AUTH_CACHE_LOOKUPS.labels("miss" if user is None else "hit").inc()
+        if user is not None:
+            if _warm_store is not None:
+                _refresh_warm_login(key, username, password)
+            return user
+
+    try:
+        # Identical logins arriving together wait for the first one instead of each hitting LDAP,
+        # only that one spends a token of the login budget
+        user = _inflight.do(
+            key,
+            lambda: _throttled_resolve(key, username, password, client),
+            LDAP_COALESCE_TIMEOUT,
+        )
+    except _LDAP_UNAVAILABLE as e:
+        stale = _credential_cache.get_stale(key) if _credential_cache else None
+        if stale is not None and stale.authenticated:
+            AUTH_CACHE_LOOKUPS.labels("stale").inc()
+            logger.warning(
+                f"LDAP unavailable ({str(e)}), accepting recently verified user {username}"
+            )
+            return stale
+        raise
+
+    return user
+
+
+def _throttled_resolve(
+    key: tuple, username: str, password: str, client: str
+) -> UserInfo:
+    if _throttle is None:
+        return _resolve_and_cache(key, username, password)
+    try:
+        _throttle.acquire((username, client))
+    except LoginThrottledError as e:
+        LOGIN_THROTTLED.labels(e.reason).inc()
+        raise
+    try:
+        user = _resolve_and_cache(key, username, password)
+    except ldap3.core.exceptions.LDAPBindError:
+        _throttle.record_failure((username, client))
+        raise
+    if user.authenticated:
+        _throttle.record_success((username, client))
+    return user
+
+
+async def authenticate_user_async(
+    username: str, password: str, client: str = None
+) -> UserInfo:
+    """Resolve the user like authenticate_user without blocking the event loop, LDAP round trips run on a bounded thread pool."""
+    if isinstance(_credential_cache, TTLCache):
+        # Memory cache hits are answered on the event loop, without a thread hop
+        key = _credential_key(username, password)
+        user = _credential_cache.get(key)
+        if user is not None:
+            AUTH_CACHE_LOOKUPS.labels("hit").inc()
+            if _warm_store is not None:
+                _refresh_warm_login(key, username, password)
+            return user
+    return await asyncio.get_running_loop().run_in_executor(
+        get_login_executor(), authenticate_user, username, password, client
+    )
+
+
+def _credential_key(username: str, password: str) -> tuple:
+    return (
+        username,
+        credential_digest(
+            username, password, get_cache_salt(), LDAP_CACHE_HASH_ITERATIONS
+        ),
+    )
+
+
+def _resolve_and_cache(key: tuple, username: str, password: str) -> UserInfo:
+    if _breaker is not None:
+        _breaker.before_call()
+
+    try:
+        user = resolve_user(username, password)
+    except ldap3.core.exceptions.LDAPBindError:
+        # The directory answered, only the credentials are wrong
+        if _breaker is not None:
+            _breaker.record_success()
+        # Remember the rejected password, connection errors are never cached
+        if _credential_cache is not None:
+            _credential_cache.set(key, UserInfo(name=username), LDAP_CACHE_NEGATIVE_TTL)
+        raise
+    except _LDAP_UNAVAILABLE:
+        if _breaker is not None:
+            _breaker.record_failure()
+        raise
+
+    if _breaker is not None:
+        _breaker.record_success()
+    if _credential_cache is not None:
+        _credential_cache.set(
+            key, user, LDAP_CACHE_TTL if user.authenticated else LDAP_CACHE_NEGATIVE_TTL
+        )
+    if _warm_store is not None and user.authenticated:
+        _warm_store.set(key, user, LDAP_CACHE_TTL)
+    return user
+
+
+def _group_dns(group: dict) -> frozenset:
+    """Admin and user group DNs held by the group attribute of a search result entry."""
+    if LDAP_GROUP_ATTRIBUTE_KEY:
+        return matching_dns(
+            group.get(LDAP_GROUP_ATTRIBUTE_KEY, {}).get(LDAP_GROUP_ATTRIBUTE, None),
+            _GROUP_DNS,
+        )
+    return matching_dns(group.get(LDAP_GROUP_ATTRIBUTE, None), _GROUP_DNS)
+
+
 def check_group_dn(
     group: object, group_dn: str, group_attribute_key: str, group_attribute: str
 ):
     group_attribute_value = group.get(group_attribute_key, {})
     group_value = group_attribute_value.get(group_attribute, None)
 
-    if isinstance(group_value, list):
-        return group_dn in group_value
-    else:
-        return group_dn == group_value
+    return bool(matching_dns(group_value, frozenset((normalize_dn(group_dn),))))
 
 
+@AUTH_REQUEST_SECONDS.time()
 def authenticate_request_basic_auth() -> Union[Authorization, Response]:
     """Using for the basic.ini as auth function, authenticate the incoming request, grant the admin role if the user is in the admin group; otherwise, grant normal user access"""
+    # MLflow calls the auth function several times per request, the first answer holds for all
+    # so its outcome, latency and audit event are recorded once
+    if "mlflowstack_ldap_auth" in g:
+        return g.mlflowstack_ldap_auth
+    g.mlflowstack_ldap_auth = result = _authenticate_request()
+    return result
+
+
+def _authenticate_request() -> Union[Authorization, Response]:
+    started = time.perf_counter()
+    _ldap_server.set(None)
+    session = _request_session()
+    if session is not None:
+        _record_outcome("session", session.username, started)
+        return Authorization("basic", {"username": session.username})
+
+    api_key = _request_api_key()
+    if api_key is not None:
+        return _authenticate_api_key(api_key, started)
+
     if request.authorization is None:
         logger.warning("Authentication cancelled by user")
+        _record_outcome("unauthorized", None, started)
         return _unauthorized_response("Your login has been cancelled")
 
-    if not request.authorization.username or not request.authorization.password:
+    username = request.authorization.username
+    if not username or not request.authorization.password:
         logger.warning("Empty username or password provided")
+        _record_outcome("unauthorized", username, started)
         return _unauthorized_response("Username or password cannot be empty.")
 
     try:
-        user = resolve_user(
-            request.authorization.username, request.authorization.password
+        user = authenticate_user(
+            username,
+            request.authorization.password,
+            client_address(request.remote_addr, request.headers.get("X-Forwarded-For")),
+        )
+    except LoginThrottledError as e:
+        # Refused without asking LDAP, Retry-After tells well-behaved clients when to come back
+        logger.warning(f"Authentication throttled for user {username}: {str(e)}")
+        _record_outcome("throttled", username, started)
+        response = _unauthorized_response("Too many login attempts, try again later.")
+        response.headers["Retry-After"] = str(max(1, round(e.retry_after)))
+        return response
+    except ldap3.core.exceptions.LDAPBindError as e:
+        # Wrong passwords are frequent, their traceback says nothing
+        logger.warning(f"Authentication failed for user {username}: {str(e)}")
+        _record_outcome("unauthorized", username, started)
+        return _unauthorized_response(
+            "Please ensure you are included in the group and input correct credentials!"
         )
     except Exception as e:
         logger.error(
-            f"Authentication failed for user {request.authorization.username}: {str(e)}",
-            exc_info=True,
+            f"Authentication failed for user {username}: {str(e)}",
+            exc_info=not isinstance(e, _LDAP_UNAVAILABLE),
         )
+        _record_outcome("error", username, started)
         return _unauthorized_response(
             "Please ensure you are included in the group and input correct credentials!"
         )
 
     if user.authenticated:
         user.update()
+        _issue_session(user)
+        _record_outcome("admin" if user.is_admin else "user", username, started)
         return request.authorization
 
     logger.warning(
-        f"Authentication failed for user {request.authorization.username}: not in authorized groups"
+        f"Authentication failed for user {username}: not in authorized groups"
     )
+    _record_outcome("unauthorized", username, started)
     return _unauthorized_response(
         "Please ensure you are included in the group and input correct credentials!"
     )
 
 
+def _record_outcome(outcome: str, username: Union[str, None], started: float) -> None:
+    """Count the authentication decision and queue its audit event, never blocking the request."""
+    AUTH_OUTCOMES.labels(outcome).inc()
+    audit = get_audit_log()
+    if audit is not None:
+        audit.record(
+            user=username,
+            outcome=outcome,
+            latency_ms=round((time.perf_counter() - started) * 1000, 3),
+            server=_ldap_server.get(),
+            remote_addr=client_address(
+                request.remote_addr, request.headers.get("X-Forwarded-For")
+            ),
+        )
+
+
+def client_address(
+    remote_addr: Union[str, None], forwarded_for: Union[str, None]
+) -> Union[str, None]:
+    """Address of the client, taken from X-Forwarded-For as written by the trusted proxies."""
+    if LDAP_TRUSTED_PROXIES <= 0 or not forwarded_for:
+        return remote_addr
+    # Each trusted proxy appends the address it got the request from, anything further left is client supplied
+    hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+    if len(hops) < LDAP_TRUSTED_PROXIES:
+        return remote_addr
+    return hops[-LDAP_TRUSTED_PROXIES]
+
+
+def _request_api_key() -> Union[str, None]:
+    """Return the API key sent as bearer token or basic auth password, if API keys are on."""
+    if not LDAP_API_KEY_SECRET or request.authorization is None:
+        return None
+    key = request.authorization.token or request.authorization.password
+    return key if key and is_api_key(key) else None
+
+
+def _authenticate_api_key(key: str, started: float) -> Union[Authorization, Response]:
+    """Authenticate a machine identity by its API key, without contacting LDAP."""
+    username = request.authorization.username
+    try:
+        api_key = get_api_keys().verify(key)
+    except Exception as e:
+        logger.error(
+            f"Verifying the API key of user {username or 'unknown'} failed: {str(e)}",
+            exc_info=True,
+        )
+        _record_outcome("error", username or None, started)
+        return _unauthorized_response("Invalid API key.")
+    if api_key is None or (username and username != api_key.username):
+        logger.warning(f"Invalid API key presented for user {username or 'unknown'}")
+        _record_outcome("unauthorized", username or None, started)
+        return _unauthorized_response("Invalid API key.")
+
+    user = UserInfo(name=api_key.username, is_user=True, is_admin=api_key.is_admin)
+    user.update()
+    _record_outcome("api_key", api_key.username, started)
+    return Authorization("basic", {"username": api_key.username})
+
+
+def _request_session() -> Union[Session, None]:
+    """Verify the session token sent as cookie or bearer token, without LDAP or database access."""
+    if _sessions is None:
+        return None
+    token = request.cookies.get(LDAP_SESSION_COOKIE)
+    if token is None and request.authorization is not None:
+        token = request.authorization.token
+    if not token:
+        return None
+    session = _sessions.verify(token)
+    if session is None:
+        return None
+    # Basic auth credentials of another user win over a leftover cookie
+    if request.authorization is not None and request.authorization.username:
+        if request.authorization.username != session.username:
+            return None
+    return session
+
+
+def _issue_session(user: UserInfo) -> None:
+    """Hand a session token to the client as cookie, once per request."""
+    if _sessions is None or g.get("mlflowstack_session_issued"):
+        return
+    g.mlflowstack_session_issued = True
+    token = _sessions.issue(user.name, user.is_admin)
+
+    @after_this_request
+    def set_session_cookie(response: Response) -> Response:
+        response.set_cookie(
+            LDAP_SESSION_COOKIE,
+            token,
+            max_age=LDAP_SESSION_LIFETIME,
+            secure=request.is_secure,
+            httponly=True,
+            samesite="Lax",
+        )
+        return response
+
+
 def _unauthorized_response(
     message: str = "You are not authenticated. Please enter your username and password.",
 ):
@@ -241,3 +1347,13 @@ def _unauthorized_response(
     res.status_code = 401
     res.headers["WWW-Authenticate"] = 'Basic realm="mlflow"'
     return res
+
+
+# Workers start with the logins verified before the last restart instead of all hitting LDAP at once
+load_warm_cache()
+
+# Users deleted through MLflow's user API are written again on their next login
+_watch_user_deletion(_auth_store)
+
+# Hot user and permission lookups of MLflow's authorization are answered from memory when enabled
+permissions.install()
@@ -0,0 +1,54 @@
+"""Prometheus metrics of the authentication hot path.
+
+Metrics live on prometheus_client's default registry, which MLflow's
+``--expose-prometheus`` exporter collects. When it runs with a multiprocess
+directory, prometheus_client writes these values to per-worker files, so they
+are aggregated across gunicorn workers like MLflow's own request metrics.
+"""
+
+from prometheus_client import Counter, Histogram
+
+LDAP_BIND_SECONDS = Histogram(
+    "mlflowstack_ldap_bind_seconds",
+    "Time to connect and bind to an LDAP server",
+    ["server"],
+)
+
+LDAP_SEARCH_SECONDS = Histogram(
+    "mlflowstack_ldap_search_seconds",
+    "Time of the LDAP group membership search",
+)
+
+AUTH_REQUEST_SECONDS = Histogram(
+    "mlflowstack_auth_request_seconds",
+    "Total time spent authenticating a request",
+)
+
+AUTH_OUTCOMES = Counter(
+    "mlflowstack_auth_outcomes_total",
+    "Authentication decisions by outcome (admin, user, session, api_key, unauthorized, throttled, error)",
+    ["outcome"],
+)
+
+AUTH_STORE_WRITES = Counter(
+    "mlflowstack_auth_store_writes_total",
+    "Users created or updated in the MLflow auth store",
+    ["operation"],
+)
+
+AUTH_CACHE_LOOKUPS = Counter(
+    "mlflowstack_auth_cache_lookups_total",
+    "Credential cache lookups by result (hit, miss, stale)",
+    ["result"],
+)
+
+AUDIT_EVENTS_DROPPED = Counter(
+    "mlflowstack_audit_events_dropped_total",
+    "Auth audit events dropped because the audit queue was full",
+)
+
+LOGIN_THROTTLED = Counter(
+    "mlflowstack_login_throttled_total",
+    "Logins refused without calling LDAP, per reason (rate, backoff)",
+    ["reason"],
+)
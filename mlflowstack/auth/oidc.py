@@ -0,0 +1,236 @@
+"""
+Fast path of the mlflow-oidc-auth bearer token validation.
+
+mlflow-oidc-auth verifies the signature of every bearer token it is shown
+and refetches the discovery document and JWKS of the provider every
+OIDC_JWKS_CACHE_TTL_SECONDS. The oidc-auth-cached app replaces its
+validate_token with one that verifies a token once and answers it from
+memory until it expires, keeping the signing keys until a token names a
+key id they do not hold:
+
+    mlflow server --app-name oidc-auth-cached ...
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, Hashable, Optional
+
+from mlflowstack.auth.cache import TTLCache
+from mlflowstack.auth.metrics import AUTH_CACHE_LOOKUPS
+from mlflowstack.auth.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+# Maximum seconds a verified token is answered from memory, never past its exp claim (0 disables the token cache)
+OIDC_TOKEN_CACHE_TTL = int(os.getenv("OIDC_TOKEN_CACHE_TTL", "300"))
+
+# Maximum number of verified tokens kept in memory
+OIDC_TOKEN_CACHE_MAX_SIZE = int(os.getenv("OIDC_TOKEN_CACHE_MAX_SIZE", "10000"))
+
+# Seconds the signing keys of a provider are used before they are fetched again, even when no new key id shows up
+OIDC_JWKS_MAX_AGE = int(os.getenv("OIDC_JWKS_MAX_AGE", "3600"))
+
+# Minimum seconds between two fetches of the signing keys of a provider, so tokens with unknown key ids cannot flood it
+OIDC_JWKS_REFRESH_INTERVAL = int(os.getenv("OIDC_JWKS_REFRESH_INTERVAL", "30"))
+
+# Seconds a token validation waits for the identical one already in flight
+OIDC_COALESCE_TIMEOUT = float(os.getenv("OIDC_COALESCE_TIMEOUT", "10"))
+
+
+# Modules of mlflow-oidc-auth holding a reference to validate_token
+_VALIDATING_MODULES = (
+    "mlflow_oidc_auth.auth",
+    "mlflow_oidc_auth.middleware.auth_middleware",
+    "mlflow_oidc_auth.utils.request_helpers_fastapi",
+)
+
+
+@dataclass(frozen=True)
+class VerifiedToken:
+    """claims of a bearer token whose signature and claims were verified"""
+
+    claims: dict
+    expires_at: Optional[float] = None
+
+
+class JWKSCache:
+    """signing keys per provider, fetched again only when a token names a key id they lack or they reach their max age"""
+
+    def __init__(
+        self,
+        fetch: Callable[[object], dict],
+        max_age: float,
+        refresh_interval: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_age = max_age
+        self.refresh_interval = refresh_interval
+        self._fetch = fetch
+        self._clock = clock
+        # provider -> (jwks, key ids, fetched at)
+        self._keys: dict[Hashable, tuple[dict, frozenset, float]] = {}
+        # provider -> time of the last fetch attempt, failed ones included
+        self._attempts: dict[Hashable, float] = {}
+        self._inflight = SingleFlight()
+
+    def get(self, provider, kid: Optional[str] = None) -> dict:
+        """Keys of the provider able to verify a token signed with kid"""
+        entry = self._keys.get(provider)
+        if entry is not None:
+            jwks, kids, fetched = entry
+            now = self._clock()
+            current = now - fetched < self.max_age and (kid is None or kid in kids)
+            if current or now - self._attempts.get(provider, 0) < self.refresh_interval:
+                return jwks
+        return self.refresh(provider)
+
+    def refresh(self, provider) -> dict:
+        """Fetch the keys of the provider again, unless they were just fetched"""
+        entry = self._keys.get(provider)
+        if (
+            entry is not None
+            and self._clock() - self._attempts.get(provider, 0) < self.refresh_interval
+        ):
+            return entry[0]
+        try:
+            return self._inflight.do(
+                provider, lambda: self._load(provider), OIDC_COALESCE_TIMEOUT
+            )
+        except Exception as e:
+            if entry is None:
+                raise
+            # An unreachable provider keeps the keys verified so far instead of failing every login
+            logger.warning(
+                f"Fetching the signing keys of provider {getattr(provider, 'id', provider)} failed, using the previous ones: {str(e)}"
+            )
+            return entry[0]
+
+    def clear(self) -> None:
+        self._keys.clear()
+        self._attempts.clear()
+
+    def _load(self, provider) -> dict:
+        self._attempts[provider] = self._clock()
+        jwks = self._fetch(provider)
+        kids = frozenset(key.get("kid") for key in jwks.get("keys", ()))
+        self._keys[provider] = (jwks, kids, self._clock())
+        logger.debug(
+            f"Fetched {len(kids)} signing key(s) of provider {getattr(provider, 'id', provider)}"
+        )
+        return jwks
+
+
+def _fetch_provider_jwks(provider) -> dict:
+    from mlflow_oidc_auth.auth import _get_provider_jwks
+
+    # mlflow-oidc-auth resolves where the keys come from (discovery, jwks_uri, inline, in-cluster)
+    return _get_provider_jwks(provider, force_refresh=True)
+
+
+# Signing keys of the token providers
+_jwks = JWKSCache(_fetch_provider_jwks, OIDC_JWKS_MAX_AGE, OIDC_JWKS_REFRESH_INTERVAL)
+
+# Verified tokens, keyed by their SHA-256 digest so bearer tokens never sit in memory
+_tokens = TTLCache(OIDC_TOKEN_CACHE_MAX_SIZE)
+
+# Concurrent requests presenting the same token share one verification
+_inflight = SingleFlight()
+
+
+def validate_token(token: str):
+    """Drop-in for mlflow_oidc_auth.auth.validate_token, verifying each token once until it expires"""
+    return verify_token(token).claims
+
+
+def verify_token(token: str) -> VerifiedToken:
+    """Verified claims of the token, served from memory once verified"""
+    if OIDC_TOKEN_CACHE_TTL <= 0:
+        return _verify(token)
+
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    verified = _tokens.get(key)
+    AUTH_CACHE_LOOKUPS.labels("miss" if verified is None else "hit").inc()
+    if verified is not None:
+        return verified
+
+    verified = _inflight.do(key, lambda: _verify(token), OIDC_COALESCE_TIMEOUT)
+    ttl = OIDC_TOKEN_CACHE_TTL
+    if verified.expires_at is not None:
+        ttl = min(ttl, verified.expires_at - time.time())
+    _tokens.set(key, verified, ttl)
+    return verified
+
+
+def _verify(token: str) -> VerifiedToken:
+    from authlib.jose.errors import BadSignatureError
+    from mlflow_oidc_auth.auth import _claims_options_for, _jwt_for, _resolve_provider
+
+    provider = _resolve_provider(token)
+    claims_options = _claims_options_for(provider)
+    decoder = _jwt_for(provider)
+
+    try:
+        claims = decoder.decode(
+            token,
+            _jwks.get(provider, _unverified_kid(token)),
+            claims_options=claims_options,
+        )
+    except BadSignatureError:
+        # The provider rotated its keys without changing the key id
+        claims = decoder.decode(
+            token, _jwks.refresh(provider), claims_options=claims_options
+        )
+    claims.validate()
+
+    expires_at = claims.get("exp")
+    return VerifiedToken(
+        claims=claims,
+        expires_at=float(expires_at) if isinstance(expires_at, (int, float)) else None,
+    )
+
+
+def _unverified_kid(token: str) -> Optional[str]:
+    """Key id named by the token header, only used to pick the keys the signature is checked with"""
+    try:
+        header = token.split(".")[0]
+        kid = json.loads(base64.urlsafe_b64decode(header + "=" * (-len(header) % 4)))[
+            "kid"
+        ]
+    except Exception:
+        return None
+    return kid if isinstance(kid, str) else None
+
+
+def warm_up() -> None:
+    """Fetch the signing keys of every token provider, before the first token needs them"""
+    from mlflow_oidc_auth.config import config
+    from mlflow_oidc_auth.provider_registry import TOKEN_PROVIDER_TYPES
+
+    for provider in config.AUTH_PROVIDERS.providers:
+        if provider.type not in TOKEN_PROVIDER_TYPES:
+            continue
+        try:
+            _jwks.get(provider)
+        except Exception as e:
+            logger.warning(
+                f"Fetching the signing keys of provider {provider.id} failed: {str(e)}"
+            )
+
+
+def install() -> None:
+    """Replace validate_token of mlflow-oidc-auth with the cached one"""
+    import importlib
+
+    for name in _VALIDATING_MODULES:
+        module = importlib.import_module(name)
+        if module.validate_token is not validate_token:
+            module.validate_token = validate_token
+    logger.info(
+        f"Caching verified OIDC tokens for up to {OIDC_TOKEN_CACHE_TTL}s and signing keys for up to {OIDC_JWKS_MAX_AGE}s"
+    )
@@ -0,0 +1,161 @@
+import logging
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from sqlalchemy.orm import selectinload
+
+from mlflow.server.auth.db.models import SqlRole, SqlUserRoleAssignment
+from mlflow.server.auth.permissions import (
+    MANAGE,
+    RESOURCE_TYPE_WORKSPACE,
+    Permission,
+    get_permission,
+    max_permission,
+)
+from mlflowstack.auth.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds user rows and role grants are answered from memory (0 disables the permission cache)
+PERMISSION_CACHE_TTL = int(os.getenv("PERMISSION_CACHE_TTL", "0"))
+
+# Maximum number of cached users and per-user grant maps
+PERMISSION_CACHE_MAX_SIZE = int(os.getenv("PERMISSION_CACHE_MAX_SIZE", "10000"))
+
+
+# Store methods changing users, roles or grants, every call drops what was cached
+_WRITE_PREFIXES = (
+    "add_",
+    "assign_",
+    "create_",
+    "delete_",
+    "grant_",
+    "remove_",
+    "rename_",
+    "revoke_",
+    "set_",
+    "unassign_",
+    "update_",
+)
+
+
+class CachedPermissionStore:
+    """auth store proxy answering user and role permission lookups from per-user grant maps loaded in bulk, versioned and dropped on every write"""
+
+    def __init__(
+        self,
+        store,
+        ttl: float,
+        max_size: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.version = 0
+        self._store = store
+        self._users = TTLCache(max_size, clock=clock)
+        self._grants = TTLCache(max_size, clock=clock)
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._store, name)
+        if callable(attr) and name.startswith(_WRITE_PREFIXES):
+            return self._invalidating(attr)
+        return attr
+
+    def get_user(self, username: str):
+        version = self.version
+        cached = self._users.get(username)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        user = self._store.get_user(username)
+        self._users.set(username, (version, user), self.ttl)
+        return user
+
+    def get_role_permission_for_resource(
+        self, user_id: int, resource_type: str, resource_id: str, workspace: str
+    ) -> Optional[Permission]:
+        """Same answer as the store, computed from the user's grant map in the workspace"""
+        return _best_permission(
+            self._grant_map(user_id, workspace), resource_type, resource_id
+        )
+
+    def invalidate(self) -> None:
+        """Make every cached entry stale, entries loaded concurrently included"""
+        with self._lock:
+            self.version += 1
+
+    def _grant_map(self, user_id: int, workspace: str) -> tuple:
+        key = (user_id, workspace)
+        # Read before loading, so a map loaded across a write is never served as current
+        version = self.version
+        cached = self._grants.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        with self._store.ManagedSessionMaker() as session:
+            roles = (
+                session.query(SqlRole)
+                .options(selectinload(SqlRole.permissions))
+                .join(
+                    SqlUserRoleAssignment, SqlRole.id == SqlUserRoleAssignment.role_id
+                )
+                .filter(
+                    SqlUserRoleAssignment.user_id == user_id,
+                    SqlRole.workspace == workspace,
+                )
+                .all()
+            )
+            grants = tuple(
+                (rp.resource_type, rp.resource_pattern, rp.permission)
+                for role in roles
+                for rp in role.permissions
+            )
+        self._grants.set(key, (version, grants), self.ttl)
+        return grants
+
+    def _invalidating(self, method: Callable) -> Callable:
+        def call(*args, **kwargs):
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.invalidate()
+
+        return call
+
+
+def _best_permission(
+    grants: tuple, resource_type: str, resource_id: str
+) -> Optional[Permission]:
+    """Highest permission the grants give on the resource, as SqlAlchemyStore.get_role_permission_for_resource resolves it"""
+    best = None
+    for grant_type, pattern, permission in grants:
+        if grant_type == RESOURCE_TYPE_WORKSPACE and pattern == "*":
+            # Workspace-wide grants fold into other resource types only for MANAGE
+            if resource_type != RESOURCE_TYPE_WORKSPACE and permission != MANAGE.name:
+                continue
+        elif grant_type != resource_type or pattern not in ("*", resource_id):
+            continue
+        best = max_permission(best, permission) if best is not None else permission
+    return get_permission(best) if best is not None else None
+
+
+def install() -> None:
+    """Put the permission cache in front of MLflow's auth store, once per process"""
+    import mlflow.server.auth as auth
+
+    if PERMISSION_CACHE_TTL <= 0 or isinstance(auth.store, CachedPermissionStore):
+        return
+    auth.store = CachedPermissionStore(
+        auth.store, PERMISSION_CACHE_TTL, PERMISSION_CACHE_MAX_SIZE
+    )
+    logger.info(f"Caching auth store permissions for {PERMISSION_CACHE_TTL}s")
+
+
+def invalidate() -> None:
+    """Drop the cached permissions after the auth store was written behind the cache's back"""
+    import mlflow.server.auth as auth
+
+    if isinstance(auth.store, CachedPermissionStore):
+        auth.store.invalidate()
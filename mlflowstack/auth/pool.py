@@ -0,0 +1,158 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, Optional
+
+import ldap3
+from ldap3.core.exceptions import (
+    LDAPBindError,
+    LDAPCommunicationError,
+    LDAPExceptionError,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class LDAPPoolTimeoutError(LDAPExceptionError):
+    """raised when no pooled connection becomes available within the checkout timeout"""
+
+
+@dataclass
+class PooledConnection:
+    connection: ldap3.Connection
+    created_at: float
+    last_used: float = field(default=0.0)
+
+
+class LDAPConnectionPool:
+    """bounded pool of open connections to one server, rebound to the requesting user on checkout"""
+
+    def __init__(
+        self,
+        server: ldap3.Server,
+        size: int,
+        max_lifetime: float,
+        idle_timeout: float,
+        checkout_timeout: float,
+        receive_timeout: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.server = server
+        self.size = size
+        self.max_lifetime = max_lifetime
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.receive_timeout = receive_timeout
+        self._clock = clock
+        self._idle: "deque[PooledConnection]" = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def connection(self, user: str, password: str) -> Iterator[ldap3.Connection]:
+        """Borrow a connection bound as the given user, bind failures raise LDAPBindError"""
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            raise LDAPPoolTimeoutError(
+                f"No LDAP connection available within {self.checkout_timeout} seconds"
+            )
+        pooled = None
+        try:
+            pooled = self._bind(user, password)
+            yield pooled.connection
+        except LDAPCommunicationError:
+            self._close(pooled)
+            pooled = None
+            raise
+        finally:
+            if pooled is not None:
+                pooled.last_used = self._clock()
+                with self._lock:
+                    self._idle.append(pooled)
+            self._slots.release()
+
+    def prefill(self, count: int) -> int:
+        """Open connections until count of them are idle, returning how many were opened"""
+        opened = 0
+        while len(self._idle) < min(count, self.size):
+            pooled = self._open()
+            pooled.last_used = self._clock()
+            with self._lock:
+                self._idle.append(pooled)
+            opened += 1
+        return opened
+
+    def close(self) -> None:
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for pooled in idle:
+            self._close(pooled)
+
+    def __len__(self) -> int:
+        return len(self._idle)
+
+    def _bind(self, user: str, password: str) -> PooledConnection:
+        for attempt in range(2):
+            # An idle connection the server already dropped is retried once on a fresh one
+            pooled = self._checkout() if attempt == 0 else self._open()
+            try:
+                # The server info is loaded once per server, not on every bind
+                status, result, _, _ = pooled.connection.rebind(
+                    user=user, password=password, read_server_info=False
+                )
+                break
+            except (LDAPCommunicationError, LDAPBindError) as e:
+                self._close(pooled)
+                if not attempt:
+                    continue
+                if isinstance(e, LDAPCommunicationError):
+                    raise
+                # rebind() reports a connection the server closed or left unanswered as a
+                # bind error, wrong credentials come back as a failed status instead
+                raise LDAPCommunicationError(str(e)) from e
+
+        if not status:
+            pooled.last_used = self._clock()
+            with self._lock:
+                self._idle.append(pooled)
+            raise LDAPBindError((result or {}).get("description", "bind failed"))
+        return pooled
+
+    def _checkout(self) -> PooledConnection:
+        while True:
+            with self._lock:
+                pooled = self._idle.pop() if self._idle else None
+            if pooled is None:
+                return self._open()
+            if self._is_healthy(pooled):
+                return pooled
+            self._close(pooled)
+
+    def _is_healthy(self, pooled: PooledConnection) -> bool:
+        now = self._clock()
+        return (
+            not pooled.connection.closed
+            and now - pooled.created_at < self.max_lifetime
+            and now - pooled.last_used < self.idle_timeout
+        )
+
+    def _open(self) -> PooledConnection:
+        connection = ldap3.Connection(
+            server=self.server,
+            client_strategy=ldap3.SAFE_SYNC,
+            read_only=True,
+            receive_timeout=self.receive_timeout,
+        )
+        connection.open(read_server_info=False)
+        return PooledConnection(connection=connection, created_at=self._clock())
+
+    def _close(self, pooled: Optional[PooledConnection]) -> None:
+        if pooled is None:
+            return
+        try:
+            pooled.connection.unbind()
+        except LDAPExceptionError as e:
+            logger.debug(f"Error closing pooled LDAP connection: {str(e)}")
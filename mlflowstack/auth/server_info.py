@@ -0,0 +1,118 @@
+import logging
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+import ldap3
+from ldap3.core.exceptions import LDAPException
+from ldap3.protocol.rfc4512 import DsaInfo, SchemaInfo
+
+logger = logging.getLogger(__name__)
+
+
+class ServerInfoLoader:
+    """reads the root DSE and schema of a server once, or from cache files, and attaches them to it"""
+
+    def __init__(
+        self,
+        server: ldap3.Server,
+        fetch: Callable[[], tuple[DsaInfo, SchemaInfo]],
+        max_age: float,
+        directory: str = "",
+        retry_interval: float = 60,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.server = server
+        self.max_age = max_age
+        self.directory = directory
+        self.retry_interval = retry_interval
+        self._fetch = fetch
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._next_refresh = 0.0
+        self.loaded_at: Optional[float] = None
+
+    def ensure(self) -> None:
+        """Load the info when missing or older than max_age, cheap while it is fresh"""
+        if self._clock() < self._next_refresh:
+            return
+        # Only the first load blocks, refreshes are done by one caller while others keep the old info
+        if not self._lock.acquire(blocking=self.loaded_at is None):
+            return
+        try:
+            if self._clock() >= self._next_refresh:
+                self._load()
+        finally:
+            self._lock.release()
+
+    def refresh(self) -> None:
+        """Load the info on a background thread when missing or stale, never blocking the caller"""
+        if self._clock() < self._next_refresh:
+            return
+        if not self._lock.acquire(blocking=False):
+            return
+        threading.Thread(
+            target=self._refresh_and_release, name="ldap-server-info", daemon=True
+        ).start()
+
+    def _refresh_and_release(self) -> None:
+        try:
+            if self._clock() >= self._next_refresh:
+                self._load()
+        finally:
+            self._lock.release()
+
+    def _load(self) -> None:
+        now = self._clock()
+        try:
+            info, schema, loaded_at = self._read_files(now)
+            if info is None:
+                info, schema = self._fetch()
+                loaded_at = now
+                self._write_files(info, schema)
+        except (LDAPException, OSError, ValueError) as e:
+            logger.warning(
+                f"Reading the server info of {self.server.host} failed: {str(e)}"
+            )
+            self._next_refresh = now + min(self.retry_interval, self.max_age)
+            return
+
+        self.server.attach_dsa_info(info)
+        self.server.attach_schema_info(schema)
+        self.loaded_at = loaded_at
+        self._next_refresh = loaded_at + self.max_age
+        logger.info(f"Loaded the server info of {self.server.host}")
+
+    def _paths(self) -> tuple[str, str]:
+        name = f"{self.server.host}_{self.server.port}"
+        return (
+            os.path.join(self.directory, f"{name}.info.json"),
+            os.path.join(self.directory, f"{name}.schema.json"),
+        )
+
+    def _read_files(self, now: float):
+        if not self.directory:
+            return None, None, None
+        info_path, schema_path = self._paths()
+        try:
+            loaded_at = min(os.path.getmtime(info_path), os.path.getmtime(schema_path))
+        except OSError:
+            return None, None, None
+        if now - loaded_at >= self.max_age:
+            return None, None, None
+        return (
+            DsaInfo.from_file(info_path),
+            SchemaInfo.from_file(schema_path),
+            loaded_at,
+        )
+
+    def _write_files(self, info: DsaInfo, schema: SchemaInfo) -> None:
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        # Written aside and renamed, so other workers never read a partial file
+        for obj, path in zip((info, schema), self._paths()):
+            tmp = f"{path}.{os.getpid()}.tmp"
+            obj.to_file(tmp)
+            os.replace(tmp, path)
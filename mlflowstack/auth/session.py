@@ -0,0 +1,90 @@
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Session:
+    username: str
+    is_admin: bool
+    expires_at: float
+
+
+class SessionTokens:
+    """issues and verifies HMAC-SHA256 signed session tokens, signed with the first key and verified with any"""
+
+    def __init__(
+        self,
+        keys: list[bytes],
+        lifetime: float,
+        clock: Callable[[], float] = time.time,
+    ):
+        if not keys:
+            raise ValueError("At least one session key is required")
+        self.lifetime = lifetime
+        self._clock = clock
+        # Tokens name their key, so rotated-out keys keep verifying the tokens they signed
+        self._keys = {_key_id(key): key for key in keys}
+        self._signing_key_id = _key_id(keys[0])
+
+    def issue(self, username: str, is_admin: bool) -> str:
+        payload = _encode(
+            json.dumps(
+                {
+                    "sub": username,
+                    "adm": is_admin,
+                    "exp": int(self._clock() + self.lifetime),
+                    "kid": self._signing_key_id,
+                },
+                separators=(",", ":"),
+            ).encode("utf-8")
+        )
+        return f"{payload}.{self._sign(self._signing_key_id, payload)}"
+
+    def verify(self, token: str) -> Optional[Session]:
+        """Return the session of a valid, unexpired token, None otherwise"""
+        payload, _, signature = token.partition(".")
+        try:
+            claims = json.loads(_decode(payload))
+            key_id = claims["kid"]
+            if key_id not in self._keys:
+                return None
+            if not hmac.compare_digest(signature, self._sign(key_id, payload)):
+                return None
+            session = Session(
+                username=claims["sub"],
+                is_admin=bool(claims["adm"]),
+                expires_at=float(claims["exp"]),
+            )
+        except (ValueError, KeyError, TypeError) as e:
+            logger.debug(f"Malformed session token: {str(e)}")
+            return None
+        if session.expires_at <= self._clock():
+            return None
+        return session
+
+    def _sign(self, key_id: str, payload: str) -> str:
+        return _encode(
+            hmac.new(
+                self._keys[key_id], payload.encode("ascii"), hashlib.sha256
+            ).digest()
+        )
+
+
+def _key_id(key: bytes) -> str:
+    return hashlib.sha256(key).hexdigest()[:8]
+
+
+def _encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
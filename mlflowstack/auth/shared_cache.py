@@ -0,0 +1,224 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+from urllib.parse import quote
+
+logger = logging.getLogger(__name__)
+
+# Cache keys are (username, credential digest) pairs
+CacheKey = tuple[str, bytes]
+
+
+class SQLiteCache:
+    """credential cache in a local SQLite file, shared by all workers of one host"""
+
+    def __init__(
+        self,
+        path: str,
+        serialize: Callable[[object], str],
+        deserialize: Callable[[str], object],
+        grace: float = 0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.grace = grace
+        self._serialize = serialize
+        self._deserialize = deserialize
+        self._clock = clock
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def get(self, key: CacheKey) -> Optional[object]:
+        return self._get(key, 0)
+
+    def get_stale(self, key: CacheKey) -> Optional[object]:
+        """Return the entry even if it expired less than grace seconds ago"""
+        return self._get(key, self.grace)
+
+    def _get(self, key: CacheKey, grace: float) -> Optional[object]:
+        try:
+            row = (
+                self._db()
+                .execute(
+                    "SELECT value FROM credentials WHERE key = ? AND expires_at > ?",
+                    (_encode_key(key), self._clock() - grace),
+                )
+                .fetchone()
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Reading the shared credential cache failed: {str(e)}")
+            return None
+        return self._deserialize(row[0]) if row else None
+
+    def set(self, key: CacheKey, value: object, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        now = self._clock()
+        try:
+            with self._db() as db:
+                db.execute(
+                    "INSERT OR REPLACE INTO credentials (key, username, value, expires_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (_encode_key(key), key[0], self._serialize(value), now + ttl),
+                )
+                # Entries past their grace period can never be served again
+                db.execute(
+                    "DELETE FROM credentials WHERE expires_at <= ?", (now - self.grace,)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Writing the shared credential cache failed: {str(e)}")
+
+    def entries(self, limit: int) -> list[tuple[CacheKey, object, float]]:
+        """Return up to limit unexpired (key, value, expires_at) entries, the latest expiring first"""
+        try:
+            rows = (
+                self._db()
+                .execute(
+                    "SELECT key, value, expires_at FROM credentials WHERE expires_at > ? "
+                    "ORDER BY expires_at DESC LIMIT ?",
+                    (self._clock(), limit),
+                )
+                .fetchall()
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Reading the shared credential cache failed: {str(e)}")
+            return []
+        return [
+            (_decode_key(key), self._deserialize(value), expires_at)
+            for key, value, expires_at in rows
+        ]
+
+    def invalidate(self, username: Optional[str] = None) -> int:
+        """Drop the cached logins of one user, or of everyone, returning how many were dropped"""
+        with self._db() as db:
+            if username is None:
+                return db.execute("DELETE FROM credentials").rowcount
+            return db.execute(
+                "DELETE FROM credentials WHERE username = ?", (username,)
+            ).rowcount
+
+    def __len__(self) -> int:
+        return self._db().execute("SELECT COUNT(*) FROM credentials").fetchone()[0]
+
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            # Cached digests must not be readable by other local users
+            os.close(os.open(self.path, os.O_CREAT | os.O_RDWR, 0o600))
+            db = sqlite3.connect(self.path, timeout=5)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._create_schema(db)
+            self._local.db = db
+        return db
+
+    def _create_schema(self, db: sqlite3.Connection) -> None:
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            with db:
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS credentials ("
+                    "key TEXT PRIMARY KEY, username TEXT NOT NULL, "
+                    "value TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+                db.execute(
+                    "CREATE INDEX IF NOT EXISTS credentials_username "
+                    "ON credentials (username)"
+                )
+                db.execute(
+                    "CREATE INDEX IF NOT EXISTS credentials_expires_at "
+                    "ON credentials (expires_at)"
+                )
+            self._schema_ready = True
+
+
+class RedisCache:
+    """credential cache in Redis, shared by all workers and replicas"""
+
+    def __init__(
+        self,
+        url: str,
+        serialize: Callable[[object], str],
+        deserialize: Callable[[str], object],
+        grace: float = 0,
+        prefix: str = "mlflowstack:ldap",
+        client=None,
+        clock: Callable[[], float] = time.time,
+    ):
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url)
+        self.grace = grace
+        self.prefix = prefix
+        self._client = client
+        self._serialize = serialize
+        self._deserialize = deserialize
+        self._clock = clock
+
+    def get(self, key: CacheKey) -> Optional[object]:
+        return self._get(key, 0)
+
+    def get_stale(self, key: CacheKey) -> Optional[object]:
+        """Return the entry even if it expired less than grace seconds ago"""
+        return self._get(key, self.grace)
+
+    def _get(self, key: CacheKey, grace: float) -> Optional[object]:
+        try:
+            raw = self._client.get(self._key(key))
+        except Exception as e:
+            logger.warning(f"Reading the shared credential cache failed: {str(e)}")
+            return None
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        if entry["expires_at"] + grace <= self._clock():
+            return None
+        return self._deserialize(entry["value"])
+
+    def set(self, key: CacheKey, value: object, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        entry = json.dumps(
+            {"value": self._serialize(value), "expires_at": self._clock() + ttl}
+        )
+        try:
+            # Redis keeps the entry through the grace period, expiry is checked on read
+            self._client.set(self._key(key), entry, px=int((ttl + self.grace) * 1000))
+        except Exception as e:
+            logger.warning(f"Writing the shared credential cache failed: {str(e)}")
+
+    def invalidate(self, username: Optional[str] = None) -> int:
+        """Drop the cached logins of one user, or of everyone, returning how many were dropped"""
+        pattern = (
+            f"{self.prefix}:credentials:*"
+            if username is None
+            else f"{self.prefix}:credentials:{_quote_user(username)}:*"
+        )
+        keys = list(self._client.scan_iter(match=pattern))
+        return self._client.delete(*keys) if keys else 0
+
+    def _key(self, key: CacheKey) -> str:
+        username, digest = key
+        return f"{self.prefix}:credentials:{_quote_user(username)}:{digest.hex()}"
+
+
+def _encode_key(key: CacheKey) -> str:
+    username, digest = key
+    return f"{username}:{digest.hex()}"
+
+
+def _decode_key(value: str) -> CacheKey:
+    username, _, digest = value.rpartition(":")
+    return username, bytes.fromhex(digest)
+
+
+def _quote_user(username: str) -> str:
+    # Percent-encoded names hold no ":" or glob characters, so a SCAN pattern only matches that user
+    return quote(username, safe="")
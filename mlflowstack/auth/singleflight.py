@@ -0,0 +1,60 @@
+import threading
+from typing import Callable, Hashable, Optional
+
+
+class SingleFlightTimeoutError(TimeoutError):
+    """raised when a coalesced call does not finish within the wait timeout"""
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: object = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """coalesce concurrent calls sharing a key into one execution whose outcome all callers get"""
+
+    def __init__(self):
+        self._calls: dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], object], timeout: float) -> object:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            if not call.done.wait(timeout):
+                raise SingleFlightTimeoutError(
+                    f"Coalesced call did not finish within {timeout} seconds"
+                )
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def waiting(self, key: Hashable) -> int:
+        """Number of callers currently waiting on the in-flight call for key"""
+        with self._lock:
+            call = self._calls.get(key)
+            return call.waiters if call else 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
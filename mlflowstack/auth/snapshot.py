@@ -0,0 +1,145 @@
+import logging
+import threading
+import time
+from typing import Callable, ContextManager, Iterable, Optional
+
+import ldap3
+
+from mlflowstack.auth.dn import normalize_dn
+
+logger = logging.getLogger(__name__)
+
+
+class GroupSnapshot:
+    """in-memory member lists of the configured groups, reloaded from LDAP by a background thread
+
+    With a nested_base every group below it is read into a graph, and the members of the
+    configured groups include the members of their nested groups at any depth.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], ContextManager[ldap3.Connection]],
+        group_dns: Iterable[str],
+        member_attribute: str,
+        interval: float,
+        page_size: int,
+        nested_base: str = "",
+    ):
+        self.group_dns = [dn for dn in group_dns if dn]
+        self.member_attribute = member_attribute
+        self.interval = interval
+        self.page_size = page_size
+        self.nested_base = nested_base
+        self.loaded_at: Optional[float] = None
+        self._connect = connect
+        self._members: dict[str, frozenset] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.loaded_at is not None
+
+    def is_member(self, group_dn: str, user_dn: str) -> bool:
+        return normalize_dn(user_dn) in self._members.get(
+            normalize_dn(group_dn), frozenset()
+        )
+
+    def start(self) -> None:
+        """Load and keep refreshing the snapshot in the background, callers go on without waiting for it"""
+        self._thread = threading.Thread(
+            target=self._run, name="ldap-group-snapshot", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def refresh(self) -> bool:
+        """Reload every group, keeping the previous snapshot if LDAP cannot be read"""
+        try:
+            with self._connect() as c:
+                if self.nested_base:
+                    members = self._load_nested_members(c)
+                else:
+                    members = {
+                        normalize_dn(group_dn): self._load_members(c, group_dn)
+                        for group_dn in self.group_dns
+                    }
+        except Exception as e:
+            logger.warning(f"Refreshing LDAP group snapshot failed: {str(e)}")
+            return False
+
+        # Swap the whole mapping at once, readers never see a partially loaded snapshot
+        self._members = members
+        self.loaded_at = time.monotonic()
+        logger.info(
+            "LDAP group snapshot loaded: "
+            + ", ".join(f"{dn} ({len(m)} members)" for dn, m in members.items())
+        )
+        return True
+
+    def _load_members(self, c: ldap3.Connection, group_dn: str) -> frozenset:
+        members = set()
+        # ldap3 follows Active Directory ranged attributes (member;range=...) on its own
+        for entry in c.extend.standard.paged_search(
+            search_base=group_dn,
+            search_filter="(objectClass=*)",
+            search_scope=ldap3.BASE,
+            attributes=[self.member_attribute],
+            paged_size=self.page_size,
+            generator=True,
+        ):
+            values = entry.get("attributes", {}).get(self.member_attribute, [])
+            if isinstance(values, str):
+                values = [values]
+            members.update(normalize_dn(value) for value in values)
+        return frozenset(members)
+
+    def _load_nested_members(self, c: ldap3.Connection) -> dict[str, frozenset]:
+        graph = {}
+        for entry in c.extend.standard.paged_search(
+            search_base=self.nested_base,
+            search_filter=f"({self.member_attribute}=*)",
+            search_scope=ldap3.SUBTREE,
+            attributes=[self.member_attribute],
+            paged_size=self.page_size,
+            generator=True,
+        ):
+            if entry.get("type") != "searchResEntry":
+                continue
+            values = entry.get("attributes", {}).get(self.member_attribute, [])
+            if isinstance(values, str):
+                values = [values]
+            graph[normalize_dn(entry["dn"])] = {normalize_dn(v) for v in values}
+
+        for group_dn in self.group_dns:
+            # Configured groups outside the nested base are read on their own
+            if normalize_dn(group_dn) not in graph:
+                graph[normalize_dn(group_dn)] = set(self._load_members(c, group_dn))
+
+        return {
+            normalize_dn(group_dn): _transitive_members(normalize_dn(group_dn), graph)
+            for group_dn in self.group_dns
+        }
+
+    def _run(self) -> None:
+        # Until the first load succeeds, ready stays False and logins search their groups
+        self.refresh()
+        while not self._stop.wait(self.interval):
+            self.refresh()
+
+
+def _transitive_members(group_dn: str, graph: dict[str, set]) -> frozenset:
+    """Every member reachable from the group, nested groups included, cycles are visited once"""
+    members = set()
+    pending = [group_dn]
+    visited = {group_dn}
+    while pending:
+        for member in graph.get(pending.pop(), ()):
+            members.add(member)
+            if member in graph and member not in visited:
+                visited.add(member)
+                pending.append(member)
+    return frozenset(members)
@@ -0,0 +1,93 @@
+import logging
+import threading
+import time
+from typing import Callable, Hashable
+
+from mlflowstack.auth.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class LoginThrottledError(Exception):
+    """raised instead of calling LDAP while a client exceeds its login budget or backs off after failures"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Login throttled ({reason}), retry in {retry_after:.1f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Budget:
+    __slots__ = ("tokens", "updated_at", "failures", "blocked_until")
+
+    def __init__(self, tokens: float, now: float):
+        self.tokens = tokens
+        self.updated_at = now
+        self.failures = 0
+        self.blocked_until = 0.0
+
+
+class LoginThrottle:
+    """token bucket per key refilled at rate tokens per second, blocking the key for an exponential backoff after each failure"""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        backoff: float,
+        max_backoff: float,
+        max_size: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._clock = clock
+        # A budget left alone until its bucket is full and its backoff is over holds nothing worth keeping
+        self._idle = max(burst / rate, max_backoff)
+        self._budgets = TTLCache(max_size, clock=clock)
+        self._lock = threading.Lock()
+
+    def acquire(self, key: Hashable) -> None:
+        """Take a token for a login attempt, raise LoginThrottledError when none is left"""
+        with self._lock:
+            now = self._clock()
+            budget = self._budget(key, now)
+            if budget.blocked_until > now:
+                raise LoginThrottledError("backoff", budget.blocked_until - now)
+            budget.tokens = min(
+                self.burst, budget.tokens + (now - budget.updated_at) * self.rate
+            )
+            budget.updated_at = now
+            if budget.tokens < 1:
+                raise LoginThrottledError("rate", (1 - budget.tokens) / self.rate)
+            budget.tokens -= 1
+
+    def record_failure(self, key: Hashable) -> float:
+        """Block the key for a backoff doubled on every consecutive failure and return it"""
+        with self._lock:
+            now = self._clock()
+            budget = self._budget(key, now)
+            budget.failures += 1
+            delay = min(self.backoff * 2 ** (budget.failures - 1), self.max_backoff)
+            budget.blocked_until = now + delay
+        logger.debug(
+            f"Login of {key} failed {budget.failures} times, backing off {delay}s"
+        )
+        return delay
+
+    def record_success(self, key: Hashable) -> None:
+        with self._lock:
+            budget = self._budgets.get(key)
+            if budget is not None:
+                budget.failures = 0
+                budget.blocked_until = 0.0
+
+    def _budget(self, key: Hashable, now: float) -> _Budget:
+        budget = self._budgets.get(key)
+        if budget is None:
+            budget = _Budget(self.burst, now)
+        # Every use extends the lifetime of the budget
+        self._budgets.set(key, budget, self._idle)
+        return budget
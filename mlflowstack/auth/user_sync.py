@@ -0,0 +1,98 @@
+import atexit
+import logging
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SyncBatch:
+    """users collected for one auth store write, with their last admin flag, done once written or failed"""
+
+    def __init__(self):
+        self.users: dict[str, bool] = {}
+        self.error: Optional[BaseException] = None
+        self.done = threading.Event()
+
+    def wait(self, timeout: float) -> bool:
+        """Wait for the batch to be written, return whether it was written successfully"""
+        return self.done.wait(timeout) and self.error is None
+
+
+class UserSync:
+    """admin flag changes of known users deduplicated per user and written to the auth store in bulk by a background thread"""
+
+    def __init__(
+        self,
+        write: Callable[[dict], None],
+        batch_size: int,
+        flush_interval: float,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._write = write
+        self._batch = SyncBatch()
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, name: str, is_admin: bool) -> SyncBatch:
+        """Queue the user's admin flag, written once the flush interval ends or the batch is full"""
+        with self._cond:
+            batch = self._batch
+            batch.users[name] = is_admin
+            if len(batch.users) >= self.batch_size:
+                self._cond.notify()
+            return batch
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="auth-user-sync", daemon=True
+        )
+        self._thread.start()
+        # Users still queued at shutdown are written before the worker exits
+        atexit.register(self.close)
+
+    def close(self, timeout: float = 5) -> None:
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+
+    def flush(self) -> int:
+        """Write the users queued so far from the calling thread"""
+        with self._cond:
+            batch = self._take()
+        return self._apply(batch)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                # Requests arriving while a batch is written pile up into the next one
+                self._cond.wait_for(lambda: self._stop or self._batch.users)
+                self._cond.wait_for(
+                    lambda: self._stop or len(self._batch.users) >= self.batch_size,
+                    self.flush_interval,
+                )
+                if self._stop:
+                    return
+                batch = self._take()
+            self._apply(batch)
+
+    def _take(self) -> SyncBatch:
+        batch, self._batch = self._batch, SyncBatch()
+        return batch
+
+    def _apply(self, batch: SyncBatch) -> int:
+        if batch.users:
+            try:
+                self._write(batch.users)
+            except Exception as e:
+                batch.error = e
+                logger.warning(
+                    f"Writing {len(batch.users)} user(s) to the auth store failed: {str(e)}"
+                )
+        batch.done.set()
+        return len(batch.users)
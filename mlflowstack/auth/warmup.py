@@ -0,0 +1,79 @@
+"""
+Worker warm-up of the MLflow authentication, so the first request served by
+a new worker is as fast as the following ones.
+
+The ldap-auth app (mlflowstack.auth.app) warms every worker up in the
+background, answering /health with 503 until it is done:
+
+    mlflow server --app-name ldap-auth ...
+
+With gunicorn, workers can also finish warming up before accepting requests:
+
+    mlflow server --app-name ldap-auth --gunicorn-opts "-c python:mlflowstack.auth.gunicorn_conf"
+"""
+
+import logging
+import sys
+import threading
+import time
+
+from flask import Flask, make_response, request
+
+logger = logging.getLogger(__name__)
+
+# Set once this worker finished warming up, successfully or not
+_ready = threading.Event()
+
+# Lets concurrent callers wait for the warm-up already running
+_lock = threading.Lock()
+
+
+def warm_up() -> bool:
+    """Warm this worker up once, return whether every step succeeded"""
+    with _lock:
+        if not _ready.is_set():
+            started = time.perf_counter()
+            warm_up._ok = _run_steps()
+            _ready.set()
+            logger.info(
+                f"Worker warmed up in {time.perf_counter() - started:.3f}s"
+                f"{'' if warm_up._ok else ' with errors'}"
+            )
+    return warm_up._ok
+
+
+def _run_steps() -> bool:
+    from mlflow.server.auth import auth_config, get_auth_func, store
+
+    steps = [
+        ("auth store", lambda: store.has_user(auth_config.admin_username)),
+        (
+            "authorization function",
+            lambda: _warm_up_module(get_auth_func(auth_config.authorization_function)),
+        ),
+    ]
+    ok = True
+    for name, step in steps:
+        try:
+            step()
+        except Exception as e:
+            # A worker that could not warm up still serves, its first requests are just slower
+            logger.warning(f"Warming up the {name} failed: {str(e)}")
+            ok = False
+    return ok
+
+
+def _warm_up_module(auth_func) -> None:
+    """Run the warm_up function of the module defining the authorization function, if it has one"""
+    hook = getattr(sys.modules[auth_func.__module__], "warm_up", None)
+    if hook is not None:
+        hook()
+
+
+def install(app: Flask) -> None:
+    """Answer /health with 503 until this worker is warmed up"""
+
+    @app.before_request
+    def health_until_warm():
+        if not _ready.is_set() and request.path.endswith("/health"):
+            return make_response("Warming up", 503)
@@ -0,0 +1,126 @@
+"""
+Microbenchmark of group membership checks on large member lists.
+
+Compares the former list scan with exact string comparison against
+normalizing every member into a set and against the single pass that
+stops once both group DNs were seen, on a group attribute holding
+--members values. Every run gets a freshly built member list, as every
+login gets new strings from ldap3:
+
+    python -m tests.benchmark.bench_dn_index --members 100000 --output dn.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+from mlflowstack.auth.dn import matching_dns, normalize_dn, normalize_dns
+
+ADMIN_DN = "cn=test-admin,ou=groups,dc=mlflow,dc=test"
+USER_DN = "cn=test-user,ou=groups,dc=mlflow,dc=test"
+
+
+def list_scan(values: list, group_dns: list) -> list:
+    """Membership as check_group_dn used to compute it"""
+    return [group_dn in values for group_dn in group_dns]
+
+
+def normalized_set(values: list, group_dns: list) -> list:
+    """Membership with every member normalized into a set first"""
+    index = normalize_dns(values)
+    return [group_dn in index for group_dn in group_dns]
+
+
+def single_pass(values: list, group_dns: list) -> list:
+    """Membership as resolve_user computes it, group DNs being normalized at startup"""
+    found = matching_dns(values, frozenset(group_dns))
+    return [group_dn in found for group_dn in group_dns]
+
+
+def member_values(members: int, spaced_ratio: float) -> list:
+    """Member DNs, every 1/spaced_ratio-th one written with spaces and capitals, the user group last"""
+    spaced_every = int(1 / spaced_ratio) if spaced_ratio else 0
+    values = []
+    for i in range(members - 1):
+        if spaced_every and i % spaced_every == 0:
+            values.append(f"UID=User{i:06d}, OU=People, DC=mlflow, DC=test")
+        else:
+            values.append(f"uid=user{i:06d},ou=people,dc=mlflow,dc=test")
+    values.append(USER_DN)
+    return values
+
+
+def measure(fn, make_values, repeat: int) -> dict:
+    """Time fn on a member list built anew, outside the timing, for every run"""
+    timings = []
+    for _ in range(repeat):
+        values = make_values()
+        started = time.perf_counter()
+        fn(values)
+        timings.append(time.perf_counter() - started)
+    return {
+        "best_ms": round(min(timings) * 1000, 3),
+        "median_ms": round(sorted(timings)[len(timings) // 2] * 1000, 3),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--members", type=int, default=100000)
+    parser.add_argument(
+        "--spaced-ratio",
+        type=float,
+        default=0.01,
+        help="share of member DNs written with spaces and capitals (default: 0.01)",
+    )
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    raw_dns = [ADMIN_DN, USER_DN]
+    normalized_dns = [normalize_dn(dn) for dn in raw_dns]
+
+    def make_values():
+        return member_values(args.members, args.spaced_ratio)
+
+    results = {
+        "metadata": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "members": args.members,
+            "spaced_ratio": args.spaced_ratio,
+            "repeat": args.repeat,
+        },
+        "list_scan": measure(
+            lambda values: list_scan(values, raw_dns), make_values, args.repeat
+        ),
+        "normalized_set": measure(
+            lambda values: normalized_set(values, normalized_dns),
+            make_values,
+            args.repeat,
+        ),
+        "single_pass": measure(
+            lambda values: single_pass(values, normalized_dns),
+            make_values,
+            args.repeat,
+        ),
+    }
+    for name in ("list_scan", "normalized_set", "single_pass"):
+        print(
+            f"{name:>20}: best {results[name]['best_ms']:.3f} ms, "
+            f"median {results[name]['median_ms']:.3f} ms"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,470 @@
+"""
+Throughput benchmark for LDAP authenticated requests.
+
+Runs authenticate_request_basic_auth inside a Flask test app against an
+in-process directory (ldap3 MOCK_SYNC) with injected network latency, so it
+runs offline. Results are written as JSON and can be compared to a previous
+run to spot regressions:
+
+    python -m tests.benchmark.bench_ldap_auth --output baseline.json
+    python -m tests.benchmark.bench_ldap_auth --env LDAP_POOL_SIZE=8 \
+        --output pooled.json --compare baseline.json
+"""
+
+import argparse
+import base64
+import importlib
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from importlib import metadata
+from unittest import mock
+
+import ldap3
+from flask import Flask, Response
+from ldap3.core.exceptions import LDAPBindError
+
+BASE_DN = "dc=mlflow,dc=test"
+PEOPLE_DN = f"ou=people,{BASE_DN}"
+GROUPS_DN = f"ou=groups,{BASE_DN}"
+ADMIN_GROUP_DN = f"cn=test-admin,{GROUPS_DN}"
+USER_GROUP_DN = f"cn=test-user,{GROUPS_DN}"
+
+# Configuration matching the LDAP docker-compose test setup
+DEFAULT_ENV = {
+    "LDAP_URI": f"ldap://bench-ldap:389/{BASE_DN}",
+    "LDAP_LOOKUP_BIND": f"uid=%s,{PEOPLE_DN}",
+    "LDAP_GROUP_ATTRIBUTE": "dn",
+    "LDAP_GROUP_SEARCH_BASE_DN": GROUPS_DN,
+    "LDAP_GROUP_SEARCH_FILTER": "(&(objectclass=groupOfUniqueNames)(uniquemember=%s))",
+    "LDAP_GROUP_MEMBER_ATTRIBUTE": "uniqueMember",
+    "LDAP_GROUP_USER_DN": USER_GROUP_DN,
+    "LDAP_GROUP_ADMIN_DN": ADMIN_GROUP_DN,
+    # All load comes from one address, throttling would measure the budget instead of LDAP
+    "LDAP_THROTTLE_RATE": "0",
+}
+
+_MockConnection = ldap3.Connection
+
+
+class LatencyConnection:
+    """SAFE_SYNC look-alike over a MOCK_SYNC connection, sleeping for every round trip"""
+
+    latency = 0.0
+
+    def __init__(
+        self,
+        server,
+        user=None,
+        password=None,
+        auto_bind=False,
+        read_only=False,
+        receive_timeout=None,
+        **kwargs,
+    ):
+        self._connection = _MockConnection(
+            server,
+            user=user,
+            password=password,
+            client_strategy=ldap3.MOCK_SYNC,
+            read_only=read_only,
+        )
+        if auto_bind:
+            self.open()
+            self._round_trip()
+            if not self._connection.bind():
+                raise LDAPBindError(self._connection.result["description"])
+
+    @property
+    def closed(self):
+        return self._connection.closed
+
+    @property
+    def bound(self):
+        return self._connection.bound
+
+    @property
+    def extend(self):
+        return self._connection.extend
+
+    def open(self, read_server_info=True):
+        self._round_trip()
+        self._connection.open(read_server_info=False)
+
+    def rebind(self, user=None, password=None, read_server_info=True, **kwargs):
+        self._round_trip()
+        try:
+            status = self._connection.rebind(user=user, password=password)
+        except LDAPBindError:
+            status = False
+        return status, self._connection.result, None, None
+
+    def search(self, *args, **kwargs):
+        self._round_trip()
+        status = self._connection.search(*args, **kwargs)
+        return status, self._connection.result, self._connection.response, None
+
+    def unbind(self):
+        return self._connection.unbind()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.unbind()
+
+    def _round_trip(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+
+def build_directory(users: int, admins: int) -> ldap3.Server:
+    """Create an in-memory directory with the given number of users, the first ones being admins"""
+    server = ldap3.Server("bench-ldap", get_info=ldap3.NONE)
+    connection = _MockConnection(server, client_strategy=ldap3.MOCK_SYNC)
+    strategy = connection.strategy
+    strategy.add_entry(BASE_DN, {"objectClass": "domain"})
+    strategy.add_entry(PEOPLE_DN, {"objectClass": "organizationalUnit"})
+    strategy.add_entry(GROUPS_DN, {"objectClass": "organizationalUnit"})
+
+    members = []
+    for i in range(users):
+        dn = f"uid={username(i)},{PEOPLE_DN}"
+        strategy.add_entry(
+            dn,
+            {
+                "objectClass": "person",
+                "uid": username(i),
+                "userPassword": password(i),
+            },
+        )
+        members.append(dn)
+
+    strategy.add_entry(
+        ADMIN_GROUP_DN,
+        {
+            "objectClass": "groupOfUniqueNames",
+            "cn": "test-admin",
+            "uniqueMember": members[:admins] or [""],
+        },
+    )
+    strategy.add_entry(
+        USER_GROUP_DN,
+        {
+            "objectClass": "groupOfUniqueNames",
+            "cn": "test-user",
+            "uniqueMember": members or [""],
+        },
+    )
+    return server
+
+
+def username(i: int) -> str:
+    return f"user{i:05d}"
+
+
+def password(i: int) -> str:
+    return f"password{i}"
+
+
+def auth_headers(i: int) -> dict:
+    token = base64.b64encode(f"{username(i)}:{password(i)}".encode()).decode()
+    return {"Authorization": f"Basic {token}"}
+
+
+def load_ldap_module(env: dict):
+    """Import a fresh copy of the LDAP module, its configuration is read at import time"""
+    os.environ.update(env)
+    old = sys.modules.pop("mlflowstack.auth.ldap", None)
+    if old is not None:
+        snapshot = getattr(old.get_group_snapshot, "_cache", None)
+        if snapshot is not None:
+            snapshot.stop()
+        servers = getattr(old.get_server_pool, "_cache", None)
+        if servers is not None:
+            servers.stop()
+    return importlib.import_module("mlflowstack.auth.ldap")
+
+
+def build_app(ldap_module) -> Flask:
+    app = Flask(__name__)
+
+    @app.before_request
+    def authenticate():
+        result = ldap_module.authenticate_request_basic_auth()
+        if isinstance(result, Response):
+            return result
+
+    @app.route("/")
+    def index():
+        return "ok"
+
+    return app
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_load(app: Flask, concurrency: int, requests: int, users: int) -> dict:
+    """Send requests from concurrency threads, cycling through the users, and collect latencies"""
+    latencies = [[] for _ in range(concurrency)]
+    failures = [0] * concurrency
+    start = threading.Barrier(concurrency + 1)
+
+    def worker(n: int):
+        client = app.test_client()
+        start.wait()
+        for i in range(n, requests, concurrency):
+            headers = auth_headers(i % users)
+            begin = time.perf_counter()
+            response = client.get("/", headers=headers)
+            latencies[n].append(time.perf_counter() - begin)
+            if response.status_code != 200:
+                failures[n] += 1
+
+    threads = [
+        threading.Thread(target=worker, args=(n,), daemon=True)
+        for n in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+
+    samples = [
+        latency for worker_latencies in latencies for latency in worker_latencies
+    ]
+    return {
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "failures": sum(failures),
+        "seconds": round(elapsed, 4),
+        "requests_per_second": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.fmean(samples) * 1000, 3) if samples else 0.0,
+            "p50": round(percentile(samples, 50) * 1000, 3),
+            "p95": round(percentile(samples, 95) * 1000, 3),
+            "p99": round(percentile(samples, 99) * 1000, 3),
+            "max": round(max(samples, default=0.0) * 1000, 3),
+        },
+    }
+
+
+def measure_allocations(app: Flask, requests: int, users: int) -> dict:
+    """Trace memory over sequential requests, reporting the peak and what each request leaves behind"""
+    client = app.test_client()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        for i in range(requests):
+            client.get("/", headers=auth_headers(i % users))
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    diff = after.compare_to(before, "filename")
+    retained = sum(stat.size_diff for stat in diff)
+    blocks = sum(stat.count_diff for stat in diff)
+    return {
+        "requests": requests,
+        "peak_kib": round(peak / 1024, 2),
+        "retained_bytes_per_request": round(retained / requests, 1) if requests else 0,
+        "retained_blocks_per_request": round(blocks / requests, 2) if requests else 0,
+    }
+
+
+def run_level(env: dict, server: ldap3.Server, args, concurrency: int) -> dict:
+    """Benchmark one concurrency level against a freshly imported module and empty auth store"""
+    from mlflow.server.auth.sqlalchemy_store import SqlAlchemyStore
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SqlAlchemyStore()
+        store.init_db(f"sqlite:///{os.path.join(tmp, 'auth.db')}")
+        ldap_module = load_ldap_module(env)
+        with (
+            mock.patch.object(ldap_module, "_auth_store", store),
+            mock.patch.object(ldap_module, "_build_server", lambda uri: server),
+            mock.patch("ldap3.Connection", LatencyConnection),
+        ):
+            app = build_app(ldap_module)
+            if args.warmup:
+                run_load(app, concurrency, args.warmup, args.users)
+            result = run_load(app, concurrency, args.requests, args.users)
+            if args.alloc_requests:
+                result["allocations"] = measure_allocations(
+                    app, args.alloc_requests, args.users
+                )
+        store.engine.dispose()
+    return result
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def package_version(name: str) -> str:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Print throughput and p95 changes per concurrency level, returning the regressed levels"""
+    previous = {level["concurrency"]: level for level in baseline["levels"]}
+    regressions = []
+    for level in results["levels"]:
+        old = previous.get(level["concurrency"])
+        if old is None:
+            continue
+        rps_change = (
+            level["requests_per_second"] / old["requests_per_second"] - 1
+            if old["requests_per_second"]
+            else 0.0
+        )
+        p95_change = (
+            level["latency_ms"]["p95"] / old["latency_ms"]["p95"] - 1
+            if old["latency_ms"]["p95"]
+            else 0.0
+        )
+        print(
+            f"concurrency {level['concurrency']:>4}: "
+            f"rps {old['requests_per_second']:>10.2f} -> {level['requests_per_second']:>10.2f} "
+            f"({rps_change:+.1%}), p95 {old['latency_ms']['p95']:.3f} -> "
+            f"{level['latency_ms']['p95']:.3f} ms ({p95_change:+.1%})"
+        )
+        if rps_change < -threshold:
+            regressions.append(level["concurrency"])
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--concurrency",
+        default="1,8,32",
+        help="comma-separated numbers of concurrent clients (default: 1,8,32)",
+    )
+    parser.add_argument("--requests", type=int, default=1000, help="requests per level")
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        help="requests sent before measuring (default: one per user, so first logins are excluded)",
+    )
+    parser.add_argument(
+        "--users", type=int, default=50, help="distinct users cycled through"
+    )
+    parser.add_argument(
+        "--admins", type=int, default=5, help="how many of the users are admins"
+    )
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=2.0,
+        help="injected latency per LDAP round trip (open, bind, search)",
+    )
+    parser.add_argument(
+        "--alloc-requests",
+        type=int,
+        default=200,
+        help="sequential requests traced for allocations, 0 to skip",
+    )
+    parser.add_argument(
+        "--env",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="extra environment for the LDAP module, e.g. LDAP_POOL_SIZE=8",
+    )
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative throughput drop reported as a regression (default: 0.1)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.warmup is None:
+        args.warmup = args.users
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger("mlflowstack").setLevel(logging.WARNING)
+
+    env = dict(DEFAULT_ENV)
+    env.update(item.split("=", 1) for item in args.env)
+    LatencyConnection.latency = args.latency_ms / 1000
+    server = build_directory(args.users, args.admins)
+
+    levels = []
+    for concurrency in (int(c) for c in args.concurrency.split(",") if c.strip()):
+        level = run_level(env, server, args, concurrency)
+        levels.append(level)
+        print(
+            f"concurrency {concurrency:>4}: {level['requests_per_second']:>10.2f} req/s, "
+            f"p50 {level['latency_ms']['p50']:.3f} ms, p95 {level['latency_ms']['p95']:.3f} ms, "
+            f"p99 {level['latency_ms']['p99']:.3f} ms, failures {level['failures']}"
+        )
+
+    results = {
+        "metadata": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "ldap3": package_version("ldap3"),
+            "mlflow": package_version("mlflow"),
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "users": args.users,
+            "admins": args.admins,
+            "latency_ms": args.latency_ms,
+            "env": env,
+        },
+        "levels": levels,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,15 @@
+import pytest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Clock the tests move forward by hand through its now attribute"""
+    return FakeClock()
@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy import create_engine
+
+from mlflowstack.auth.api_keys import ApiKeyStore, is_api_key
+
+
+@pytest.fixture
+def api_keys(tmp_path, clock):
+    engine = create_engine(f"sqlite:///{tmp_path / 'auth.db'}")
+    return ApiKeyStore(engine, b"secret", cache_ttl=60, cache_size=10, clock=clock)
+
+def test_created_key_verifies_with_its_role(api_keys):
+    key = api_keys.create("ci-bot", is_admin=True)
+
+    api_key = api_keys.verify(key)
+    assert api_key.username == "ci-bot"
+    assert api_key.is_admin
+    assert api_keys.list("ci-bot") == [api_key]
+
+def test_wrong_secret_or_unknown_key_is_rejected(api_keys):
+    key = api_keys.create("ci-bot", is_admin=False)
+    key_id = key.split("_")[1]
+
+    assert api_keys.verify(f"mlk_{key_id}_wrong-secret") is None
+    assert api_keys.verify("mlk_0123456789abcdef_secret") is None
+    assert api_keys.verify("mlk_") is None
+    assert api_keys.verify("password") is None
+
+def test_only_the_exact_key_shape_is_an_api_key(api_keys):
+    assert is_api_key(api_keys.create("ci-bot", is_admin=False))
+    assert not is_api_key("mlk_my-password")
+    assert not is_api_key(f"mlk_{'0' * 16}_too-short")
+
+def test_hot_keys_are_served_from_cache(api_keys, mocker):
+    key = api_keys.create("ci-bot", is_admin=False)
+    api_keys.verify(key)
+
+    session = mocker.spy(api_keys, "_session")
+    assert api_keys.verify(key).username == "ci-bot"
+    session.assert_not_called()
+
+def test_revoked_and_expired_keys_are_rejected(api_keys, clock):
+    revoked = api_keys.create("ci-bot", is_admin=False)
+    expiring = api_keys.create("batch", is_admin=False, lifetime=3600)
+    api_keys.verify(revoked)
+    api_keys.verify(expiring)
+
+    assert api_keys.revoke(revoked.split("_")[1])
+    assert api_keys.verify(revoked) is None
+
+    clock.now += 3600
+    assert api_keys.verify(expiring) is None
@@ -0,0 +1,33 @@
+import pytest
+from starlette.applications import Starlette
+
+from mlflowstack.auth import app
+
+
+@pytest.fixture
+def auth_app(mocker):
+    mocker.patch.object(app, "install")
+    mocker.patch.object(app, "warm_up")
+    starlette_app = Starlette()
+    mocker.patch("mlflow.server.auth.create_app", return_value=starlette_app)
+    return starlette_app
+
+
+def test_ldap_logins_are_verified_by_the_middleware(mocker, auth_app):
+    mocker.patch(
+        "mlflow.server.auth.auth_config",
+        authorization_function="mlflowstack.auth.ldap:authenticate_request_basic_auth",
+    )
+
+    assert app.create_app() is auth_app
+    assert [m.cls for m in auth_app.user_middleware] == [app.LDAPLoginMiddleware]
+
+def test_other_auth_functions_get_no_middleware(mocker, auth_app):
+    mocker.patch(
+        "mlflow.server.auth.auth_config",
+        authorization_function="mlflowstack.auth.basic:authenticate_request_basic_auth",
+    )
+
+    app.create_app()
+
+    assert auth_app.user_middleware == []
@@ -0,0 +1,77 @@
+import json
+import threading
+
+from mlflowstack.auth.audit import AuditLog, FileWriter, log_writer
+
+
+def test_full_queue_drops_events_without_blocking():
+    dropped = []
+    audit = AuditLog(
+        write=lambda batch: None,
+        queue_size=2,
+        batch_size=10,
+        flush_interval=0.01,
+        on_drop=lambda: dropped.append(1),
+    )
+
+    for i in range(5):
+        audit.record(user=f"user{i}", outcome="user")
+
+    assert audit.dropped == 3
+    assert len(dropped) == 3
+
+def test_writer_thread_writes_events_in_batches():
+    batches = []
+    written = threading.Event()
+
+    def write(batch):
+        batches.append(batch)
+        if sum(len(b) for b in batches) == 5:
+            written.set()
+
+    audit = AuditLog(write=write, queue_size=100, batch_size=2, flush_interval=0.01)
+    for i in range(5):
+        audit.record(user=f"user{i}", outcome="user")
+    audit.start()
+
+    assert written.wait(5)
+    audit.close()
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [event["user"] for batch in batches for event in batch] == [
+        f"user{i}" for i in range(5)
+    ]
+    assert all("ts" in event for batch in batches for event in batch)
+
+def test_close_flushes_queued_events_and_survives_write_errors(tmp_path):
+    path = tmp_path / "audit.jsonl"
+    writer = FileWriter(str(path))
+    calls = []
+
+    def write(batch):
+        calls.append(len(batch))
+        if len(calls) == 1:
+            raise OSError("disk full")
+        writer(batch)
+
+    audit = AuditLog(write=write, queue_size=100, batch_size=1, flush_interval=0.01)
+    audit.record(user="lost", outcome="user")
+    audit.record(user="user1", outcome="unauthorized", server="ldap://my-ldap:3890")
+    audit.close()
+
+    events = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(e["user"], e["outcome"]) for e in events] == [("user1", "unauthorized")]
+    assert events[0]["server"] == "ldap://my-ldap:3890"
+
+def test_log_sink_keeps_events_apart_from_diagnostics(caplog):
+    caplog.set_level("INFO")
+
+    log_writer([{"user": "user1", "outcome": "user"}])
+    audit = AuditLog(
+        write=lambda batch: 1 / 0, queue_size=10, batch_size=1, flush_interval=0.01
+    )
+    audit.record(user="user2", outcome="user")
+    audit.close()
+
+    events = [r for r in caplog.records if r.name == "mlflowstack.audit"]
+    assert [json.loads(r.getMessage())["user"] for r in events] == ["user1"]
+    assert any(r.name == "mlflowstack.auth.audit" for r in caplog.records)
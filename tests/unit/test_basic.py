@@ -0,0 +1,105 @@
+import base64
+import os
+import sys
+
+import pytest
+from flask import Flask
+
+
+def basic_auth_header(username, password):
+    credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
+    return {"Authorization": f"Basic {credentials}"}
+
+
+@pytest.fixture
+def basic(mocker, tmp_path):
+    mocker.patch.dict(
+        os.environ,
+        {
+            "BASIC_AUTH_CACHE_PATH": str(tmp_path / "cache.db"),
+            "BASIC_AUTH_CACHE_SECRET": "cache-secret",
+        },
+    )
+    sys.modules.pop("mlflowstack.auth.basic", None)
+    from mlflowstack.auth import basic
+
+    yield basic
+    sys.modules.pop("mlflowstack.auth.basic", None)
+
+
+@pytest.fixture
+def auth_store(mocker, tmp_path, basic):
+    from mlflow.server.auth.sqlalchemy_store import SqlAlchemyStore
+
+    store = SqlAlchemyStore()
+    store.init_db(f"sqlite:///{tmp_path / 'auth.db'}")
+    store.create_user("alice", "alice-password", is_admin=False)
+    mocker.patch.object(basic, "_auth_store", store)
+    return store
+
+
+def test_verified_credentials_skip_the_password_check(mocker, basic, auth_store):
+    check = mocker.spy(auth_store, "authenticate_user")
+
+    assert basic.authenticate_user("alice", "alice-password") == basic.StoreUser(
+        "alice", is_admin=False, authenticated=True
+    )
+    assert basic.authenticate_user("alice", "alice-password").authenticated
+    assert not basic.authenticate_user("alice", "wrong").authenticated
+    assert not basic.authenticate_user("alice", "wrong").authenticated
+
+    assert check.call_count == 2
+
+def test_auth_function_runs_once_per_request(mocker, basic, auth_store):
+    check = mocker.spy(basic, "authenticate_user")
+    app = Flask(__name__)
+
+    with app.test_request_context(headers=basic_auth_header("alice", "alice-password")):
+        assert basic.authenticate_request_basic_auth().username == "alice"
+        assert basic.authenticate_request_basic_auth().username == "alice"
+    with app.test_request_context(headers=basic_auth_header("alice", "wrong")):
+        assert basic.authenticate_request_basic_auth().status_code == 401
+    with app.test_request_context():
+        assert basic.authenticate_request_basic_auth().status_code == 401
+
+    assert check.call_count == 2
+
+def test_password_change_through_the_api_drops_cached_logins(mocker, basic, auth_store):
+    app = Flask(__name__)
+
+    @app.before_request
+    def authenticate():
+        result = basic.authenticate_request_basic_auth()
+        if not hasattr(result, "username"):
+            return result
+
+    @app.patch("/api/2.0/mlflow/users/update-password")
+    def update_password():
+        from flask import request
+
+        auth_store.update_user(request.json["username"], password=request.json["password"])
+        return {}
+
+    client = app.test_client()
+    old = basic_auth_header("alice", "alice-password")
+    response = client.patch(
+        "/api/2.0/mlflow/users/update-password",
+        json={"username": "alice", "password": "new-password"},
+        headers=old,
+    )
+    assert response.status_code == 200
+
+    assert not basic.authenticate_user("alice", "alice-password").authenticated
+    assert basic.authenticate_user("alice", "new-password").authenticated
+
+def test_cache_requires_a_secret_and_a_shared_backend(mocker, basic):
+    from mlflow.exceptions import MlflowException
+
+    mocker.patch.object(basic, "BASIC_AUTH_CACHE_SECRET", "")
+    with pytest.raises(MlflowException, match="set BASIC_AUTH_CACHE_SECRET"):
+        basic._build_credential_cache()
+
+    mocker.patch.object(basic, "BASIC_AUTH_CACHE_SECRET", "cache-secret")
+    mocker.patch.object(basic, "BASIC_AUTH_CACHE_BACKEND", "memory")
+    with pytest.raises(MlflowException, match="use file or redis"):
+        basic._build_credential_cache()
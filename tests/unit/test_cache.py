@@ -0,0 +1,67 @@
+from mlflowstack.auth.cache import TTLCache, credential_digest
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(10, clock=clock)
+
+    cache.set("key", "value", ttl=5)
+    assert cache.get("key") == "value"
+
+    clock.now = 5
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(2)
+
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")
+    cache.set("c", 3, ttl=60)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+def test_zero_ttl_is_not_stored():
+    cache = TTLCache(2)
+
+    cache.set("a", 1, ttl=0)
+
+    assert cache.get("a") is None
+
+def test_credential_digest_is_salted_per_user():
+    salt = b"0123456789abcdef"
+
+    assert credential_digest("user1", "secret", salt, 10) == credential_digest(
+        "user1", "secret", salt, 10
+    )
+    assert credential_digest("user1", "secret", salt, 10) != credential_digest(
+        "user2", "secret", salt, 10
+    )
+    assert credential_digest("user1", "secret", salt, 10) != credential_digest(
+        "user1", "secret", b"fedcba9876543210", 10
+    )
+
+def test_expired_entry_is_served_stale_within_grace(clock):
+    cache = TTLCache(10, grace=30, clock=clock)
+    cache.set("key", "value", ttl=5)
+
+    clock.now = 10
+    assert cache.get("key") is None
+    assert cache.get_stale("key") == "value"
+
+    clock.now = 35
+    assert cache.get_stale("key") is None
+    assert len(cache) == 0
+
+def test_invalidate_drops_entries_of_one_user():
+    cache = TTLCache(10)
+    cache.set(("user1", b"a"), 1, ttl=60)
+    cache.set(("user1", b"b"), 2, ttl=60)
+    cache.set(("user2", b"a"), 3, ttl=60)
+
+    assert cache.invalidate("user1") == 2
+    assert cache.get(("user2", b"a")) == 3
+    assert cache.invalidate() == 1
+    assert len(cache) == 0
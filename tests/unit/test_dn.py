@@ -0,0 +1,32 @@
+from mlflowstack.auth.dn import matching_dns, normalize_dn, normalize_dns
+
+
+def test_normalize_dn_ignores_case_and_spacing():
+    assert normalize_dn("CN=Test-Admin , OU=Groups,dc=mlflow, DC=test") == normalize_dn(
+        "cn=test-admin,ou=groups,dc=mlflow,dc=test"
+    )
+
+def test_normalize_dn_keeps_escaped_commas():
+    assert normalize_dn(r"CN=Doe\, John,OU=People") == r"cn=doe\, john,ou=people"
+
+def test_normalize_dns_accepts_single_and_multi_valued_attributes():
+    assert normalize_dns("CN=Admins,DC=test") == {"cn=admins,dc=test"}
+    assert normalize_dns(["CN=Admins, DC=test", "cn=users,dc=test"]) == {
+        "cn=admins,dc=test",
+        "cn=users,dc=test",
+    }
+    assert normalize_dns(None) == frozenset()
+
+def test_matching_dns_stops_once_every_wanted_dn_was_seen():
+    wanted = frozenset(("cn=admins,dc=test", "cn=users,dc=test"))
+    seen = []
+
+    def members():
+        for dn in ["uid=alice,dc=test", "CN=Users, DC=test", "cn=admins,dc=test", "uid=bob,dc=test"]:
+            seen.append(dn)
+            yield dn
+
+    assert matching_dns(members(), wanted) == wanted
+    assert len(seen) == 3
+    assert matching_dns("CN=Admins,DC=test", wanted) == {"cn=admins,dc=test"}
+    assert matching_dns(None, wanted) == frozenset()
@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+from mlflowstack.auth.failover import ServerPool, ServerState
+
+
+def make_servers(clock, *names):
+    states = [ServerState(server=SimpleNamespace(host=name, port=389)) for name in names]
+    return ServerPool(states, backoff=5, max_backoff=20, clock=clock), states
+
+
+def test_fastest_server_is_preferred(clock):
+    servers, (dc1, dc2) = make_servers(clock, "dc1", "dc2")
+
+    servers.record_success(dc1, 0.200)
+    servers.record_success(dc2, 0.010)
+
+    assert servers.candidates() == [dc2, dc1]
+
+def test_latency_is_smoothed(clock):
+    servers, (dc1,) = make_servers(clock, "dc1")
+
+    servers.record_success(dc1, 0.100)
+    servers.record_success(dc1, 0.200)
+
+    assert abs(dc1.latency - 0.130) < 1e-9
+
+def test_failing_server_is_ejected_with_backoff(clock):
+    servers, (dc1, dc2) = make_servers(clock, "dc1", "dc2")
+    servers.record_success(dc1, 0.010)
+    servers.record_success(dc2, 0.200)
+
+    servers.record_failure(dc1)
+    assert servers.candidates() == [dc2, dc1]
+
+    clock.now = 5
+    assert servers.candidates() == [dc1, dc2]
+
+    servers.record_failure(dc1)
+    servers.record_failure(dc1)
+    assert dc1.ejected_until == 25
+
+    servers.record_failure(dc1)
+    assert dc1.ejected_until == 25
+
+    servers.record_success(dc1, 0.010)
+    assert dc1.failures == 0
+    assert servers.candidates()[0] is dc1
+
+def test_health_check_records_outcome(mocker, clock):
+    servers, (dc1, dc2) = make_servers(clock, "dc1", "dc2")
+
+    def connection(server, **kwargs):
+        conn = mocker.MagicMock()
+        if server.host == "dc1":
+            conn.open.side_effect = OSError("unreachable")
+        return conn
+
+    mocker.patch("ldap3.Connection", side_effect=connection)
+
+    servers.check()
+
+    assert dc1.failures == 1
+    assert dc2.failures == 0
+    assert dc2.latency is not None
@@ -1,5 +1,7 @@
 import os
 import sys
+import threading
+import time
 import pytest
 
 
@@ -64,6 +66,8 @@ def test_resolve_user_lldap_admin_from_dn(mocker):
         search_scope="SUBTREE",
         attributes="dn",
         get_operational_attributes=False,
+        size_limit=0,
+        time_limit=10,
     )
 
 def test_resolve_user_lldap_admin_from_attributes_when_dn_is_list(mocker):
@@ -104,6 +108,8 @@ def test_resolve_user_lldap_admin_from_attributes_when_dn_is_list(mocker):
         search_scope="SUBTREE",
         attributes="dn",
         get_operational_attributes=False,
+        size_limit=0,
+        time_limit=10,
     )
 
 def test_resolve_user_lldap_admin_from_attributes_when_dn_is_string(mocker):
@@ -144,6 +150,8 @@ def test_resolve_user_lldap_admin_from_attributes_when_dn_is_string(mocker):
         search_scope="SUBTREE",
         attributes="dn",
         get_operational_attributes=False,
+        size_limit=0,
+        time_limit=10,
     )
 
 def test_resolve_user_ad_user_when_dn_is_list(mocker):
@@ -184,6 +192,8 @@ def test_resolve_user_ad_user_when_dn_is_list(mocker):
         search_scope="SUBTREE",
         attributes="dn",
         get_operational_attributes=False,
+        size_limit=0,
+        time_limit=10,
     )
 
 def test_resolve_user_ad_user_when_dn_is_string(mocker):
@@ -224,6 +234,8 @@ def test_resolve_user_ad_user_when_dn_is_string(mocker):
         search_scope="SUBTREE",
         attributes="dn",
         get_operational_attributes=False,
+        size_limit=0,
+        time_limit=10,
     )
 
 def test_resolve_user_ad_user(mocker):
@@ -262,6 +274,8 @@ def test_resolve_user_ad_user(mocker):
         search_scope="SUBTREE",
         attributes="dn",
         get_operational_attributes=False,
+        size_limit=0,
+        time_limit=10,
     )
 
 def test_resolve_user_search_failure(mocker):
@@ -288,3 +302,1091 @@ def test_resolve_user_search_failure(mocker):
     result = resolve_user("testuser", "password")
 
     assert result == UserInfo(name="testuser", is_user=False, is_admin=False)
+
+def test_authenticate_user_serves_repeated_login_from_cache(mocker):
+    from mlflowstack.auth.ldap import authenticate_user, UserInfo
+
+    mocker.patch("ldap3.Server")
+    mock_conn = mocker.MagicMock()
+    connection = mocker.patch("ldap3.Connection")
+    connection.return_value.__enter__.return_value = mock_conn
+    mock_conn.search.return_value = (
+        True,
+        None,
+        [
+            {
+                "dn": "cn=test-user,ou=groups,dc=mlflow,dc=test",
+                "attributes": {"dn": []},
+                "type": "searchResEntry",
+            }
+        ],
+        None,
+    )
+
+    assert authenticate_user("user1", "user1-123456") == UserInfo(name="user1", is_user=True)
+    assert authenticate_user("user1", "user1-123456") == UserInfo(name="user1", is_user=True)
+    assert connection.call_count == 1
+
+    # A different password is a different cache key and goes back to LDAP
+    authenticate_user("user1", "another-password")
+    assert connection.call_count == 2
+
+def test_authenticate_user_caches_rejected_password(mocker):
+    from ldap3.core.exceptions import LDAPBindError
+    from mlflowstack.auth.ldap import authenticate_user, UserInfo
+
+    mocker.patch("ldap3.Server")
+    connection = mocker.patch("ldap3.Connection")
+    connection.side_effect = LDAPBindError("invalidCredentials")
+
+    with pytest.raises(LDAPBindError):
+        authenticate_user("user1", "wrong-password")
+
+    assert authenticate_user("user1", "wrong-password") == UserInfo(name="user1")
+    assert connection.call_count == 1
+
+def test_authenticate_user_does_not_cache_connection_errors(mocker):
+    from ldap3.core.exceptions import LDAPSocketOpenError
+    from mlflowstack.auth.ldap import authenticate_user
+
+    mocker.patch("ldap3.Server")
+    connection = mocker.patch("ldap3.Connection")
+    connection.side_effect = LDAPSocketOpenError("unreachable")
+
+    for _ in range(2):
+        with pytest.raises(LDAPSocketOpenError):
+            authenticate_user("user1", "user1-123456")
+    assert connection.call_count == 2
+
+def test_authenticate_user_without_cache(mocker):
+    mocker.patch.dict(os.environ, {"LDAP_CACHE_TTL": "0"})
+
+    from mlflowstack.auth.ldap import authenticate_user
+
+    mocker.patch("ldap3.Server")
+    connection = mocker.patch("ldap3.Connection")
+    connection.return_value.__enter__.return_value.search.return_value = (True, None, [], None)
+
+    authenticate_user("user1", "user1-123456")
+    authenticate_user("user1", "user1-123456")
+    assert connection.call_count == 2
+
+def test_resolve_user_reuses_pooled_connection(mocker):
+    mocker.patch.dict(os.environ, {"LDAP_POOL_SIZE": "2"})
+
+    from mlflowstack.auth.ldap import resolve_user, UserInfo
+
+    server = mocker.patch("ldap3.Server")
+    mock_conn = mocker.MagicMock()
+    mock_conn.closed = False
+    mock_conn.rebind.return_value = (True, {"description": "success"}, None, None)
+    connection = mocker.patch("ldap3.Connection", return_value=mock_conn)
+    mock_conn.search.return_value = (
+        True,
+        None,
+        [
+            {
+                "dn": "cn=test-user,ou=groups,dc=mlflow,dc=test",
+                "attributes": {"dn": []},
+                "type": "searchResEntry",
+            }
+        ],
+        None,
+    )
+
+    assert resolve_user("user1", "user1-123456") == UserInfo(name="user1", is_user=True)
+    assert resolve_user("user1", "user1-123456") == UserInfo(name="user1", is_user=True)
+
+    assert connection.call_count == 1
+    assert server.call_count == 1
+    mock_conn.rebind.assert_called_with(
+        user="uid=user1,ou=people,dc=mlflow,dc=test", password="user1-123456", read_server_info=False
+    )
+
+@pytest.fixture
+def sqlite_auth_store(tmp_path):
+    from mlflow.server.auth.sqlalchemy_store import SqlAlchemyStore
+
+    store = SqlAlchemyStore()
+    store.init_db(f"sqlite:///{tmp_path / 'auth.db'}")
+    return store
+
+def test_user_info_update_writes_only_new_users_and_role_changes(mocker, sqlite_auth_store):
+    import mlflowstack.auth.ldap as ldap
+    from mlflowstack.auth.ldap import UserInfo
+
+    mocker.patch.object(ldap, "_auth_store", sqlite_auth_store)
+    create_user = mocker.spy(sqlite_auth_store, "create_user")
+    upsert_user = mocker.spy(ldap, "_upsert_user")
+
+    UserInfo(name="user1", is_user=True).update()
+    assert sqlite_auth_store.get_user("user1").is_admin is False
+    assert create_user.call_count == 1
+
+    UserInfo(name="user1", is_user=True).update()
+    assert upsert_user.call_count == 1
+
+    UserInfo(name="user1", is_admin=True).update()
+    assert sqlite_auth_store.get_user("user1").is_admin is True
+    assert upsert_user.call_count == 2
+    assert create_user.call_count == 1
+
+def test_deleted_user_is_created_again_on_next_login(mocker, sqlite_auth_store):
+    import pytest
+    from mlflow.exceptions import MlflowException
+    import mlflowstack.auth.ldap as ldap
+    from mlflowstack.auth.ldap import UserInfo
+
+    mocker.patch.object(ldap, "_auth_store", sqlite_auth_store)
+    ldap._watch_user_deletion(sqlite_auth_store)
+
+    UserInfo(name="user1", is_user=True).update()
+    sqlite_auth_store.delete_user("user1")
+    UserInfo(name="user1", is_user=True).update()
+    assert sqlite_auth_store.has_user("user1")
+
+    # Deleted through another worker, the failed lookup after login forgets the synced role
+    UserInfo(name="user2", is_user=True).update()
+    sqlite_auth_store.delete_user("user2")
+    ldap._synced_roles.set("user2", False, 60)
+    with pytest.raises(MlflowException):
+        sqlite_auth_store.get_user("user2")
+    UserInfo(name="user2", is_user=True).update()
+    assert sqlite_auth_store.has_user("user2")
+
+def test_user_info_update_skips_unauthenticated_user(mocker):
+    import mlflowstack.auth.ldap as ldap
+    from mlflowstack.auth.ldap import UserInfo
+
+    upsert_user = mocker.patch.object(ldap, "_upsert_user")
+
+    UserInfo(name="user1").update()
+
+    upsert_user.assert_not_called()
+
+def test_resolve_user_from_group_snapshot_skips_search(mocker):
+    mocker.patch.dict(os.environ, {"LDAP_GROUP_RESOLUTION": "snapshot"})
+
+    import mlflowstack.auth.ldap as ldap
+    from mlflowstack.auth.ldap import resolve_user, UserInfo
+
+    mocker.patch("ldap3.Server")
+    mocker.patch.object(ldap.GroupSnapshot, "start")
+    snapshot = ldap.get_group_snapshot()
+    snapshot._members = {
+        "cn=test-admin,ou=groups,dc=mlflow,dc=test": frozenset(
+            {"uid=admin1,ou=people,dc=mlflow,dc=test"}
+        ),
+        "cn=test-user,ou=groups,dc=mlflow,dc=test": frozenset(),
+    }
+    snapshot.loaded_at = 0.0
+
+    mock_conn = mocker.MagicMock()
+    mocker.patch("ldap3.Connection").return_value.__enter__.return_value = mock_conn
+
+    assert resolve_user("admin1", "admin1-123456") == UserInfo(name="admin1", is_admin=True)
+    assert resolve_user("user1", "user1-123456") == UserInfo(name="user1")
+    mock_conn.search.assert_not_called()
+
+def test_group_snapshot_loads_without_holding_the_server_lock(mocker):
+    mocker.patch.dict(os.environ, {"LDAP_GROUP_RESOLUTION": "snapshot", "LDAP_POOL_SIZE": "0"})
+
+    import threading
+    import time
+    import mlflowstack.auth.ldap as ldap
+
+    mocker.patch("ldap3.Server")
+    mock_conn = mocker.MagicMock()
+    mocker.patch("ldap3.Connection").return_value.__enter__.return_value = mock_conn
+    mock_conn.extend.standard.paged_search.side_effect = lambda search_base, **kwargs: iter(
+        [{"dn": search_base, "attributes": {"member": ["uid=admin1,ou=people,dc=mlflow,dc=test"]}}]
+    )
+
+    # The first login builds the snapshot on a fresh worker, nothing built the server pool yet
+    first_login = threading.Thread(target=ldap.get_group_snapshot, daemon=True)
+    first_login.start()
+    first_login.join(5)
+    assert not first_login.is_alive()
+
+    snapshot = ldap.get_group_snapshot()
+    for _ in range(50):
+        if snapshot.ready:
+            break
+        time.sleep(0.1)
+    snapshot.stop()
+    assert snapshot.is_member("cn=test-admin,ou=groups,dc=mlflow,dc=test", "uid=admin1,ou=people,dc=mlflow,dc=test")
+
+def test_resolve_user_falls_back_to_search_until_snapshot_is_loaded(mocker):
+    mocker.patch.dict(os.environ, {"LDAP_GROUP_RESOLUTION": "snapshot"})
+
+    import mlflowstack.auth.ldap as ldap
+    from mlflowstack.auth.ldap import resolve_user, UserInfo
+
+    mocker.patch("ldap3.Server")
+    mocker.patch.object(ldap.GroupSnapshot, "start")
+    mock_conn = mocker.MagicMock()
+    mocker.patch("ldap3.Connection").return_value.__enter__.return_value = mock_conn
+    mock_conn.search.return_value = (
+        True,
+        None,
+        [{"dn": "cn=test-user,ou=groups,dc=mlflow,dc=test", "attributes": {"dn": []}}],
+        None,
+    )
+
+    assert resolve_user("user1", "user1-123456") == UserInfo(name="user1", is_user=True)
+    mock_conn.search.assert_called_once()
+
+def test_authenticate_user_coalesces_concurrent_logins(mocker):
+    mocker.patch.dict(os.environ, {"LDAP_CACHE_TTL": "0"})
+
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    import mlflowstack.auth.ldap as ldap
+    from mlflowstack.auth.ldap import authenticate_user, UserInfo
+
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_resolve(username, password):
+        started.set()
+        release.wait(5)
+        return UserInfo(name=username, is_user=True)
+
+    resolve_user = mocker.patch.object(ldap, "resolve_user", side_effect=slow_resolve)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(authenticate_user, "svc", "svc-password")
+        started.wait(5)
+        follower = executor.submit(authenticate_user, "svc", "svc-password")
+        key = next(iter(ldap._inflight._calls))
+        while ldap._inflight.waiting(key) < 1:
+            time.sleep(0.001)
+        release.set()
+
+        assert leader.result() == follower.result() == UserInfo(name="svc", is_user=True)
+
+    assert resolve_user.call_count == 1
+
+def test_coalesced_logins_take_one_token_of_the_login_budget(mocker):
+    mocker.patch.dict(
+        os.environ,
+        {"LDAP_CACHE_TTL": "0", "LDAP_THROTTLE_RATE": "0.001", "LDAP_THROTTLE_BURST": "1"},
+    )
+
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    import mlflowstack.auth.ldap as ldap
+    from mlflowstack.auth.ldap import authenticate_user, UserInfo
+
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_resolve(username, password):
+        started.set()
+        release.wait(5)
+        return UserInfo(name=username, is_user=True)
+
+    mocker.patch.object(ldap, "resolve_user", side_effect=slow_resolve)
+    acquire = mocker.spy(ldap._throttle, "acquire")
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        leader = executor.submit(authenticate_user, "svc", "svc-password", "10.0.0.1")
+        started.wait(5)
+        followers = [
+            executor.submit(authenticate_user, "svc", "svc-password", "10.0.0.1")
+            for _ in range(2)
+        ]
+        key = next(iter(ldap._inflight._calls))
+        while ldap._inflight.waiting(key) < 2 and not any(f.done() for f in followers):
+            time.sleep(0.001)
+        release.set()
+
+        assert leader.result().authenticated
+        assert all(f.result().authenticated for f in followers)
+
+    assert acquire.call_count == 1
+
+def test_get_parsed_ldap_uris_splits_servers(mocker):
+    mocker.patch.dict(
+        os.environ,
+        {"LDAP_URI": "ldap://dc1:389/dc=mlflow,dc=test, ldaps://dc2/dc=mlflow,dc=test"},
+    )
+    parse_uri = mocker.patch("ldap3.utils.uri.parse_uri")
+
+    from mlflowstack.auth.ldap import get_parsed_ldap_uris
+
+    get_parsed_ldap_uris()
+
+    assert [c.args[0] for c in parse_uri.call_args_list] == [
+        "ldap://dc1:389/dc=mlflow,dc=test",
+        "ldaps://dc2/dc=mlflow,dc=test",
+    ]
+
+def test_resolve_user_fails_over_to_next_server(mocker):
+    mocker.patch.dict(
+        os.environ,
+        {
+            "LDAP_URI": "ldap://dc1:3890/dc=mlflow,dc=test,ldap://dc2:3890/dc=mlflow,dc=test",
+            "LDAP_SERVER_HEALTH_INTERVAL": "0",
+        },
+    )
+
+    from ldap3.core.exceptions import LDAPSocketOpenError
+    from mlflowstack.auth.ldap import get_server_pool, resolve_user, UserInfo
+
+    mocker.patch(
+        "ldap3.utils.uri.parse_uri",
+        side_effect=lambda uri: {"host": uri[7:10], "port": 3890, "ssl": False},
+    )
+    mocker.patch("ldap3.Server", side_effect=lambda host, **kwargs: mocker.MagicMock(host=host))
+    mock_conn = mocker.MagicMock()
+    mock_conn.search.return_value = (
+        True,
+        None,
+        [{"dn": "cn=test-user,ou=groups,dc=mlflow,dc=test", "attributes": {"dn": []}}],
+        None,
+    )
+
+    def connection(server, **kwargs):
+        if server.host == "dc1":
+            raise LDAPSocketOpenError("unreachable")
+        conn = mocker.MagicMock()
+        conn.__enter__.return_value = mock_conn
+        return conn
+
+    mocker.patch("ldap3.Connection", side_effect=connection)
+
+    assert resolve_user("user1", "user1-123456") == UserInfo(name="user1", is_user=True)
+
+    dc1, dc2 = get_server_pool().states
+    assert dc1.failures == 1
+    assert get_server_pool().candidates() == [dc2, dc1]
+
+def test_authenticate_user_fails_fast_when_breaker_is_open(mocker):
+    mocker.patch.dict(os.environ, {"LDAP_BREAKER_FAILURES": "2"})
+
+    from ldap3.core.exceptions import LDAPSocketOpenError
+    from mlflowstack.auth.breaker import CircuitOpenError
+    from mlflowstack.auth.ldap import authenticate_user
+
+    mocker.patch("ldap3.Server")
+    connection = mocker.patch("ldap3.Connection")
+    connection.side_effect = LDAPSocketOpenError("unreachable")
+
+    for _ in range(2):
+        with pytest.raises(LDAPSocketOpenError):
+            authenticate_user("user1", "user1-123456")
+    with pytest.raises(CircuitOpenError):
+        authenticate_user("user1", "user1-123456")
+
+    assert connection.call_count == 2
+
+def test_authenticate_user_serves_stale_decision_while_ldap_is_down(mocker):
+    mocker.patch.dict(
+        os.environ, {"LDAP_CACHE_TTL": "60", "LDAP_CACHE_STALE_GRACE": "600"}
+    )
+
+    import mlflowstack.auth.ldap as ldap
+    from ldap3.core.exceptions import LDAPSocketOpenError
+    from mlflowstack.auth.ldap import authenticate_user, UserInfo
+
+    clock = mocker.patch.object(ldap._credential_cache, "_clock", return_value=0.0)
+    resolve_user = mocker.patch.object(
+        ldap, "resolve_user", return_value=UserInfo(name="user1", is_user=True)
+    )
+    authenticate_user("user1", "user1-123456")
+
+    clock.return_value = 120.0
+    resolve_user.side_effect = LDAPSocketOpenError("unreachable")
+
+    assert authenticate_user("user1", "user1-123456") == UserInfo(name="user1", is_user=True)
+    with pytest.raises(LDAPSocketOpenError):
+        authenticate_user("user1", "another-password")
+
+    clock.return_value = 700.0
+    with pytest.raises(LDAPSocketOpenError):
+        authenticate_user("user1", "user1-123456")
+
+def test_ldap_timeouts_are_applied(mocker):
+    mocker.patch.dict(
+        os.environ, {"LDAP_CONNECT_TIMEOUT": "2", "LDAP_RECEIVE_TIMEOUT": "3"}
+    )
+
+    from mlflowstack.auth.ldap import resolve_user
+
+    server = mocker.patch("ldap3.Server")
+    connection = mocker.patch("ldap3.Connection")
+    connection.return_value.__enter__.return_value.search.return_value = (True, None, [], None)
+
+    resolve_user("user1", "user1-123456")
+
+    assert server.call_args.kwargs["connect_timeout"] == 2
+    assert connection.call_args.kwargs["receive_timeout"] == 3
+
+def basic_auth_header(username, password):
+    import base64
+
+    credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
+    return {"Authorization": f"Basic {credentials}"}
+
+def sample(name, labels=None):
+    from prometheus_client import REGISTRY
+
+    return REGISTRY.get_sample_value(name, labels or {}) or 0
+
+def test_authenticate_request_basic_auth_records_metrics(mocker):
+    from flask import Flask
+    from ldap3.core.exceptions import LDAPBindError
+    import mlflowstack.auth.ldap as ldap
+    from mlflowstack.auth.ldap import authenticate_request_basic_auth, UserInfo
+
+    app = Flask(__name__)
+    mocker.patch.object(UserInfo, "update")
+    resolve_user = mocker.patch.object(
+        ldap, "resolve_user", return_value=UserInfo(name="admin1", is_admin=True)
+    )
+    admin = sample("mlflowstack_auth_outcomes_total", {"outcome": "admin"})
+    unauthorized = sample("mlflowstack_auth_outcomes_total", {"outcome": "unauthorized"})
+    hits = sample("mlflowstack_auth_cache_lookups_total", {"result": "hit"})
+    requests = sample("mlflowstack_auth_request_seconds_count")
+
+    for _ in range(2):
+        with app.test_request_context(headers=basic_auth_header("admin1", "admin1-123456")):
+            assert authenticate_request_basic_auth().username == "admin1"
+
+    resolve_user.side_effect = LDAPBindError("invalidCredentials")
+    with app.test_request_context(headers=basic_auth_header("admin1", "wrong")):
+        assert authenticate_request_basic_auth().status_code == 401
+
+    assert sample("mlflowstack_auth_outcomes_total", {"outcome": "admin"}) == admin + 2
+    assert (
+        sample("mlflowstack_auth_outcomes_total", {"outcome": "unauthorized"})
+        == unauthorized + 1
+    )
+    assert sample("mlflowstack_auth_cache_lookups_total", {"result": "hit"}) == hits + 1
+    assert sample("mlflowstack_auth_request_seconds_count") == requests + 3
+
+def test_file_cache_backend_shares_logins_between_workers(mocker, tmp_path):
+    mocker.patch.dict(
+        os.environ,
+        {
+            "LDAP_CACHE_BACKEND": "file",
+            "LDAP_CACHE_PATH": str(tmp_path / "cache.db"),
+            "LDAP_CACHE_SECRET": "cache-secret",
+        },
+    )
+
+    import mlflowstack.auth.ldap as worker1
+    from mlflowstack.auth.ldap import UserInfo
+
+    mocker.patch.object(
+        worker1, "resolve_user", return_value=UserInfo(name="user1", is_user=True)
+    )
+    worker1.authenticate_user("user1", "user1-123456")
+
+    # A second worker imports its own copy of the module
+    del sys.modules["mlflowstack.auth.ldap"]
+    import mlflowstack.auth.ldap as worker2
+
+    resolve_user = mocker.patch.object(
+        worker2, "resolve_user", return_value=worker2.UserInfo(name="user1", is_user=True)
+    )
+    assert worker2.authenticate_user("user1", "user1-123456") == worker2.UserInfo(
+        name="user1", is_user=True
+    )
+    resolve_user.assert_not_called()
+
+    # Invalidation on one worker reaches the others
+    assert worker1.invalidate_credentials("user1") == 1
+    worker2.authenticate_user("user1", "user1-123456")
+    resolve_user.assert_called_once()
+
+@pytest.mark.parametrize(
+    "env",
+    [{"LDAP_CACHE_BACKEND": "file"}, {"LDAP_CACHE_BACKEND": "redis"}, {"LDAP_CACHE_WARM_PATH": "warm.db"}],
+)
+def test_persisted_cache_requires_a_secret(mocker, env):
+    from mlflow.exceptions import MlflowException
+
+    mocker.patch.dict(os.environ, env)
+
+    with pytest.raises(MlflowException, match="set LDAP_CACHE_SECRET"):
+        import mlflowstack.auth.ldap  # noqa: F401
+
+def test_cli_invalidates_shared_cache(mocker, tmp_path, capsys):
+    mocker.patch.dict(
+        os.environ,
+        {
+            "LDAP_CACHE_BACKEND": "file",
+            "LDAP_CACHE_PATH": str(tmp_path / "cache.db"),
+            "LDAP_CACHE_SECRET": "cache-secret",
+        },
+    )
+
+    import mlflowstack.auth.ldap as ldap
+    from mlflowstack.auth.cli import main
+
+    mocker.patch.object(
+        ldap, "resolve_user", return_value=ldap.UserInfo(name="user1", is_user=True)
+    )
+    ldap.authenticate_user("user1", "user1-123456")
+
+    assert main(["invalidate-cache", "--user", "user1"]) == 0
+    assert "Invalidated 1 cached login(s)" in capsys.readouterr().out
+    assert len(ldap._credential_cache) == 0
+
+def test_ldaps_server_info_is_read_once(mocker):
+    mocker.patch(
+        "ldap3.utils.uri.parse_uri",
+        lambda x: {"host": "my-ldap", "port": 6360, "ssl": True},
+    )
+
+    import mlflowstack.auth.ldap as ldap
+    from mlflowstack.auth.ldap import resolve_user
+
+    server = mocker.patch("ldap3.Server")
+    connection = mocker.patch("ldap3.Connection")
+    connection.return_value.__enter__.return_value.search.return_value = (True, None, [], None)
+    started, release = threading.Event(), threading.Event()
+
+    def fetch_slowly(server):
+        started.set()
+        release.wait(5)
+        return None, None
+
+    fetch = mocker.patch.object(ldap, "_fetch_server_info", side_effect=fetch_slowly)
+
+    resolve_user("user1", "user1-123456")
+    assert started.wait(5)
+    release.set()
+    (state,) = ldap.get_server_pool().states
+    for _ in range(500):
+        if state.info.loaded_at is not None:
+            break
+        time.sleep(0.01)
+    resolve_user("user1", "user1-123456")
+
+    fetch.assert_called_once()
+    assert server.call_args.kwargs["get_info"] == "NO_INFO"
+
+def test_server_info_is_not_read_for_ejected_servers(mocker):
+    mocker.patch(
+        "ldap3.utils.uri.parse_uri",
+        lambda x: {"host": "my-ldap", "port": 6360, "ssl": True},
+    )
+
+    import mlflowstack.auth.ldap as ldap
+    from mlflowstack.auth.ldap import resolve_user
+
+    mocker.patch("ldap3.Server")
+    connection = mocker.patch("ldap3.Connection")
+    connection.return_value.__enter__.return_value.search.return_value = (True, None, [], None)
+    fetch = mocker.patch.object(ldap, "_fetch_server_info", return_value=(None, None))
+    servers = ldap.get_server_pool()
+    servers.record_failure(servers.states[0])
+
+    resolve_user("user1", "user1-123456")
+
+    fetch.assert_not_called()
+
+def test_resolve_user_from_member_of_reads_only_the_user_entry(mocker):
+    mocker.patch.dict(os.environ, {"LDAP_GROUP_RESOLUTION": "memberof"})
+
+    import ldap3
+    from mlflowstack.auth.ldap import resolve_user, UserInfo
+
+    mocker.patch("ldap3.Server")
+    mock_conn = mocker.MagicMock()
+    connection = mocker.patch("ldap3.Connection")
+    connection.return_value.__enter__.return_value = mock_conn
+    mock_conn.search.return_value = (
+        True,
+        None,
+        [
+            {
+                "dn": "uid=user1,ou=people,dc=mlflow,dc=test",
+                "attributes": {
+                    "memberOf": [
+                        "cn=other,ou=groups,dc=mlflow,dc=test",
+                        "CN=Test-Admin, OU=Groups, DC=mlflow, DC=test",
+                    ]
+                },
+                "type": "searchResEntry",
+            }
+        ],
+        None,
+    )
+
+    assert resolve_user("user1", "user1-123456") == UserInfo(name="user1", is_admin=True)
+    mock_conn.search.assert_called_once_with(
+        search_base="uid=user1,ou=people,dc=mlflow,dc=test",
+        search_filter="(objectClass=*)",
+        search_scope=ldap3.BASE,
+        attributes=["memberOf"],
+        get_operational_attributes=False,
+        size_limit=1,
+        time_limit=10,
+    )
+
+def test_resolve_user_from_member_of_without_groups(mocker):
+    mocker.patch.dict(os.environ, {"LDAP_GROUP_RESOLUTION": "memberof"})
+
+    from mlflowstack.auth.ldap import resolve_user, UserInfo
+
+    mocker.patch("ldap3.Server")
+    connection = mocker.patch("ldap3.Connection")
+    connection.return_value.__enter__.return_value.search.return_value = (
+        True,
+        None,
+        [{"dn": "uid=user1,ou=people,dc=mlflow,dc=test", "attributes": {}}],
+        None,
+    )
+
+    assert resolve_user("user1", "user1-123456") == UserInfo(name="user1")
+
+def test_resolve_user_in_chain_uses_one_search(mocker):
+    mocker.patch.dict(os.environ, {"LDAP_GROUP_RESOLUTION": "inchain"})
+
+    from mlflowstack.auth.ldap import resolve_user, UserInfo
+
+    mocker.patch("ldap3.Server")
+    mock_conn = mocker.MagicMock()
+    connection = mocker.patch("ldap3.Connection")
+    connection.return_value.__enter__.return_value = mock_conn
+    mock_conn.search.return_value = (
+        True,
+        None,
+        [
+            {
+                "dn": "CN=test-user,OU=groups,DC=mlflow,DC=test",
+                "attributes": {},
+                "type": "searchResEntry",
+            }
+        ],
+        None,
+    )
+
+    assert resolve_user("user1", "user1-123456") == UserInfo(name="user1", is_user=True)
+    mock_conn.search.assert_called_once()
+    assert mock_conn.search.call_args.kwargs["search_filter"] == (
+        "(&(|(distinguishedName=cn=test-admin,ou=groups,dc=mlflow,dc=test)"
+        "(distinguishedName=cn=test-user,ou=groups,dc=mlflow,dc=test))"
+        "(member:1.2.840.113556.1.4.1941:=uid=user1,ou=people,dc=mlflow,dc=test))"
+    )
+
+def test_resolve_user_matches_group_dn_ignoring_case_and_spacing(mocker):
+    mocker.patch.dict(
+        os.environ,
+        {"LDAP_GROUP_ATTRIBUTE_KEY": "attributes", "LDAP_GROUP_ATTRIBUTE": "memberOf"},
+    )
+
+    from mlflowstack.auth.ldap import resolve_user, UserInfo
+
+    mocker.patch("ldap3.Server")
+    connection = mocker.patch("ldap3.Connection")
+    connection.return_value.__enter__.return_value.search.return_value = (
+        True,
+        None,
+        [
+            {
+                "dn": "uid=user1,ou=people,dc=mlflow,dc=test",
+                "attributes": {
+                    "memberOf": [f"cn=team{i},ou=groups,dc=mlflow,dc=test" for i in range(1000)]
+                    + ["CN=Test-User, OU=Groups, DC=mlflow, DC=test"]
+                },
+                "type": "searchResEntry",
+            }
+        ],
+        None,
+    )
+
+    assert resolve_user("user1", "user1-123456") == UserInfo(name="user1", is_user=True)
+
+def test_session_cookie_lets_later_requests_skip_ldap(mocker):
+    mocker.patch.dict(os.environ, {"LDAP_SESSION_KEYS": "new-key,old-key"})
+
+    from flask import Flask
+    import mlflowstack.auth.ldap as ldap
+    from mlflowstack.auth.ldap import authenticate_request_basic_auth, UserInfo
+
+    app = Flask(__name__)
+
+    @app.before_request
+    def authenticate():
+        result = authenticate_request_basic_auth()
+        if isinstance(result, ldap.Response):
+            return result
+
+    app.route("/")(lambda: "ok")
+    mocker.patch.object(UserInfo, "update")
+    authenticate_user = mocker.patch.object(
+        ldap, "authenticate_user", return_value=UserInfo(name="user1", is_user=True)
+    )
+    client = app.test_client()
+
+    response = client.get("/", headers=basic_auth_header("user1", "user1-123456"))
+    assert response.status_code == 200
+    cookie = client.get_cookie("mlflowstack_session")
+    assert "HttpOnly" in response.headers["Set-Cookie"]
+
+    assert client.get("/").status_code == 200
+    assert client.get("/", headers={"Authorization": f"Bearer {cookie.value}"}).status_code == 200
+    assert authenticate_user.call_count == 1
+
+    # Credentials of another user are not replaced by the cookie
+    authenticate_user.return_value = UserInfo(name="user2")
+    assert client.get("/", headers=basic_auth_header("user2", "user2-123456")).status_code == 401
+
+def test_sessions_are_off_without_keys(mocker):
+    from flask import Flask
+    import mlflowstack.auth.ldap as ldap
+    from mlflowstack.auth.ldap import authenticate_request_basic_auth, UserInfo
+
+    app = Flask(__name__)
+    mocker.patch.object(UserInfo, "update")
+    mocker.patch.object(
+        ldap, "authenticate_user", return_value=UserInfo(name="user1", is_user=True)
+    )
+
+    with app.test_request_context(headers=basic_auth_header("user1", "user1-123456")):
+        assert authenticate_request_basic_auth().username == "user1"
+        assert not ldap.g.get("mlflowstack_session_issued")
+
+def test_api_key_authenticates_without_ldap(mocker, sqlite_auth_store):
+    mocker.patch.dict(os.environ, {"LDAP_API_KEY_SECRET": "api-key-secret"})
+
+    from flask import Flask
+    import mlflowstack.auth.ldap as ldap
+    from mlflowstack.auth.ldap import authenticate_request_basic_auth, get_api_keys
+
+    mocker.patch.object(ldap, "_auth_store", sqlite_auth_store)
+    authenticate_user = mocker.patch.object(ldap, "authenticate_user")
+    key = get_api_keys().create("ci-bot", is_admin=False)
+    app = Flask(__name__)
+
+    with app.test_request_context(headers={"Authorization": f"Bearer {key}"}):
+        assert authenticate_request_basic_auth().username == "ci-bot"
+    with app.test_request_context(headers=basic_auth_header("ci-bot", key)):
+        assert authenticate_request_basic_auth().username == "ci-bot"
+    with app.test_request_context(headers=basic_auth_header("someone-else", key)):
+        assert authenticate_request_basic_auth().status_code == 401
+
+    authenticate_user.assert_not_called()
+    assert not sqlite_auth_store.get_user("ci-bot").is_admin
+
+def test_password_with_the_api_key_prefix_goes_to_ldap(mocker):
+    mocker.patch.dict(os.environ, {"LDAP_API_KEY_SECRET": "api-key-secret"})
+
+    from flask import Flask
+    import mlflowstack.auth.ldap as ldap
+    from mlflowstack.auth.ldap import authenticate_request_basic_auth, UserInfo
+
+    mocker.patch.object(UserInfo, "update")
+    authenticate_user = mocker.patch.object(
+        ldap, "authenticate_user", return_value=UserInfo(name="user1", is_user=True)
+    )
+    app = Flask(__name__)
+
+    with app.test_request_context(headers=basic_auth_header("user1", "mlk_my-password")):
+        assert authenticate_request_basic_auth().username == "user1"
+
+    authenticate_user.assert_called_once_with("user1", "mlk_my-password", None)
+
+def test_api_key_store_failure_is_unauthorized(mocker):
+    mocker.patch.dict(os.environ, {"LDAP_API_KEY_SECRET": "api-key-secret"})
+
+    from flask import Flask
+    from sqlalchemy.exc import OperationalError
+    import mlflowstack.auth.ldap as ldap
+    from mlflowstack.auth.ldap import authenticate_request_basic_auth
+
+    mocker.patch.object(ldap, "get_api_keys").return_value.verify.side_effect = OperationalError(
+        "SELECT", {}, Exception("database is locked")
+    )
+    record_outcome = mocker.spy(ldap, "_record_outcome")
+    app = Flask(__name__)
+
+    with app.test_request_context(headers={"Authorization": f"Bearer mlk_{'0' * 16}_{'a' * 43}"}):
+        assert authenticate_request_basic_auth().status_code == 401
+
+    assert record_outcome.call_args.args[:2] == ("error", None)
+
+def test_request_is_authenticated_once(mocker):
+    from flask import Flask
+    import mlflowstack.auth.ldap as ldap
+    from mlflowstack.auth.ldap import authenticate_request_basic_auth, UserInfo
+
+    app = Flask(__name__)
+    mocker.patch.object(UserInfo, "update")
+    resolve_user = mocker.patch.object(
+        ldap, "resolve_user", return_value=UserInfo(name="user1", is_user=True)
+    )
+    record_outcome = mocker.spy(ldap, "_record_outcome")
+
+    with app.test_request_context(headers=basic_auth_header("user1", "user1-123456")):
+        first = authenticate_request_basic_auth()
+        assert authenticate_request_basic_auth() is first
+
+    assert resolve_user.call_count == 1
+    assert record_outcome.call_count == 1
+
+def test_audit_events_are_written_off_the_request_thread(mocker, tmp_path):
+    path = tmp_path / "audit.jsonl"
+    mocker.patch.dict(os.environ, {"LDAP_AUDIT": "file", "LDAP_AUDIT_FILE": str(path)})
+
+    import json
+    from flask import Flask
+    from ldap3.core.exceptions import LDAPBindError
+    import mlflowstack.auth.ldap as ldap
+    from mlflowstack.auth.ldap import authenticate_request_basic_auth, UserInfo
+
+    app = Flask(__name__)
+    mocker.patch.object(UserInfo, "update")
+
+    def resolve_user(username, password):
+        ldap._ldap_server.set("my-ldap:3890")
+        if password == "wrong":
+            raise LDAPBindError("invalidCredentials")
+        return UserInfo(name=username, is_user=True)
+
+    mocker.patch.object(ldap, "resolve_user", side_effect=resolve_user)
+
+    with app.test_request_context(headers=basic_auth_header("user1", "user1-123456")):
+        authenticate_request_basic_auth()
+    with app.test_request_context(headers=basic_auth_header("user1", "user1-123456")):
+        authenticate_request_basic_auth()
+    with app.test_request_context(headers=basic_auth_header("user1", "wrong")):
+        authenticate_request_basic_auth()
+    ldap.get_audit_log().close()
+
+    events = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(e["user"], e["outcome"], e["server"]) for e in events] == [
+        ("user1", "user", "my-ldap:3890"),
+        ("user1", "user", None),
+        ("user1", "unauthorized", "my-ldap:3890"),
+    ]
+    assert all(e["latency_ms"] >= 0 for e in events)
+
+def test_repeated_wrong_password_is_throttled_without_ldap(mocker):
+    mocker.patch.dict(os.environ, {"LDAP_CACHE_NEGATIVE_TTL": "0", "LDAP_THROTTLE_RATE": "1"})
+
+    from flask import Flask
+    from ldap3.core.exceptions import LDAPBindError
+    import mlflowstack.auth.ldap as ldap
+    from mlflowstack.auth.ldap import authenticate_request_basic_auth
+
+    app = Flask(__name__)
+    resolve_user = mocker.patch.object(
+        ldap, "resolve_user", side_effect=LDAPBindError("invalidCredentials")
+    )
+    throttled = sample("mlflowstack_login_throttled_total", {"reason": "backoff"})
+
+    for _ in range(3):
+        with app.test_request_context(headers=basic_auth_header("user1", "wrong")):
+            response = authenticate_request_basic_auth()
+        assert response.status_code == 401
+
+    assert resolve_user.call_count == 1
+    assert response.headers["Retry-After"] == "1"
+    assert sample("mlflowstack_login_throttled_total", {"reason": "backoff"}) == throttled + 2
+
+    # Another client address is not held back by these failures
+    with app.test_request_context(
+        headers=basic_auth_header("user1", "wrong"), environ_base={"REMOTE_ADDR": "10.0.0.2"}
+    ):
+        authenticate_request_basic_auth()
+    assert resolve_user.call_count == 2
+
+def test_client_address_behind_trusted_proxies(mocker):
+    mocker.patch.dict(os.environ, {"LDAP_TRUSTED_PROXIES": "1"})
+
+    from mlflowstack.auth.ldap import client_address
+
+    assert client_address("10.0.0.1", "203.0.113.7") == "203.0.113.7"
+    # Entries left of the trusted proxy's are whatever the client sent
+    assert client_address("10.0.0.1", "198.51.100.1, 203.0.113.7") == "203.0.113.7"
+    assert client_address("10.0.0.1", None) == "10.0.0.1"
+
+def test_client_address_ignores_forwarded_for_without_trusted_proxies():
+    from mlflowstack.auth.ldap import client_address
+
+    assert client_address("10.0.0.1", "203.0.113.7") == "10.0.0.1"
+
+def test_warm_cache_survives_restart_and_is_reverified_in_background(mocker, tmp_path):
+    mocker.patch.dict(
+        os.environ,
+        {"LDAP_CACHE_WARM_PATH": str(tmp_path / "warm.db"), "LDAP_CACHE_SECRET": "cache-secret"},
+    )
+
+    import mlflowstack.auth.ldap as ldap
+    from ldap3.core.exceptions import LDAPBindError
+
+    mocker.patch.object(ldap, "resolve_user", return_value=ldap.UserInfo(name="user1", is_user=True))
+    ldap.authenticate_user("user1", "user1-123456")
+
+    # A restarted worker serves the persisted login at once and checks it with LDAP afterwards
+    del sys.modules["mlflowstack.auth.ldap"]
+    import mlflowstack.auth.ldap as restarted
+
+    resolve_user = mocker.patch.object(restarted, "resolve_user", side_effect=LDAPBindError("invalidCredentials"))
+    assert restarted.authenticate_user("user1", "user1-123456") == restarted.UserInfo(name="user1", is_user=True)
+    restarted._warm_refresher.shutdown(wait=True)
+
+    resolve_user.assert_called_once_with("user1", "user1-123456")
+    assert not restarted.authenticate_user("user1", "user1-123456").authenticated
+    assert restarted._warm_store.entries(10) == []
+
+def test_warm_up_opens_pooled_connections_and_searches_once(mocker):
+    mocker.patch.dict(os.environ, {"LDAP_POOL_SIZE": "4", "LDAP_POOL_PREFILL": "2"})
+
+    import ldap3
+    import mlflowstack.auth.ldap as ldap
+
+    conn = mocker.MagicMock()
+    conn.__enter__.return_value = conn
+    connection = mocker.patch("ldap3.Connection", return_value=conn)
+    mocker.patch("ldap3.Server")
+
+    ldap.warm_up()
+
+    # Two pooled connections and one service account connection
+    assert connection.call_count == 3
+    assert len(ldap.get_server_pool().states[0].pool) == 2
+    conn.search.assert_called_once()
+    assert conn.search.call_args.kwargs["search_scope"] == ldap3.BASE
+
+def test_authenticate_user_async_does_not_block_the_event_loop(mocker):
+    import asyncio
+    import time
+    import mlflowstack.auth.ldap as ldap
+
+    def slow_resolve_user(username, password):
+        time.sleep(0.2)
+        return ldap.UserInfo(name=username, is_user=True)
+
+    resolve_user = mocker.patch.object(ldap, "resolve_user", side_effect=slow_resolve_user)
+
+    async def logins():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        users = await asyncio.gather(
+            *(ldap.authenticate_user_async(f"user{i}", "secret", "10.0.0.1") for i in range(10))
+        )
+        task.cancel()
+        return users, ticks
+
+    started = time.perf_counter()
+    users, ticks = asyncio.run(logins())
+    assert time.perf_counter() - started < 1
+    assert ticks > 5
+    assert [user.name for user in users] == [f"user{i}" for i in range(10)]
+
+    # Cache hits are answered without the thread pool
+    asyncio.run(ldap.authenticate_user_async("user1", "secret"))
+    assert resolve_user.call_count == 10
+
+def test_login_middleware_verifies_logins_before_mlflow(mocker):
+    from starlette.applications import Starlette
+    from starlette.responses import PlainTextResponse
+    from starlette.routing import Route
+    from starlette.testclient import TestClient
+    import mlflowstack.auth.ldap as ldap
+    from mlflowstack.auth.asgi import LDAPLoginMiddleware
+
+    resolve_user = mocker.patch.object(
+        ldap, "resolve_user", return_value=ldap.UserInfo(name="user1", is_user=True)
+    )
+
+    def endpoint(request):
+        # MLflow's synchronous authentication now finds the login cached
+        user = ldap.authenticate_user("user1", "user1-123456")
+        return PlainTextResponse(user.name)
+
+    app = Starlette(routes=[Route("/api/2.0/mlflow/experiments/search", endpoint), Route("/health", lambda r: PlainTextResponse("OK"))])
+    app.add_middleware(LDAPLoginMiddleware)
+    client = TestClient(app)
+
+    assert client.get("/health", headers=basic_auth_header("user1", "user1-123456")).text == "OK"
+    resolve_user.assert_not_called()
+
+    assert client.get("/api/2.0/mlflow/experiments/search", headers=basic_auth_header("user1", "user1-123456")).text == "user1"
+    resolve_user.assert_called_once_with("user1", "user1-123456")
+
+def test_user_sync_writes_role_changes_behind_the_request(mocker, sqlite_auth_store):
+    mocker.patch.dict(os.environ, {"LDAP_USER_SYNC_INTERVAL": "60"})
+
+    import mlflowstack.auth.ldap as ldap
+    from mlflowstack.auth.ldap import UserInfo
+
+    mocker.patch.object(ldap, "_auth_store", sqlite_auth_store)
+    sync = ldap.get_user_sync()
+    submit = mocker.spy(sync, "submit")
+    try:
+        # A new user is created on the request thread, without waiting for the writer
+        UserInfo(name="user1", is_user=True).update()
+        assert sqlite_auth_store.get_user("user1").is_admin is False
+        submit.assert_not_called()
+
+        # A role change is left to the background writer
+        UserInfo(name="user1", is_admin=True).update()
+        assert sqlite_auth_store.get_user("user1").is_admin is False
+        sync.flush()
+        assert sqlite_auth_store.get_user("user1").is_admin is True
+    finally:
+        sync.close()
+
+def test_user_sync_queues_role_changes_of_users_new_to_the_worker(mocker, sqlite_auth_store):
+    mocker.patch.dict(os.environ, {"LDAP_USER_SYNC_INTERVAL": "60"})
+
+    import mlflowstack.auth.ldap as ldap
+    from mlflowstack.auth.ldap import UserInfo
+
+    # Created by another worker, or before this one restarted
+    sqlite_auth_store.create_user("user1", "user1-password", is_admin=False)
+    mocker.patch.object(ldap, "_auth_store", sqlite_auth_store)
+    upsert_user = mocker.spy(ldap, "_upsert_user")
+    sync = ldap.get_user_sync()
+    submit = mocker.spy(sync, "submit")
+    try:
+        UserInfo(name="user1", is_admin=True).update()
+        submit.assert_called_once_with("user1", True)
+        upsert_user.assert_not_called()
+
+        sync.flush()
+        assert sqlite_auth_store.get_user("user1").is_admin is True
+    finally:
+        sync.close()
+
+def test_user_batch_is_written_in_one_transaction(mocker, sqlite_auth_store):
+    import mlflowstack.auth.ldap as ldap
+
+    for i in range(1, 4):
+        sqlite_auth_store.create_user(f"user{i}", f"user{i}-password", is_admin=i == 2)
+    mocker.patch.object(ldap, "_auth_store", sqlite_auth_store)
+    sessions = mocker.spy(sqlite_auth_store, "ManagedSessionMaker")
+
+    ldap._write_users({"user1": True, "user2": False, "user3": True})
+
+    assert sessions.call_count == 1
+    assert [sqlite_auth_store.get_user(f"user{i}").is_admin for i in range(1, 4)] == [True, False, True]
+
+def test_failed_user_batch_is_written_again_on_next_login(mocker):
+    import pytest
+    import mlflowstack.auth.ldap as ldap
+
+    mocker.patch.object(ldap, "_auth_store").ManagedSessionMaker.side_effect = RuntimeError("database is locked")
+    ldap._synced_roles.set("user1", True, 60)
+
+    with pytest.raises(RuntimeError):
+        ldap._write_users({"user1": True})
+
+    assert ldap._synced_roles.get("user1") is None
@@ -0,0 +1,138 @@
+import time
+
+import pytest
+from authlib.jose import JsonWebKey, JsonWebToken
+
+from mlflowstack.auth import oidc
+
+
+ISSUER = "https://keycloak/realms/mlflow"
+
+
+def signing_key(kid):
+    return JsonWebKey.generate_key("RSA", 2048, {"kid": kid}, is_private=True)
+
+
+def public_jwks(*keys):
+    return {"keys": [key.as_dict(is_private=False) for key in keys]}
+
+
+def make_token(key, **claims):
+    claims = {
+        "iss": ISSUER,
+        "aud": "mlflow",
+        "sub": "alice",
+        "exp": int(time.time()) + 600,
+        **claims,
+    }
+    header = {"alg": "RS256", "kid": key.as_dict()["kid"]}
+    return JsonWebToken(["RS256"]).encode(header, claims, key).decode()
+
+
+@pytest.fixture
+def provider(mocker):
+    from mlflow_oidc_auth import auth
+    from mlflow_oidc_auth.provider_registry import ProviderConfig
+
+    provider = ProviderConfig(id="keycloak", audience="mlflow", issuer=ISSUER)
+    mocker.patch.object(auth, "_resolve_provider", return_value=provider)
+    oidc._tokens.clear()
+    return provider
+
+
+@pytest.fixture
+def keys(mocker, clock):
+    current = signing_key("k1")
+    fetch = mocker.Mock(return_value=public_jwks(current))
+    mocker.patch.object(oidc, "_jwks", oidc.JWKSCache(fetch, 3600, 30, clock=clock))
+    return fetch, current, clock
+
+
+def test_verified_tokens_are_answered_from_memory(mocker, provider, keys):
+    fetch, key, _ = keys
+    verify = mocker.spy(oidc, "_verify")
+    token = make_token(key)
+
+    assert oidc.validate_token(token)["sub"] == "alice"
+    assert oidc.validate_token(token)["sub"] == "alice"
+
+    assert verify.call_count == 1
+    assert fetch.call_count == 1
+
+def test_tokens_are_not_cached_past_their_expiry(mocker, provider, keys):
+    _, key, _ = keys
+    cache = mocker.spy(oidc._tokens, "set")
+
+    oidc.validate_token(make_token(key, exp=int(time.time()) + 60))
+    oidc.validate_token(make_token(key, exp=int(time.time()) + 3600))
+
+    assert 0 < cache.call_args_list[0].args[2] <= 60
+    assert cache.call_args_list[1].args[2] == oidc.OIDC_TOKEN_CACHE_TTL
+
+def test_invalid_tokens_are_never_cached(mocker, provider, keys):
+    _, key, _ = keys
+    verify = mocker.spy(oidc, "_verify")
+    token = make_token(key, aud="other")
+
+    for _ in range(2):
+        with pytest.raises(Exception):
+            oidc.validate_token(token)
+    with pytest.raises(Exception):
+        oidc.validate_token(make_token(signing_key("k1")))
+
+    assert verify.call_count == 3
+
+def test_unknown_key_id_fetches_the_keys_again(provider, keys):
+    fetch, old, clock = keys
+    oidc.validate_token(make_token(old))
+    rotated = signing_key("k2")
+    fetch.return_value = public_jwks(old, rotated)
+
+    # Keys fetched a moment ago are not fetched again, whatever the token claims
+    with pytest.raises(Exception):
+        oidc.validate_token(make_token(rotated, sub="bob"))
+    clock.now += 31
+    assert oidc.validate_token(make_token(rotated, sub="carol"))["sub"] == "carol"
+    assert oidc.validate_token(make_token(old, sub="dave"))["sub"] == "dave"
+
+    assert fetch.call_count == 2
+
+def test_keys_are_fetched_again_after_their_max_age(provider, keys):
+    fetch, key, clock = keys
+    cache = oidc._jwks
+
+    cache.get(provider, "k1")
+    clock.now += 3599
+    cache.get(provider, "k1")
+    clock.now += 2
+    cache.get(provider, "k1")
+
+    assert fetch.call_count == 2
+
+def test_unreachable_provider_keeps_the_previous_keys(provider, keys):
+    fetch, key, clock = keys
+    cache = oidc._jwks
+    jwks = cache.get(provider)
+    fetch.side_effect = ConnectionError("keycloak down")
+    clock.now += 3601
+
+    assert cache.get(provider) == jwks
+    assert cache.get(provider) == jwks
+    assert fetch.call_count == 2
+
+    oidc._jwks.clear()
+    with pytest.raises(ConnectionError):
+        cache.get(provider)
+
+def test_install_replaces_the_plugin_validation(mocker):
+    import mlflow_oidc_auth.auth as auth
+    import mlflow_oidc_auth.middleware.auth_middleware as auth_middleware
+    import mlflow_oidc_auth.utils.request_helpers_fastapi as request_helpers
+
+    for module in (auth, auth_middleware, request_helpers):
+        mocker.patch.object(module, "validate_token", module.validate_token)
+
+    oidc.install()
+
+    assert auth.validate_token is oidc.validate_token
+    assert auth_middleware.validate_token is oidc.validate_token
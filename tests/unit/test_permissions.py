@@ -0,0 +1,108 @@
+import pytest
+
+from mlflowstack.auth import permissions
+
+
+@pytest.fixture
+def auth_store(tmp_path):
+    from mlflow.server.auth.sqlalchemy_store import SqlAlchemyStore
+
+    store = SqlAlchemyStore()
+    store.init_db(f"sqlite:///{tmp_path / 'auth.db'}")
+    alice = store.create_user("alice", "alice-password", is_admin=False)
+    readers = store.create_role("readers", "default")
+    store.add_role_permission(readers.id, "experiment", "*", "READ")
+    store.add_role_permission(readers.id, "experiment", "1", "EDIT")
+    admins = store.create_role("admins", "team")
+    store.add_role_permission(admins.id, "workspace", "*", "MANAGE")
+    members = store.create_role("members", "other")
+    store.add_role_permission(members.id, "workspace", "*", "USE")
+    for role in (readers, admins, members):
+        store.assign_role_to_user(alice.id, role.id)
+    return store
+
+
+def test_permissions_match_the_store(auth_store):
+    cached = permissions.CachedPermissionStore(auth_store, 60, 100)
+    user_id = auth_store.get_user("alice").id
+
+    for resource_type, resource_id, workspace in [
+        ("experiment", "1", "default"),
+        ("experiment", "2", "default"),
+        ("registered_model", "m", "default"),
+        ("experiment", "1", "team"),
+        ("workspace", "*", "team"),
+        ("experiment", "1", "other"),
+        ("workspace", "*", "other"),
+        ("experiment", "1", "missing"),
+    ]:
+        assert cached.get_role_permission_for_resource(
+            user_id, resource_type, resource_id, workspace
+        ) == auth_store.get_role_permission_for_resource(
+            user_id, resource_type, resource_id, workspace
+        )
+
+def test_hot_lookups_skip_the_database(mocker, auth_store):
+    cached = permissions.CachedPermissionStore(auth_store, 60, 100)
+    user_id = cached.get_user("alice").id
+    cached.get_role_permission_for_resource(user_id, "experiment", "1", "default")
+    sessions = mocker.spy(auth_store, "ManagedSessionMaker")
+    get_user = mocker.spy(auth_store, "get_user")
+
+    for experiment_id in ("1", "2", "3"):
+        assert cached.get_user("alice").id == user_id
+        cached.get_role_permission_for_resource(
+            user_id, "experiment", experiment_id, "default"
+        )
+
+    assert sessions.call_count == 0
+    assert get_user.call_count == 0
+
+def test_writes_invalidate_cached_permissions(auth_store):
+    cached = permissions.CachedPermissionStore(auth_store, 60, 100)
+    user_id = cached.get_user("alice").id
+    assert (
+        cached.get_role_permission_for_resource(user_id, "experiment", "2", "default")
+        .name
+        == "READ"
+    )
+
+    writers = cached.create_role("writers", "default")
+    cached.add_role_permission(writers.id, "experiment", "2", "MANAGE")
+    cached.assign_role_to_user(user_id, writers.id)
+    assert (
+        cached.get_role_permission_for_resource(user_id, "experiment", "2", "default")
+        .name
+        == "MANAGE"
+    )
+
+    cached.update_user("alice", is_admin=True)
+    assert cached.get_user("alice").is_admin
+    assert cached.version == 4
+
+def test_entries_expire(auth_store, clock):
+    cached = permissions.CachedPermissionStore(auth_store, 60, 100, clock=clock)
+    cached.get_user("alice")
+    # Written behind the proxy, only the TTL bounds how long the old row is served
+    auth_store.update_user("alice", is_admin=True)
+
+    assert not cached.get_user("alice").is_admin
+    clock.now += 61
+    assert cached.get_user("alice").is_admin
+
+def test_install_wraps_the_auth_store_once(mocker, auth_store):
+    import mlflow.server.auth as auth
+
+    mocker.patch.object(auth, "store", auth_store)
+    permissions.install()
+    assert auth.store is auth_store
+
+    mocker.patch.object(permissions, "PERMISSION_CACHE_TTL", 60)
+    permissions.install()
+    wrapped = auth.store
+    permissions.install()
+    assert isinstance(wrapped, permissions.CachedPermissionStore)
+    assert auth.store is wrapped
+
+    permissions.invalidate()
+    assert wrapped.version == 1
@@ -0,0 +1,137 @@
+import pytest
+from ldap3.core.exceptions import LDAPBindError, LDAPSocketReceiveError
+
+from mlflowstack.auth.pool import LDAPConnectionPool, LDAPPoolTimeoutError
+
+
+def make_pool(mocker, clock, size=2):
+    server = mocker.MagicMock()
+    server.info = object()
+    return LDAPConnectionPool(
+        server=server,
+        size=size,
+        max_lifetime=600,
+        idle_timeout=60,
+        checkout_timeout=0.01,
+        clock=clock,
+    )
+
+
+def bound_connection(mocker):
+    conn = mocker.MagicMock()
+    conn.closed = False
+    conn.rebind.return_value = (True, {"description": "success"}, None, None)
+    return conn
+
+
+def test_connection_is_reused_and_rebound(mocker, clock):
+    conn = bound_connection(mocker)
+    connection = mocker.patch("ldap3.Connection", return_value=conn)
+    pool = make_pool(mocker, clock)
+
+    with pool.connection("uid=user1", "secret") as c:
+        assert c is conn
+    with pool.connection("uid=user2", "secret") as c:
+        assert c is conn
+
+    assert connection.call_count == 1
+    conn.open.assert_called_once_with(read_server_info=False)
+    assert conn.rebind.call_args_list[-1].kwargs["user"] == "uid=user2"
+    assert len(pool) == 1
+
+def test_failed_bind_raises_and_keeps_connection(mocker, clock):
+    conn = bound_connection(mocker)
+    conn.rebind.return_value = (False, {"description": "invalidCredentials"}, None, None)
+    mocker.patch("ldap3.Connection", return_value=conn)
+    pool = make_pool(mocker, clock)
+
+    with pytest.raises(LDAPBindError):
+        with pool.connection("uid=user1", "wrong"):
+            pass
+
+    assert len(pool) == 1
+
+def test_dropped_connection_is_replaced(mocker, clock):
+    stale = bound_connection(mocker)
+    fresh = bound_connection(mocker)
+    mocker.patch("ldap3.Connection", side_effect=[stale, fresh])
+    pool = make_pool(mocker, clock)
+
+    with pool.connection("uid=user1", "secret"):
+        pass
+    stale.rebind.side_effect = LDAPSocketReceiveError("connection reset")
+
+    with pool.connection("uid=user1", "secret") as c:
+        assert c is fresh
+    stale.unbind.assert_called_once()
+
+def test_idle_and_expired_connections_are_evicted(mocker, clock):
+    first, second, third = (bound_connection(mocker) for _ in range(3))
+    mocker.patch("ldap3.Connection", side_effect=[first, second, third])
+    pool = make_pool(mocker, clock)
+
+    with pool.connection("uid=user1", "secret"):
+        pass
+    clock.now = 61
+    with pool.connection("uid=user1", "secret") as c:
+        assert c is second
+    first.unbind.assert_called_once()
+
+    clock.now = 601
+    with pool.connection("uid=user1", "secret") as c:
+        assert c is third
+
+def test_checkout_times_out_when_pool_is_exhausted(mocker, clock):
+    mocker.patch("ldap3.Connection", return_value=bound_connection(mocker))
+    pool = make_pool(mocker, clock, size=1)
+
+    with pool.connection("uid=user1", "secret"):
+        with pytest.raises(LDAPPoolTimeoutError):
+            with pool.connection("uid=user2", "secret"):
+                pass
+
+def test_prefill_opens_connections_up_to_the_pool_size(mocker, clock):
+    connection = mocker.patch(
+        "ldap3.Connection", side_effect=lambda **kwargs: bound_connection(mocker)
+    )
+    pool = make_pool(mocker, clock, size=2)
+
+    assert pool.prefill(5) == 2
+    assert pool.prefill(5) == 0
+    assert connection.call_count == 2
+
+    with pool.connection("uid=user1", "secret"):
+        pass
+    assert connection.call_count == 2
+
+def test_unanswered_rebind_is_a_communication_error(mocker):
+    import socket
+
+    import ldap3
+    from ldap3.core.exceptions import LDAPCommunicationError
+
+    # Accepts connections and never answers, like a server that dropped an idle session
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(4)
+    server = ldap3.Server("127.0.0.1", port=listener.getsockname()[1], connect_timeout=1)
+    pool = LDAPConnectionPool(
+        server=server,
+        size=1,
+        max_lifetime=600,
+        idle_timeout=60,
+        checkout_timeout=1,
+        receive_timeout=1,
+    )
+    opened = mocker.spy(pool, "_open")
+
+    try:
+        with pytest.raises(LDAPCommunicationError):
+            with pool.connection("uid=user1,ou=people", "secret"):
+                pass
+    finally:
+        listener.close()
+
+    # Retried once on a fresh connection, and nothing stays in the pool
+    assert opened.call_count == 2
+    assert len(pool) == 0
@@ -0,0 +1,77 @@
+import threading
+
+import ldap3
+from ldap3.core.exceptions import LDAPSocketOpenError
+from ldap3.protocol.rfc4512 import DsaInfo, SchemaInfo
+from ldap3.protocol.schemas.slapd24 import slapd_2_4_dsa_info, slapd_2_4_schema
+
+from mlflowstack.auth.server_info import ServerInfoLoader
+
+
+def server_info():
+    return DsaInfo.from_json(slapd_2_4_dsa_info), SchemaInfo.from_json(slapd_2_4_schema)
+
+def test_info_is_fetched_once_and_refreshed_after_max_age(mocker, clock):
+    server = ldap3.Server("my-ldap", port=636, get_info=ldap3.NONE)
+    fetch = mocker.Mock(side_effect=lambda: server_info())
+    loader = ServerInfoLoader(server, fetch, max_age=3600, clock=clock)
+
+    loader.ensure()
+    loader.ensure()
+    assert fetch.call_count == 1
+    assert server.info is not None
+    assert server.schema is not None
+
+    clock.now += 3600
+    loader.ensure()
+    assert fetch.call_count == 2
+
+def test_info_is_shared_through_cache_files(mocker, tmp_path):
+    fetch = mocker.Mock(side_effect=lambda: server_info())
+    worker1 = ldap3.Server("my-ldap", port=636, get_info=ldap3.NONE)
+    ServerInfoLoader(worker1, fetch, max_age=3600, directory=str(tmp_path)).ensure()
+
+    worker2 = ldap3.Server("my-ldap", port=636, get_info=ldap3.NONE)
+    ServerInfoLoader(worker2, fetch, max_age=3600, directory=str(tmp_path)).ensure()
+
+    assert fetch.call_count == 1
+    assert worker2.info.vendor_name == worker1.info.vendor_name
+    assert worker2.schema is not None
+
+def test_failed_fetch_is_retried_later(mocker, clock):
+    server = ldap3.Server("my-ldap", port=636, get_info=ldap3.NONE)
+    fetch = mocker.Mock(side_effect=LDAPSocketOpenError("unreachable"))
+    loader = ServerInfoLoader(
+        server, fetch, max_age=3600, retry_interval=60, clock=clock
+    )
+
+    loader.ensure()
+    loader.ensure()
+    assert fetch.call_count == 1
+    assert server.info is None
+
+    clock.now += 60
+    fetch.side_effect = lambda: server_info()
+    loader.ensure()
+    assert server.info is not None
+
+def test_refresh_loads_the_info_in_the_background(mocker):
+    server = ldap3.Server("my-ldap", port=636, get_info=ldap3.NONE)
+    started, release = threading.Event(), threading.Event()
+
+    def fetch():
+        started.set()
+        release.wait(5)
+        return server_info()
+
+    loader = ServerInfoLoader(server, mocker.Mock(side_effect=fetch), max_age=3600)
+
+    loader.refresh()
+    assert started.wait(5)
+    assert server.info is None
+    loader.refresh()
+
+    release.set()
+    loader.ensure()
+    assert server.info is not None
+    assert loader._fetch.call_count == 1
@@ -0,0 +1,29 @@
+from mlflowstack.auth.session import Session, SessionTokens
+
+
+def test_issued_token_verifies_until_it_expires(clock):
+    tokens = SessionTokens([b"secret"], lifetime=60, clock=clock)
+
+    token = tokens.issue("user1", is_admin=True)
+    assert tokens.verify(token) == Session("user1", True, 60.0)
+
+    clock.now = 60
+    assert tokens.verify(token) is None
+
+def test_tampered_or_foreign_tokens_are_rejected():
+    tokens = SessionTokens([b"secret"], lifetime=60)
+    payload, _, signature = tokens.issue("user1", is_admin=False).partition(".")
+    forged = SessionTokens([b"other"], lifetime=60).issue("user1", is_admin=True)
+
+    assert tokens.verify(f"{payload}.{signature[::-1]}") is None
+    assert tokens.verify(forged) is None
+    assert tokens.verify("not-a-token") is None
+    assert tokens.verify("") is None
+
+def test_rotated_out_key_still_verifies_its_tokens():
+    old = SessionTokens([b"old"], lifetime=60)
+    token = old.issue("user1", is_admin=False)
+
+    rotated = SessionTokens([b"new", b"old"], lifetime=60)
+    assert rotated.verify(token).username == "user1"
+    assert old.verify(rotated.issue("user1", is_admin=False)) is None
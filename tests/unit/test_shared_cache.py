@@ -0,0 +1,103 @@
+import fnmatch
+
+import pytest
+
+from mlflowstack.auth.shared_cache import RedisCache, SQLiteCache
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, px=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def scan_iter(self, match):
+        return [key for key in self.data if fnmatch.fnmatchcase(key, match)]
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+
+@pytest.fixture(params=["file", "redis"])
+def make_cache(request, tmp_path):
+    client = FakeRedis()
+
+    def make(clock, grace=0):
+        if request.param == "file":
+            return SQLiteCache(
+                str(tmp_path / "cache.db"), str, str, grace=grace, clock=clock
+            )
+        return RedisCache("", str, str, grace=grace, client=client, clock=clock)
+
+    return make
+
+def test_entries_are_shared_between_workers(make_cache, clock):
+    worker1, worker2 = make_cache(clock), make_cache(clock)
+
+    worker1.set(("user1", b"digest"), "value", ttl=5)
+
+    assert worker2.get(("user1", b"digest")) == "value"
+    assert worker2.get(("user1", b"other")) is None
+
+def test_entries_expire_after_ttl_and_stay_stale_within_grace(make_cache, clock):
+    cache = make_cache(clock, grace=30)
+    cache.set(("user1", b"digest"), "value", ttl=5)
+
+    clock.now += 10
+    assert cache.get(("user1", b"digest")) is None
+    assert cache.get_stale(("user1", b"digest")) == "value"
+
+    clock.now += 30
+    assert cache.get_stale(("user1", b"digest")) is None
+
+def test_invalidate_drops_one_user_or_everyone(make_cache, clock):
+    cache = make_cache(clock)
+    cache.set(("user1", b"a"), "value", ttl=5)
+    cache.set(("user1", b"b"), "value", ttl=5)
+    cache.set(("user2", b"a"), "value", ttl=5)
+
+    assert cache.invalidate("user1") == 2
+    assert cache.get(("user1", b"a")) is None
+    assert cache.get(("user2", b"a")) == "value"
+
+    assert cache.invalidate() == 1
+    assert cache.get(("user2", b"a")) is None
+
+def test_invalidate_matches_user_names_literally(make_cache, clock):
+    cache = make_cache(clock)
+    for username in ("*", "user[12]", "dom:user1", "dom"):
+        cache.set((username, b"a"), "value", ttl=5)
+
+    assert cache.invalidate("*") == 1
+    assert cache.invalidate("dom") == 1
+    assert cache.get(("user[12]", b"a")) == "value"
+    assert cache.get(("dom:user1", b"a")) == "value"
+
+def test_redis_errors_are_cache_misses(mocker):
+    client = mocker.MagicMock()
+    client.get.side_effect = ConnectionError("redis is down")
+    client.set.side_effect = ConnectionError("redis is down")
+    cache = RedisCache("", str, str, client=client)
+
+    cache.set(("user1", b"digest"), "value", ttl=5)
+    assert cache.get(("user1", b"digest")) is None
+
+def test_sqlite_entries_lists_unexpired_entries_latest_first(tmp_path, clock):
+    cache = SQLiteCache(str(tmp_path / "cache.db"), str, str, clock=clock)
+    cache.set(("dom:user1", b"\x01"), "one", ttl=10)
+    cache.set(("user2", b"\x02"), "two", ttl=20)
+    cache.set(("user3", b"\x03"), "three", ttl=1)
+
+    clock.now += 5
+    assert cache.entries(10) == [
+        (("user2", b"\x02"), "two", 20.0),
+        (("dom:user1", b"\x01"), "one", 10.0),
+    ]
+    assert cache.entries(1) == [(("user2", b"\x02"), "two", 20.0)]
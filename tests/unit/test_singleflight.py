@@ -0,0 +1,78 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from mlflowstack.auth.singleflight import SingleFlight, SingleFlightTimeoutError
+
+
+def wait_for_waiters(flight, key, count):
+    deadline = time.monotonic() + 5
+    while flight.waiting(key) < count and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def resolve():
+        calls.append(1)
+        release.wait(5)
+        return "resolved"
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(flight.do, "key", resolve, 5) for _ in range(8)]
+        wait_for_waiters(flight, "key", 7)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert results == ["resolved"] * 8
+    assert len(calls) == 1
+    assert len(flight) == 0
+
+def test_error_is_propagated_to_waiters():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise ValueError("bind failed")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flight.do, "key", fail, 5)
+        started.wait(5)
+        waiter = executor.submit(flight.do, "key", fail, 5)
+        wait_for_waiters(flight, "key", 1)
+        release.set()
+
+        with pytest.raises(ValueError):
+            leader.result()
+        with pytest.raises(ValueError):
+            waiter.result()
+
+def test_waiter_gives_up_after_timeout():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        executor.submit(flight.do, "key", slow, 5)
+        started.wait(5)
+        with pytest.raises(SingleFlightTimeoutError):
+            flight.do("key", slow, 0.01)
+        release.set()
+
+def test_different_keys_are_not_coalesced():
+    flight = SingleFlight()
+
+    assert flight.do("a", lambda: 1, 1) == 1
+    assert flight.do("b", lambda: 2, 1) == 2
@@ -0,0 +1,141 @@
+from contextlib import contextmanager
+
+from mlflowstack.auth.snapshot import GroupSnapshot
+
+
+ADMIN_DN = "cn=test-admin,ou=groups,dc=mlflow,dc=test"
+USER_DN = "cn=test-user,ou=groups,dc=mlflow,dc=test"
+
+
+def make_snapshot(mocker, members):
+    conn = mocker.MagicMock()
+    conn.extend.standard.paged_search.side_effect = lambda search_base, **kwargs: iter(
+        [{"dn": search_base, "attributes": {"member": members[search_base]}}]
+    )
+
+    @contextmanager
+    def connect():
+        yield conn
+
+    snapshot = GroupSnapshot(
+        connect=connect,
+        group_dns=[ADMIN_DN, USER_DN, ""],
+        member_attribute="member",
+        interval=300,
+        page_size=500,
+    )
+    return snapshot, conn
+
+
+def test_refresh_loads_normalized_members(mocker):
+    snapshot, conn = make_snapshot(
+        mocker,
+        {
+            ADMIN_DN: ["UID=Admin1,ou=people,dc=mlflow,dc=test"],
+            USER_DN: [
+                "uid=user1,ou=people,dc=mlflow,dc=test",
+                "uid=user2, ou=people,dc=mlflow,dc=test",
+            ],
+        },
+    )
+
+    assert not snapshot.ready
+    assert snapshot.refresh()
+    assert snapshot.ready
+
+    assert snapshot.is_member(ADMIN_DN, "uid=admin1,ou=people,dc=mlflow,dc=test")
+    assert snapshot.is_member(USER_DN.upper(), "uid=user2,ou=people,dc=mlflow,dc=test")
+    assert not snapshot.is_member(ADMIN_DN, "uid=user1,ou=people,dc=mlflow,dc=test")
+    assert conn.extend.standard.paged_search.call_args.kwargs["paged_size"] == 500
+    assert conn.extend.standard.paged_search.call_count == 2
+
+def test_start_loads_in_the_background(mocker):
+    import threading
+    import time
+
+    snapshot, conn = make_snapshot(
+        mocker, {ADMIN_DN: ["uid=admin1,ou=people,dc=mlflow,dc=test"], USER_DN: []}
+    )
+    release = threading.Event()
+    search = conn.extend.standard.paged_search.side_effect
+
+    def slow_search(**kwargs):
+        release.wait(5)
+        return search(**kwargs)
+
+    conn.extend.standard.paged_search.side_effect = slow_search
+
+    snapshot.start()
+    try:
+        # The caller goes on while the directory is read
+        assert not snapshot.ready
+        release.set()
+        for _ in range(50):
+            if snapshot.ready:
+                break
+            time.sleep(0.1)
+        assert snapshot.is_member(ADMIN_DN, "uid=admin1,ou=people,dc=mlflow,dc=test")
+    finally:
+        snapshot.stop()
+
+def test_failed_refresh_keeps_previous_snapshot(mocker):
+    snapshot, conn = make_snapshot(
+        mocker, {ADMIN_DN: ["uid=admin1,ou=people,dc=mlflow,dc=test"], USER_DN: []}
+    )
+    snapshot.refresh()
+
+    conn.extend.standard.paged_search.side_effect = Exception("server down")
+
+    assert not snapshot.refresh()
+    assert snapshot.is_member(ADMIN_DN, "uid=admin1,ou=people,dc=mlflow,dc=test")
+
+def test_single_valued_member_attribute(mocker):
+    snapshot, _ = make_snapshot(
+        mocker, {ADMIN_DN: "uid=admin1,ou=people,dc=mlflow,dc=test", USER_DN: []}
+    )
+    snapshot.refresh()
+
+    assert snapshot.is_member(ADMIN_DN, "uid=admin1,ou=people,dc=mlflow,dc=test")
+
+def test_nested_groups_are_expanded(mocker):
+    ops_dn = "cn=ops,ou=groups,dc=mlflow,dc=test"
+    oncall_dn = "cn=oncall,ou=groups,dc=mlflow,dc=test"
+    groups = {
+        ADMIN_DN: [ops_dn, "uid=admin1,ou=people,dc=mlflow,dc=test"],
+        ops_dn: [oncall_dn],
+        # Cycles are not followed twice
+        oncall_dn: ["uid=oncall1,ou=people,dc=mlflow,dc=test", ADMIN_DN],
+        USER_DN: ["uid=user1,ou=people,dc=mlflow,dc=test"],
+    }
+    conn = mocker.MagicMock()
+    conn.extend.standard.paged_search.return_value = iter(
+        [
+            {"dn": dn, "attributes": {"member": members}, "type": "searchResEntry"}
+            for dn, members in groups.items()
+        ]
+    )
+
+    @contextmanager
+    def connect():
+        yield conn
+
+    snapshot = GroupSnapshot(
+        connect=connect,
+        group_dns=[ADMIN_DN, USER_DN],
+        member_attribute="member",
+        interval=300,
+        page_size=500,
+        nested_base="ou=groups,dc=mlflow,dc=test",
+    )
+    assert snapshot.refresh()
+
+    assert snapshot.is_member(ADMIN_DN, "uid=admin1,ou=people,dc=mlflow,dc=test")
+    assert snapshot.is_member(ADMIN_DN, "uid=oncall1,ou=people,dc=mlflow,dc=test")
+    assert not snapshot.is_member(USER_DN, "uid=oncall1,ou=people,dc=mlflow,dc=test")
+    assert snapshot.is_member(USER_DN, "uid=user1,ou=people,dc=mlflow,dc=test")
+    # The whole graph is read with a single paged search
+    assert conn.extend.standard.paged_search.call_count == 1
+    assert (
+        conn.extend.standard.paged_search.call_args.kwargs["search_filter"]
+        == "(member=*)"
+    )
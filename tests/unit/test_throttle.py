@@ -0,0 +1,52 @@
+import pytest
+
+from mlflowstack.auth.throttle import LoginThrottle, LoginThrottledError
+
+
+def make_throttle(clock, **kwargs):
+    options = dict(rate=1, burst=3, backoff=1, max_backoff=8, max_size=100)
+    options.update(kwargs)
+    return LoginThrottle(clock=clock, **options)
+
+
+def test_burst_then_rate_limits_each_key(clock):
+    throttle = make_throttle(clock)
+
+    for _ in range(3):
+        throttle.acquire(("user1", "10.0.0.1"))
+    with pytest.raises(LoginThrottledError) as e:
+        throttle.acquire(("user1", "10.0.0.1"))
+    assert e.value.reason == "rate"
+    assert e.value.retry_after == pytest.approx(1)
+
+    # Other clients of the same user keep their own budget
+    throttle.acquire(("user1", "10.0.0.2"))
+
+    clock.now += 1
+    throttle.acquire(("user1", "10.0.0.1"))
+
+def test_failures_back_off_exponentially_until_success(clock):
+    throttle = make_throttle(clock, burst=100)
+    key = ("user1", "10.0.0.1")
+
+    assert [throttle.record_failure(key) for _ in range(5)] == [1, 2, 4, 8, 8]
+    with pytest.raises(LoginThrottledError) as e:
+        throttle.acquire(key)
+    assert e.value.reason == "backoff"
+    assert e.value.retry_after == 8
+
+    clock.now += 8
+    throttle.acquire(key)
+    throttle.record_success(key)
+    assert throttle.record_failure(key) == 1
+
+def test_budgets_are_bounded(clock):
+    throttle = make_throttle(clock, max_size=2)
+
+    for user in ("user1", "user2", "user3"):
+        throttle.record_failure((user, None))
+
+    # The least recently used budget was evicted
+    throttle.acquire(("user1", None))
+    with pytest.raises(LoginThrottledError):
+        throttle.acquire(("user3", None))
@@ -0,0 +1,59 @@
+import threading
+
+from mlflowstack.auth.user_sync import UserSync
+
+
+def test_users_are_deduplicated_and_written_in_one_batch():
+    batches = []
+    sync = UserSync(batches.append, batch_size=100, flush_interval=60)
+
+    sync.submit("alice", False)
+    sync.submit("bob", False)
+    sync.submit("alice", True)
+
+    assert sync.flush() == 2
+    assert batches == [{"alice": True, "bob": False}]
+    assert sync.flush() == 0
+
+def test_writer_waits_for_the_interval():
+    written = threading.Event()
+    sync = UserSync(lambda users: written.set(), batch_size=100, flush_interval=60)
+    sync.start()
+    try:
+        sync.submit("alice", True)
+        assert not written.wait(0.2)
+    finally:
+        sync.close()
+    assert written.is_set()
+
+def test_full_batch_is_written_before_the_interval():
+    sync = UserSync(lambda users: None, batch_size=2, flush_interval=60)
+    sync.start()
+    try:
+        sync.submit("alice", False)
+        batch = sync.submit("bob", False)
+        assert batch.wait(5)
+    finally:
+        sync.close()
+
+def test_close_writes_the_queued_users():
+    batches = []
+    sync = UserSync(batches.append, batch_size=100, flush_interval=60)
+    sync.start()
+    batch = sync.submit("alice", False)
+
+    sync.close()
+
+    assert batch.done.is_set()
+    assert batches == [{"alice": False}]
+
+def test_failed_write_is_reported_to_the_waiters():
+    def write(users):
+        raise RuntimeError("database is locked")
+
+    sync = UserSync(write, batch_size=100, flush_interval=60)
+    batch = sync.submit("alice", False)
+    sync.flush()
+
+    assert not batch.wait(0)
+    assert isinstance(batch.error, RuntimeError)
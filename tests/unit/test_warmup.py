@@ -0,0 +1,57 @@
+import sys
+import types
+
+import pytest
+from flask import Flask
+
+from mlflowstack.auth import warmup
+
+
+@pytest.fixture(autouse=True)
+def cold_worker():
+    warmup._ready.clear()
+    yield
+    warmup._ready.clear()
+
+
+@pytest.fixture
+def auth_module(mocker):
+    module = types.ModuleType("fake_auth")
+    module.warm_up = mocker.Mock()
+    module.authenticate = lambda: None
+    module.authenticate.__module__ = "fake_auth"
+    mocker.patch.dict(sys.modules, {"fake_auth": module})
+    mocker.patch("mlflow.server.auth.get_auth_func", return_value=module.authenticate)
+    mocker.patch("mlflow.server.auth.auth_config")
+    return module
+
+
+def test_warm_up_runs_once_and_touches_the_auth_store(mocker, auth_module):
+    store = mocker.patch("mlflow.server.auth.store")
+
+    assert warmup.warm_up()
+    assert warmup.warm_up()
+
+    auth_module.warm_up.assert_called_once_with()
+    store.has_user.assert_called_once()
+
+def test_failed_step_still_marks_the_worker_ready(mocker, auth_module):
+    mocker.patch("mlflow.server.auth.store")
+    auth_module.warm_up.side_effect = OSError("LDAP unreachable")
+
+    assert not warmup.warm_up()
+    assert warmup._ready.is_set()
+
+def test_health_answers_503_until_warmed_up(mocker, auth_module):
+    mocker.patch("mlflow.server.auth.store")
+    app = Flask(__name__)
+    app.add_url_rule("/health", "health", lambda: "OK")
+    app.add_url_rule("/version", "version", lambda: "3")
+    warmup.install(app)
+    client = app.test_client()
+
+    assert client.get("/health").status_code == 503
+    assert client.get("/version").status_code == 200
+
+    warmup.warm_up()
+    assert client.get("/health").status_code == 200